@@ -0,0 +1,179 @@
+import argparse
+import json
+import random
+import subprocess
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from statistics import median
+from typing import Dict, List, Tuple
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+# Lambda function of every task action when each action is deployed as its own function
+ACTION_HANDLERS = {
+    "validate": "validate_input",
+    "create": "create_workload",
+    "update": "update_workload",
+    "delete": "delete_workload",
+    "task_status": "get_task_status",
+}
+
+# Warm invocation duration (seconds) per action, task status polls are cheap Stax reads
+ACTION_SECONDS = {"validate": 0.2, "create": 1.5, "update": 1.5, "delete": 1.0, "task_status": 0.3}
+
+MEASURE_INIT = """
+import importlib, sys, time
+started_at = time.perf_counter()
+importlib.import_module(sys.argv[1])
+print(time.perf_counter() - started_at)
+"""
+
+
+@dataclass
+class Container:
+    """Lambda execution environment that is busy until a time and recycled after idling"""
+
+    busy_until: float
+    last_used: float
+
+
+def measure_init_seconds(handler: str, repeat: int) -> float:
+    """
+    Measure the median time to import a handler module in a fresh interpreter.
+
+    Parameters:
+    - handler: Name of the function directory of the handler
+    - repeat: Number of fresh interpreters to measure
+
+    Returns:
+    - float: Median import time in seconds
+    """
+    samples = []
+    for _ in range(repeat):
+        process = subprocess.run(
+            [sys.executable, "-c", MEASURE_INIT, f"functions.{handler}.app"],
+            capture_output=True,
+            check=True,
+            cwd=REPO_ROOT,
+            env={"PATH": "", "AWS_DEFAULT_REGION": "ap-southeast-2", "LAMBDA_TRACING_ENABLED": "false"},
+            text=True,
+        )
+        samples.append(float(process.stdout))
+
+    return median(samples)
+
+
+def generate_invocations(
+    executions: int, duration_seconds: float, polls: Tuple[int, int], poll_interval: float, seed: int
+) -> List[Tuple[float, str]]:
+    """
+    Generate the lambda invocations of workload state machine executions started at random times.
+
+    Every execution validates its input, runs a create, update or delete and polls the task status.
+
+    Returns:
+    - list: Invocation time and action, ordered by time
+    """
+    rng = random.Random(seed)
+    invocations = []
+
+    for _ in range(executions):
+        started_at = rng.uniform(0, duration_seconds)
+        operation = rng.choices(["create", "update", "delete"], weights=[6, 3, 1])[0]
+
+        invocations.append((started_at, "validate"))
+        started_at += ACTION_SECONDS["validate"]
+        invocations.append((started_at, operation))
+        started_at += ACTION_SECONDS[operation]
+
+        for _ in range(rng.randint(*polls)):
+            started_at += poll_interval
+            invocations.append((started_at, "task_status"))
+
+    return sorted(invocations)
+
+
+def simulate(
+    invocations: List[Tuple[float, str]],
+    functions: Dict[str, str],
+    init_seconds: Dict[str, float],
+    idle_seconds: float,
+) -> dict:
+    """
+    Simulate lambda container pools and count cold starts.
+
+    An invocation reuses an idle container of its function that was used within idle_seconds,
+    otherwise a new container is initialised.
+
+    Parameters:
+    - invocations: Invocation time and action
+    - functions: Function name of every action
+    - init_seconds: Init duration of every function
+    - idle_seconds: Seconds an idle container is kept warm
+
+    Returns:
+    - dict: Number of cold starts, total init seconds and cold starts per function
+    """
+    pools: Dict[str, List[Container]] = {function: [] for function in dict.fromkeys(functions.values())}
+    cold_starts = {function: 0 for function in pools}
+
+    for invoked_at, action in invocations:
+        function = functions[action]
+        pool = pools[function] = [
+            container for container in pools[function] if invoked_at - container.last_used <= idle_seconds
+        ]
+        container = next((container for container in pool if container.busy_until <= invoked_at), None)
+        duration = ACTION_SECONDS[action]
+
+        if container is None:
+            cold_starts[function] += 1
+            container = Container(busy_until=invoked_at, last_used=invoked_at)
+            duration += init_seconds[function]
+            pool.append(container)
+
+        container.busy_until = invoked_at + duration
+        container.last_used = container.busy_until
+
+    return {
+        "cold_starts": sum(cold_starts.values()),
+        "init_seconds": round(sum(cold_starts[function] * init_seconds[function] for function in pools), 3),
+        "cold_starts_per_function": cold_starts,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compare cold starts of per operation lambdas and the router lambda under mixed load."
+    )
+    parser.add_argument("--executions", help="Number of workload state machine executions", type=int, default=500)
+    parser.add_argument("--duration", help="Seconds over which executions start", type=float, default=3600)
+    parser.add_argument("--min-polls", help="Minimum task status polls per execution", type=int, default=3)
+    parser.add_argument("--max-polls", help="Maximum task status polls per execution", type=int, default=30)
+    parser.add_argument("--poll-interval", help="Seconds between task status polls", type=float, default=10)
+    parser.add_argument("--idle-seconds", help="Seconds an idle container is kept warm", type=float, default=600)
+    parser.add_argument("--repeat", help="Fresh interpreters to measure init time with", type=int, default=5)
+    parser.add_argument("--seed", help="Random seed of the generated load", type=int, default=1)
+
+    args = parser.parse_args()
+
+    handler_init_seconds = {
+        handler: measure_init_seconds(handler, args.repeat) for handler in [*ACTION_HANDLERS.values(), "router"]
+    }
+    load = generate_invocations(
+        args.executions, args.duration, (args.min_polls, args.max_polls), args.poll_interval, args.seed
+    )
+
+    print(
+        json.dumps(
+            {
+                "invocations": len(load),
+                "init_seconds": {handler: round(seconds, 4) for handler, seconds in handler_init_seconds.items()},
+                "per_operation_lambdas": simulate(load, ACTION_HANDLERS, handler_init_seconds, args.idle_seconds),
+                "router_lambda": simulate(
+                    load, dict.fromkeys(ACTION_HANDLERS, "router"), handler_init_seconds, args.idle_seconds
+                ),
+            },
+            indent=4,
+        )
+    )
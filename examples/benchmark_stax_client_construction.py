@@ -0,0 +1,116 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from statistics import median
+from time import perf_counter
+from typing import Optional, Tuple
+
+from src.stax_client import StaxClientCache, build_schema_snapshot
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+# Construct Stax clients offline: the bundled schema is used and the public API config fetch is served from cache
+MEASURE_CONSTRUCTION = """
+import sys, time
+started_at = time.perf_counter()
+from staxapp.config import Config
+Config.load_live_schema = False
+Config.cached_api_config = {"caching": f"https://{Config.hostname}/{Config.API_VERSION}/public/config"}
+from staxapp.openapi import StaxClient
+if sys.argv[1]:
+    from src.stax_client import load_schema_snapshot
+    assert load_schema_snapshot(sys.argv[1])
+StaxClient("workloads")
+first_client_seconds = time.perf_counter() - started_at
+started_at = time.perf_counter()
+for _ in range(int(sys.argv[2])):
+    StaxClient("workloads")
+print(first_client_seconds, (time.perf_counter() - started_at) / int(sys.argv[2]))
+"""
+
+
+def measure_construction(snapshot_path: Optional[str], repeat: int, clients: int) -> Tuple[float, float]:
+    """
+    Measure the median time to import staxapp and construct the first and every later client in fresh interpreters.
+
+    Parameters:
+    - snapshot_path: Schema snapshot to load before the first client, None lets staxapp load the schema
+    - repeat: Number of fresh interpreters to measure
+    - clients: Number of clients constructed after the first one
+
+    Returns:
+    - tuple: Median seconds of the first client and of every later client
+    """
+    first_samples, later_samples = [], []
+    for _ in range(repeat):
+        process = subprocess.run(
+            [sys.executable, "-c", MEASURE_CONSTRUCTION, snapshot_path or "", str(clients)],
+            capture_output=True,
+            check=True,
+            cwd=REPO_ROOT,
+            env={"PATH": os.environ.get("PATH", "")},
+            text=True,
+        )
+        first_seconds, later_seconds = process.stdout.split()
+        first_samples.append(float(first_seconds))
+        later_samples.append(float(later_seconds))
+
+    return median(first_samples), median(later_samples)
+
+
+def measure_cached_lookup(lookups: int) -> float:
+    """
+    Measure the time of getting a client from the process wide client cache.
+
+    Returns:
+    - float: Seconds per lookup
+    """
+    cache = StaxClientCache(ttl_seconds=3600)
+    cache.get("workloads", lambda client_type: object())
+
+    started_at = perf_counter()
+    for _ in range(lookups):
+        cache.get("workloads", lambda client_type: object())
+
+    return (perf_counter() - started_at) / lookups
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compare Stax client construction with and without the precompiled schema snapshot."
+    )
+    parser.add_argument("--repeat", help="Fresh interpreters to measure each variant with", type=int, default=3)
+    parser.add_argument("--clients", help="Clients constructed after the first one", type=int, default=100)
+
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        schema_snapshot_path = os.path.join(directory, "stax_schema.pickle")
+        build_started_at = perf_counter()
+        build_schema_snapshot(schema_snapshot_path, live_schema=False)
+        build_seconds = perf_counter() - build_started_at
+
+        staxapp_seconds = measure_construction(None, args.repeat, args.clients)
+        snapshot_seconds = measure_construction(schema_snapshot_path, args.repeat, args.clients)
+        snapshot_bytes = os.path.getsize(schema_snapshot_path)
+
+    print(
+        json.dumps(
+            {
+                "snapshot_build_seconds": round(build_seconds, 4),
+                "snapshot_bytes": snapshot_bytes,
+                "first_client_seconds": {
+                    "staxapp_schema": round(staxapp_seconds[0], 4),
+                    "schema_snapshot": round(snapshot_seconds[0], 4),
+                    "speedup": round(staxapp_seconds[0] / snapshot_seconds[0], 1),
+                },
+                "later_client_seconds": round(snapshot_seconds[1], 6),
+                "cached_client_seconds": round(measure_cached_lookup(args.clients * 100), 9),
+            },
+            indent=4,
+        )
+    )
@@ -0,0 +1,30 @@
+import argparse
+from json import dumps
+
+from src.stax_orchestrator import StaxOrchestrator
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Report, and with --delete remove, catalogue versions and manifests no workload references."
+    )
+    parser.add_argument("bucket", help="Name of the s3 bucket catalogue manifests are uploaded to", type=str)
+    parser.add_argument("--keep-versions", help="Most recent versions to keep per catalogue", type=int, default=3)
+    parser.add_argument(
+        "--min-orphan-age", help="Seconds before an unused manifest is deleted", type=float, default=86400
+    )
+    parser.add_argument("--max-workers", help="Maximum number of concurrent delete calls", type=int, default=10)
+    parser.add_argument("--requests-per-second", help="Maximum rate of Stax calls", type=float, default=5)
+    parser.add_argument("--delete", help="Delete instead of only reporting (dry run)", action="store_true")
+
+    args = parser.parse_args()
+
+    report = StaxOrchestrator().collect_catalogue_garbage(
+        args.bucket,
+        keep_versions=args.keep_versions,
+        dry_run=not args.delete,
+        min_orphan_age_seconds=args.min_orphan_age,
+        max_workers=args.max_workers,
+        requests_per_second=args.requests_per_second,
+    )
+
+    print(dumps(report, indent=4, sort_keys=True))
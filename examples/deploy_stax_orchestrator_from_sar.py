@@ -1,6 +1,12 @@
-import boto3
 import argparse
-from typing import Dict, Any
+import json
+import sys
+from itertools import product
+from typing import Any, Dict, List
+
+import boto3
+
+from src.stack_deployer import DeploymentStatus, StackDeployer, StackTarget
 
 
 def get_aws_account_id() -> str:
@@ -27,97 +33,30 @@ def get_application_details() -> Dict[str, Any]:
     return sar_client.get_application(ApplicationId=application_id)
 
 
-def create_cloudformation_change_set(
-    app_id: str, semantic_version: str, stack_name: str, cfn_parameters: Dict[str, Any]
-) -> str:
+def deploy_stax_orchestrator(cfn_parameters: Dict[str, Any], targets: List[StackTarget]) -> bool:
     """
-    Create a CloudFormation change set for the Stax Orchestrator application.
-
-    Parameters:
-    - app_id (str): Application ID
-    - semantic_version (str): Semantic version of the application
-    - stack_name (str): CloudFormation stack name
-    - cfn_parameters (dict): CloudFormation parameters
-
-    Returns:
-    - str: Change set ID
-    """
-    serverlessrepo_client = boto3.client("serverlessrepo")
-    return serverlessrepo_client.create_cloud_formation_change_set(
-        ApplicationId=app_id,
-        Capabilities=["CAPABILITY_IAM", "CAPABILITY_RESOURCE_POLICY"],
-        SemanticVersion=semantic_version,
-        StackName=stack_name,
-        ParameterOverrides=[{"Name": key, "Value": value} for key, value in cfn_parameters.items()],
-    )["ChangeSetId"]
-
-
-def execute_change_set(change_set_id: str, stack_name: str) -> None:
-    """
-    Execute a CloudFormation change set.
-
-    Parameters:
-    - change_set_id (str): Change set ID
-    - stack_name (str): CloudFormation stack name
-
-    Returns:
-    - None
-    """
-    cloudformation_client = boto3.client("cloudformation")
-    cloudformation_client.execute_change_set(
-        ChangeSetName=change_set_id,
-        StackName=stack_name,
-    )
-
-
-def deploy_stax_orchestrator(cfn_parameters: Dict[str, Any]) -> None:
-    """
-    Deploy a Stax Orchestrator from Serverless Application Repository.
+    Deploy a Stax Orchestrator from Serverless Application Repository to several accounts and regions concurrently.
 
     Parameters:
     - cfn_parameters (dict): A dictionary containing parameter values for the application.
+    - targets (list): Regions and profiles or IAM roles of the accounts to deploy to.
 
     Returns:
-    - None
+    - bool: True if every deployment succeeded
     """
     stack_name = "orchestrator-stax"
     app_details = get_application_details()
+    semantic_version = app_details["Version"]["SemanticVersion"]
 
-    print(f"Deploying version {app_details['Version']['SemanticVersion']} of the application.")
-
-    change_set_id = create_cloudformation_change_set(
-        app_details["ApplicationId"], app_details["Version"]["SemanticVersion"], stack_name, cfn_parameters
-    )
-
-    # Wait for change set to be created
-    waiter = boto3.client("cloudformation").get_waiter("change_set_create_complete")
+    print(f"Deploying version {semantic_version} of the application to {len(targets)} targets.")
 
-    try:
-        waiter.wait(
-            ChangeSetName=change_set_id,
-            WaiterConfig={
-                "Delay": 5,
-                "MaxAttempts": 30,
-            },
-        )
+    deployer = StackDeployer(app_details["ApplicationId"], semantic_version, stack_name, cfn_parameters)
+    deployments = deployer.deploy(targets)
 
-        # Execute the change set
-        execute_change_set(change_set_id, f"serverlessrepo-{stack_name}")
+    for deployment in deployments:
+        print(json.dumps(deployment.to_dict()))
 
-        # Wait for stack to be created
-        waiter = boto3.client("cloudformation").get_waiter("stack_create_complete")
-        waiter.wait(
-            StackName=f"serverlessrepo-{stack_name}",
-            WaiterConfig={
-                "Delay": 5,
-                "MaxAttempts": 30,
-            },
-        )
-
-    except Exception as waiter_exception:
-        print("An error occurred while waiting for the change set to be created: %s", waiter_exception)
-
-    print(f"Successfully deployed Stax Orchestrator version {app_details['Version']['SemanticVersion']}")
+    return all(deployment.status == DeploymentStatus.SUCCEEDED for deployment in deployments)
 
 
 if __name__ == "__main__":
@@ -200,6 +139,28 @@ if __name__ == "__main__":
         choices=["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"],
     )
 
+    parser.add_argument(
+        "--regions",
+        help="Specify the regions to deploy Stax Orchestrator to",
+        required=False,
+        nargs="+",
+        default=["ap-southeast-2"],
+    )
+    parser.add_argument(
+        "--profiles",
+        help="Specify the AWS named profiles of the accounts to deploy Stax Orchestrator to",
+        required=False,
+        nargs="*",
+        default=[],
+    )
+    parser.add_argument(
+        "--role-arns",
+        help="Specify IAM roles to assume in the accounts to deploy Stax Orchestrator to",
+        required=False,
+        nargs="*",
+        default=[],
+    )
+
     args = parser.parse_args()
     parameters = {
         "DeployWorkloadStateMachine": args.deploy_workload_state_machine,
@@ -214,4 +175,10 @@ if __name__ == "__main__":
         "PythonLoggingLevel": args.python_logging_level,
     }
 
-    deploy_stax_orchestrator(parameters)
+    accounts = [{"profile_name": profile} for profile in args.profiles]
+    accounts += [{"role_arn": role_arn} for role_arn in args.role_arns]
+    deployment_targets = [
+        StackTarget(region=region, **account) for account, region in product(accounts or [{}], args.regions)
+    ]
+
+    sys.exit(0 if deploy_stax_orchestrator(parameters, deployment_targets) else 1)
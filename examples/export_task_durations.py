@@ -0,0 +1,16 @@
+import argparse
+from json import dumps
+
+from src.task_metrics import export_task_durations
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "location",
+        help="Local directory or s3://bucket/prefix url the task duration histograms were recorded to",
+        type=str,
+    )
+
+    args = parser.parse_args()
+
+    print(dumps(export_task_durations(args.location), indent=4, sort_keys=True))
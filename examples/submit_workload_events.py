@@ -0,0 +1,17 @@
+import argparse
+import json
+
+from src.ingestion import IngestionQueue
+from src.stax_orchestrator import StaxOrchestrator
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Validate workload events and send them to the ingestion queue.")
+    parser.add_argument("queue_url", help="Url of the ingestion queue (IngestionQueueUrl stack output)", type=str)
+    parser.add_argument("events", help="JSONL file of workload events", type=argparse.FileType("r"))
+
+    args = parser.parse_args()
+
+    events = [json.loads(line) for line in args.events if line.strip()]
+    report = IngestionQueue(args.queue_url).submit(events, StaxOrchestrator().validate_workload_event)
+
+    print(json.dumps(report, indent=4, sort_keys=True))
@@ -0,0 +1,19 @@
+"""
+    Start workload state machine executions for micro-batches of workload events buffered in the ingestion queue
+"""
+import logging
+from os import environ
+
+from src import handlers
+from src.profiling import profile_handler
+from src.tracing import configure_tracing
+
+logging.getLogger().setLevel(environ.get("LOG_LEVEL", logging.INFO))
+
+configure_tracing("StaxOrchestrator:IngestWorkloadEvents")
+
+
+@profile_handler
+def lambda_handler(event: dict, _) -> dict:
+    """Ingest Workload Events Lambda Handler"""
+    return handlers.ingest_workload_events(event)
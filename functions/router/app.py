@@ -0,0 +1,44 @@
+"""
+    Route workload state machine tasks to their handler from a single lambda that shares warm state.
+"""
+import logging
+from os import environ
+from typing import Callable, Dict
+
+from src import handlers
+from src.constants import RouterAction, WorkloadOperation
+from src.profiling import profile_handler
+from src.tracing import configure_tracing
+
+logging.getLogger().setLevel(environ.get("LOG_LEVEL", logging.INFO))
+
+configure_tracing("StaxOrchestrator:Router")
+
+ROUTES: Dict[str, Callable[[dict], dict]] = {
+    RouterAction.VALIDATE: handlers.validate_input,
+    WorkloadOperation.CREATE: handlers.create_workload,
+    WorkloadOperation.UPDATE: handlers.update_workload,
+    WorkloadOperation.DELETE: handlers.delete_workload,
+    RouterAction.TASK_STATUS: handlers.get_task_status,
+}
+
+
+@profile_handler
+def lambda_handler(event: dict, _) -> dict:
+    """Route a task to the handler of its action
+
+    Args:
+        event (dict): Action to run and the event of its handler
+
+    Returns:
+        dict: Result of the handler
+
+    Raises:
+        ValueError: Raised when the action is not supported
+    """
+    route = ROUTES.get(event["action"])
+
+    if route is None:
+        raise ValueError(f"Unsupported action {event['action']}, expected one of {', '.join(ROUTES)}")
+
+    return route(event["event"])
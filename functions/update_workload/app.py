@@ -4,17 +4,16 @@
 import logging
 from os import environ
 
-from aws_xray_sdk.core import patch_all, xray_recorder
-
-from src.stax_orchestrator import StaxOrchestrator
+from src import handlers
+from src.profiling import profile_handler
+from src.tracing import configure_tracing
 
 logging.getLogger().setLevel(environ.get("LOG_LEVEL", logging.INFO))
 
-xray_recorder.configure(service="StaxOrchestrator:UpdateWorkload")
-patch_all()
+configure_tracing("StaxOrchestrator:UpdateWorkload")
 
 
+@profile_handler
 def lambda_handler(event: dict, _) -> dict:
     """Update Stax Workloads Lambda Handler"""
-
-    return StaxOrchestrator().update_workload(**event)
+    return handlers.update_workload(event)
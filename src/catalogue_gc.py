@@ -0,0 +1,119 @@
+"""
+    Plan the garbage collection of catalogue versions and manifests that no workload references.
+"""
+import re
+from typing import Iterable, List, Sequence, Set, Tuple
+
+# S3 DeleteObjects accepts at most 1000 keys per request
+MAX_DELETE_BATCH_SIZE = 1000
+
+# Manifests uploaded by StaxOrchestrator.create_catalogue are named <WorkloadVersion>-<catalogue name>.yaml where
+# WorkloadVersion is a UUID, optionally prefixed with a version tag, e.g. 1.2.0+<uuid>
+UUID_PATTERN = r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}"
+MANIFEST_NAME = re.compile(rf"^(?P<workload_version>(?:[^/+]+\+)?{UUID_PATTERN})-(?P<catalogue_name>[^/]+)\.yaml$")
+
+
+def batched(items: Sequence, size: int = MAX_DELETE_BATCH_SIZE) -> List[Sequence]:
+    """Split items into consecutive batches of at most size items"""
+    return [items[start : start + size] for start in range(0, len(items), size)]
+
+
+def get_referenced_version_ids(workloads: Iterable[dict]) -> Set[str]:
+    """Get the catalogue version IDs used by workloads that are not deleted
+
+    Args:
+        workloads (Iterable[dict]): Stax workloads as returned by ReadWorkloads
+
+    Returns:
+        Set[str]: Referenced catalogue version IDs
+    """
+    return {
+        workload["CatalogueVersionId"]
+        for workload in workloads
+        if workload.get("Status") != "DELETED" and workload.get("CatalogueVersionId")
+    }
+
+
+def find_stale_versions(
+    catalogues: Iterable[dict], referenced_version_ids: Set[str], keep_versions: int
+) -> List[dict]:
+    """Find active catalogue versions that can be deleted
+
+    The default version of every catalogue, versions referenced by a workload and the keep_versions most recent
+    versions of every catalogue are kept.
+
+    Args:
+        catalogues (Iterable[dict]): Active Stax catalogue items with their Versions
+        referenced_version_ids (Set[str]): Catalogue version IDs used by workloads
+        keep_versions (int): Number of most recent versions to keep per catalogue
+
+    Returns:
+        List[dict]: CatalogueId, CatalogueName, CatalogueVersionId, WorkloadVersion and CreatedTS of stale versions
+    """
+    stale = []
+
+    for catalogue in catalogues:
+        versions = sorted(
+            (version for version in catalogue.get("Versions") or [] if version.get("Status") == "ACTIVE"),
+            key=lambda version: version.get("CreatedTS", ""),
+            reverse=True,
+        )
+
+        for version in versions[keep_versions:]:
+            if version["Id"] == catalogue.get("CatalogueVersionId") or version["Id"] in referenced_version_ids:
+                continue
+
+            stale.append(
+                {
+                    "CatalogueId": catalogue["Id"],
+                    "CatalogueName": catalogue["Name"],
+                    "CatalogueVersionId": version["Id"],
+                    "WorkloadVersion": version.get("WorkloadVersion"),
+                    "CreatedTS": version.get("CreatedTS"),
+                }
+            )
+
+    return stale
+
+
+def find_stale_manifests(
+    manifests: Iterable[Tuple[str, float]],
+    catalogues: Iterable[dict],
+    stale_versions: Iterable[dict],
+    min_orphan_age_seconds: float,
+    now: float,
+) -> List[str]:
+    """Find manifests of stale versions and orphaned manifests that no catalogue version uses
+
+    Orphaned manifests are only collected once they are older than min_orphan_age_seconds, so a manifest uploaded by
+    a create_catalogue call that has not registered its version yet is left alone.
+
+    Args:
+        manifests (Iterable[Tuple[str, float]]): Object names and last modified timestamps of the artifact bucket
+        catalogues (Iterable[dict]): Stax catalogue items with their Versions
+        stale_versions (Iterable[dict]): Versions returned by find_stale_versions
+        min_orphan_age_seconds (float): Minimum age of orphaned manifests
+        now (float): Current timestamp
+
+    Returns:
+        List[str]: Names of the manifests that can be deleted
+    """
+    stale_workload_versions = {version["WorkloadVersion"] for version in stale_versions}
+    live_workload_versions = {
+        version.get("WorkloadVersion")
+        for catalogue in catalogues
+        if catalogue.get("Status", "ACTIVE") != "DELETED"
+        for version in catalogue.get("Versions") or []
+        if version.get("Status") != "DELETED"
+    } - stale_workload_versions
+
+    stale_manifests = []
+    for name, last_modified in manifests:
+        match = MANIFEST_NAME.match(name)
+        if match is None or match["workload_version"] in live_workload_versions:
+            continue
+
+        if match["workload_version"] in stale_workload_versions or now - last_modified >= min_orphan_age_seconds:
+            stale_manifests.append(name)
+
+    return stale_manifests
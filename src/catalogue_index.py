@@ -0,0 +1,159 @@
+"""
+    In-memory index of Stax workload catalogues to resolve catalogue names and version tags to IDs.
+"""
+import re
+from typing import Callable, Dict, List, Optional, Tuple
+
+LATEST_CATALOGUE_VERSION = "latest"
+
+# Semantic version tag, optionally prefixed with "v". Build metadata (+...) is ignored for ordering and matching.
+SEMVER_TAG = re.compile(
+    r"^v?(?P<major>\d+)\.(?P<minor>\d+)\.(?P<patch>\d+)"
+    r"(?:-(?P<prerelease>[0-9A-Za-z.-]+))?(?:\+(?P<build>[0-9A-Za-z.-]+))?$"
+)
+
+
+def get_version_tag(workload_version: str) -> str:
+    """Get the version tag of a workload version without its build metadata, e.g. 1.2.0 for 1.2.0+<uuid>"""
+    return (workload_version or "").split("+", 1)[0]
+
+
+def get_semver_key(workload_version: str) -> Optional[Tuple]:
+    """Get a key to order workload versions by semantic version precedence
+
+    Args:
+        workload_version (str): Version of a catalogue version, e.g. 1.2.0, v1.2.0-rc.1 or 1.2.0+<uuid>
+
+    Returns:
+        Optional[Tuple]: Sort key or None when the version is not a semantic version
+    """
+    match = SEMVER_TAG.match(workload_version or "")
+    if match is None:
+        return None
+
+    # A release has higher precedence than its pre-releases, numeric identifiers sort before alphanumeric ones
+    prerelease = match["prerelease"]
+    identifiers = tuple(
+        (0, int(identifier), "") if identifier.isdigit() else (1, 0, identifier)
+        for identifier in (prerelease or "").split(".")
+        if identifier
+    )
+
+    return (int(match["major"]), int(match["minor"]), int(match["patch"]), prerelease is None, identifiers)
+
+
+class CatalogueNotFoundException(ValueError):
+    """Raised when a catalogue or catalogue version can not be resolved"""
+
+
+class CatalogueIndex:
+    """Lookup table of catalogues by name with their versions."""
+
+    def __init__(self, catalogues: List[dict], versions_loader: Optional[Callable[[str], List[dict]]] = None):
+        """
+        Args:
+            catalogues (List[dict]): Stax workload catalogue items
+            versions_loader (Optional[Callable]): Called with a catalogue ID to load versions missing from the listing
+        """
+        self._catalogues_by_name: Dict[str, dict] = {catalogue["Name"]: catalogue for catalogue in catalogues}
+        self._catalogues_by_id: Dict[str, dict] = {catalogue["Id"]: catalogue for catalogue in catalogues}
+        self._versions_loader = versions_loader
+
+    @classmethod
+    def from_response(
+        cls, response: dict, versions_loader: Optional[Callable[[str], List[dict]]] = None
+    ) -> "CatalogueIndex":
+        """Build an index from a ReadCatalogueItems response"""
+        catalogues = [
+            catalogue
+            for workload_catalogue in response.get("WorkloadCatalogues", [])
+            for catalogue in workload_catalogue.get("WorkloadCatalogueItems", [])
+            if catalogue.get("Status", "ACTIVE") == "ACTIVE"
+        ]
+
+        return cls(catalogues, versions_loader)
+
+    def _get_versions(self, catalogue: dict) -> List[dict]:
+        if "Versions" not in catalogue and self._versions_loader:
+            catalogue["Versions"] = self._versions_loader(catalogue["Id"])
+
+        return [version for version in catalogue.get("Versions") or [] if version.get("Status") == "ACTIVE"]
+
+    def resolve(self, catalogue_name: str, catalogue_version: Optional[str] = None) -> dict:
+        """Resolve a catalogue name and optional version tag to Stax IDs
+
+        Args:
+            catalogue_name (str): Name of the catalogue
+            catalogue_version (Optional[str]): "latest" for the highest semantic version, a version tag (e.g. 1.2.0),
+                a version ID or None to use the catalogue default
+
+        Returns:
+            dict: catalogue_id and, when a version was requested, catalogue_version_id
+
+        Raises:
+            CatalogueNotFoundException: Raised when the catalogue or version does not exist
+        """
+        catalogue = self._catalogues_by_name.get(catalogue_name)
+        if not catalogue:
+            raise CatalogueNotFoundException(f"Catalogue with name {catalogue_name} does not exist")
+
+        resolved = {"catalogue_id": catalogue["Id"]}
+        if not catalogue_version:
+            return resolved
+
+        versions = self._get_versions(catalogue)
+
+        if catalogue_version == LATEST_CATALOGUE_VERSION:
+            if not versions and catalogue.get("CatalogueVersionId"):
+                resolved["catalogue_version_id"] = catalogue["CatalogueVersionId"]
+                return resolved
+
+            # Semantic versions take precedence, versions with other tags (e.g. UUIDs) are ordered by creation time
+            semantic_versions = [version for version in versions if get_semver_key(version.get("WorkloadVersion"))]
+            matching_versions = semantic_versions or versions
+        else:
+            # The same tag may be published more than once, the most recent one wins
+            semantic_versions = []
+            matching_versions = [
+                version
+                for version in versions
+                if catalogue_version
+                in (version.get("WorkloadVersion"), get_version_tag(version.get("WorkloadVersion")), version["Id"])
+            ]
+
+        if matching_versions:
+            latest_version = max(
+                matching_versions,
+                key=lambda version: (
+                    get_semver_key(version["WorkloadVersion"]) if semantic_versions else (),
+                    version.get("CreatedTS", ""),
+                ),
+            )
+            resolved["catalogue_version_id"] = latest_version["Id"]
+            return resolved
+
+        raise CatalogueNotFoundException(f"Version {catalogue_version} of catalogue {catalogue_name} does not exist")
+
+    def get_version_id(self, catalogue_id: str, catalogue_version_id: Optional[str] = None) -> str:
+        """Check that a catalogue version exists and is active
+
+        Args:
+            catalogue_id (str): ID of the catalogue
+            catalogue_version_id (Optional[str]): ID of the catalogue version, defaults to the catalogue version
+
+        Returns:
+            str: ID of the catalogue version
+
+        Raises:
+            CatalogueNotFoundException: Raised when the catalogue or version does not exist
+        """
+        catalogue = self._catalogues_by_id.get(catalogue_id)
+        if catalogue:
+            catalogue_version_id = catalogue_version_id or catalogue.get("CatalogueVersionId")
+            if catalogue_version_id and (
+                catalogue_version_id == catalogue.get("CatalogueVersionId")
+                or any(version["Id"] == catalogue_version_id for version in self._get_versions(catalogue))
+            ):
+                return catalogue_version_id
+
+        raise CatalogueNotFoundException(f"Version {catalogue_version_id} of catalogue {catalogue_id} does not exist")
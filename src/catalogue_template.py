@@ -0,0 +1,199 @@
+"""
+    Pre-flight validation of workload parameters against the CloudFormation template of a catalogue.
+"""
+import json
+import re
+from collections import OrderedDict
+from hashlib import sha256
+from threading import Lock
+from typing import Callable, Dict, List, Optional
+
+NUMBER_TYPES = frozenset({"Number", "List<Number>"})
+LIST_TYPES = frozenset({"List<Number>", "CommaDelimitedList"})
+
+
+class WorkloadParametersInvalidException(ValueError):
+    """Raised when workload parameters do not satisfy the parameters of a catalogue template"""
+
+    def __init__(self, errors: List[str]):
+        super().__init__("Invalid workload parameters: " + "; ".join(errors))
+        self.errors = errors
+
+
+def load_template(body: str) -> dict:
+    """Parse a CloudFormation template in JSON or YAML format, short form intrinsic functions (!Ref) included
+
+    Args:
+        body (str): Template body
+
+    Returns:
+        dict: Parsed template
+    """
+    if body.lstrip().startswith("{"):
+        return json.loads(body)
+
+    import yaml  # pylint: disable=import-outside-toplevel
+
+    class CloudFormationLoader(yaml.SafeLoader):  # pylint: disable=too-many-ancestors
+        """Safe YAML loader that keeps CloudFormation tags as their long form functions"""
+
+    def construct_tag(loader: yaml.SafeLoader, tag_suffix: str, node: yaml.Node) -> dict:
+        if isinstance(node, yaml.ScalarNode):
+            value = loader.construct_scalar(node)
+        elif isinstance(node, yaml.SequenceNode):
+            value = loader.construct_sequence(node, deep=True)
+        else:
+            value = loader.construct_mapping(node, deep=True)
+
+        if tag_suffix == "GetAtt" and isinstance(value, str):
+            value = value.split(".", 1)
+
+        return {"Ref" if tag_suffix == "Ref" else f"Fn::{tag_suffix}": value}
+
+    CloudFormationLoader.add_multi_constructor("!", construct_tag)
+
+    return yaml.load(body, Loader=CloudFormationLoader)
+
+
+def _is_number(value: str) -> bool:
+    try:
+        float(value)
+    except ValueError:
+        return False
+
+    return True
+
+
+def _validate_value(name: str, value: str, parameter: dict) -> List[str]:
+    parameter_type = parameter.get("Type", "String")
+    values = [item.strip() for item in value.split(",")] if parameter_type in LIST_TYPES else [value]
+    constraint = f" ({parameter['ConstraintDescription']})" if parameter.get("ConstraintDescription") else ""
+    errors = []
+
+    for item in values:
+        if parameter_type in NUMBER_TYPES:
+            if not _is_number(item):
+                errors.append(f"{name} value {item} is not a number")
+                continue
+            if "MinValue" in parameter and float(item) < float(parameter["MinValue"]):
+                errors.append(f"{name} value {item} is less than {parameter['MinValue']}{constraint}")
+            if "MaxValue" in parameter and float(item) > float(parameter["MaxValue"]):
+                errors.append(f"{name} value {item} is greater than {parameter['MaxValue']}{constraint}")
+
+        if "AllowedValues" in parameter and item not in [str(allowed) for allowed in parameter["AllowedValues"]]:
+            errors.append(f"{name} value {item} is not one of {parameter['AllowedValues']}{constraint}")
+
+    if parameter_type == "String":
+        if "MinLength" in parameter and len(value) < int(parameter["MinLength"]):
+            errors.append(f"{name} is shorter than {parameter['MinLength']} characters{constraint}")
+        if "MaxLength" in parameter and len(value) > int(parameter["MaxLength"]):
+            errors.append(f"{name} is longer than {parameter['MaxLength']} characters{constraint}")
+        if "AllowedPattern" in parameter and not re.fullmatch(parameter["AllowedPattern"], value):
+            errors.append(f"{name} does not match pattern {parameter['AllowedPattern']}{constraint}")
+
+    return errors
+
+
+def validate_workload_parameters(template_parameters: Dict[str, dict], workload_parameters: Optional[dict]) -> None:
+    """Check workload parameters against the Parameters section of a CloudFormation template
+
+    Args:
+        template_parameters (Dict[str, dict]): Parameters section of the catalogue template
+        workload_parameters (Optional[dict]): Workload cloudformation parameters
+
+    Raises:
+        WorkloadParametersInvalidException: Raised with every problem found when the parameters are invalid
+    """
+    workload_parameters = workload_parameters or {}
+    errors = [
+        f"{name} is not a parameter of the catalogue"
+        for name in workload_parameters
+        if name not in template_parameters
+    ]
+
+    for name, parameter in template_parameters.items():
+        if name not in workload_parameters:
+            if "Default" not in parameter:
+                errors.append(f"{name} is required")
+            continue
+
+        errors.extend(_validate_value(name, str(workload_parameters[name]), parameter))
+
+    if errors:
+        raise WorkloadParametersInvalidException(errors)
+
+
+class CatalogueTemplateCache:
+    """Process wide LRU cache of parsed template parameters keyed by catalogue version and by template content hash.
+
+    Catalogue versions are immutable, so the templates of a version are neither downloaded nor parsed again, and
+    versions sharing a template body share its parsed parameters. Both maps hold at most max_size entries.
+    """
+
+    def __init__(self, max_size: int = 128):
+        """
+        Args:
+            max_size (int): Maximum number of catalogue versions and of parsed templates to keep
+        """
+        self.max_size = max_size
+        self._parameters_by_key: "OrderedDict[str, Optional[Dict[str, dict]]]" = OrderedDict()
+        self._parameters: "OrderedDict[str, Dict[str, dict]]" = OrderedDict()
+        self._lock = Lock()
+
+    def _put(self, cache: OrderedDict, key: str, value: Optional[Dict[str, dict]]) -> None:
+        with self._lock:
+            cache[key] = value
+            cache.move_to_end(key)
+            while len(cache) > self.max_size:
+                cache.popitem(last=False)
+
+    def parse(self, body: str) -> Dict[str, dict]:
+        """Get the Parameters section of a template, parsing it only if its content has not been seen before
+
+        Args:
+            body (str): Template body
+
+        Returns:
+            Dict[str, dict]: Template parameters keyed by name
+        """
+        content_hash = sha256(body.encode()).hexdigest()
+
+        with self._lock:
+            if content_hash in self._parameters:
+                self._parameters.move_to_end(content_hash)
+                return self._parameters[content_hash]
+
+        parameters = (load_template(body) or {}).get("Parameters") or {}
+        self._put(self._parameters, content_hash, parameters)
+
+        return parameters
+
+    def get(self, key: str, loader: Callable[[str], Optional[List[str]]]) -> Optional[Dict[str, dict]]:
+        """Get the merged parameters of the templates of a catalogue version, loading them when they are not cached
+
+        Args:
+            key (str): ID of the catalogue version
+            loader (Callable): Called with the key to read the template bodies, returns None when there is no template
+
+        Returns:
+            Optional[Dict[str, dict]]: Template parameters keyed by name, None when there is no template
+        """
+        with self._lock:
+            if key in self._parameters_by_key:
+                self._parameters_by_key.move_to_end(key)
+                return self._parameters_by_key[key]
+
+        bodies = loader(key)
+        parameters = None if bodies is None else {}
+        for body in bodies or []:
+            parameters.update(self.parse(body))
+
+        self._put(self._parameters_by_key, key, parameters)
+
+        return parameters
+
+    def clear(self) -> None:
+        """Drop all cached templates"""
+        with self._lock:
+            self._parameters_by_key.clear()
+            self._parameters.clear()
@@ -0,0 +1,193 @@
+"""
+    Circuit breakers that fail Stax api calls fast while an endpoint is failing or slow.
+"""
+from collections import deque
+from enum import Enum
+from threading import Lock
+from time import monotonic
+from typing import Any, Callable, Deque, Dict, Tuple, Type
+
+TOO_MANY_REQUESTS = 429
+
+
+class StaxCircuitOpenException(Exception):
+    """Raised instead of calling a Stax endpoint while its circuit is open"""
+
+
+class CircuitState(str, Enum):
+    """States of a circuit breaker"""
+
+    CLOSED = "CLOSED"
+    OPEN = "OPEN"
+    HALF_OPEN = "HALF_OPEN"
+
+
+class CircuitBreaker:  # pylint: disable=too-many-instance-attributes
+    """Thread safe circuit breaker over a sliding window of the most recent calls.
+
+    A call is unhealthy when it raised an error that indicates the service is degraded or took longer than
+    slow_call_seconds. The circuit opens when the share of unhealthy calls in the window reaches the threshold,
+    rejects calls for open_seconds and then lets a single probe call through to decide whether to close again.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        failure_rate_threshold: float = 0.5,
+        slow_call_seconds: float = 10,
+        open_seconds: float = 30,
+        window_size: int = 20,
+        minimum_calls: int = 5,
+        ignored_exceptions: Tuple[Type[Exception], ...] = (),
+    ):
+        """
+        Args:
+            failure_rate_threshold (float): Share of unhealthy calls (0 to 1) in the window that opens the circuit
+            slow_call_seconds (float): Calls taking longer than this many seconds are unhealthy
+            open_seconds (float): Seconds the circuit stays open before a probe call is let through
+            window_size (int): Number of most recent calls used to calculate the failure rate
+            minimum_calls (int): Minimum number of calls in the window before the circuit can open
+            ignored_exceptions (Tuple[Type[Exception]]): Errors caused by the caller that never count as unhealthy
+        """
+        self.failure_rate_threshold = failure_rate_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.open_seconds = open_seconds
+        self.minimum_calls = minimum_calls
+        self.ignored_exceptions = ignored_exceptions
+        self.state = CircuitState.CLOSED
+        self._outcomes: Deque[bool] = deque(maxlen=window_size)
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = Lock()
+
+    def is_failure(self, error: Exception) -> bool:
+        """Check if an error indicates the service is degraded, client errors (4xx except 429) do not"""
+        if isinstance(error, self.ignored_exceptions):
+            return False
+
+        status_code = getattr(error, "status_code", None)
+        if isinstance(status_code, int):
+            return status_code >= 500 or status_code == TOO_MANY_REQUESTS
+
+        return True
+
+    def _open(self) -> None:
+        self.state = CircuitState.OPEN
+        self._opened_at = monotonic()
+        self._outcomes.clear()
+
+    def before_call(self) -> None:
+        """Reserve permission to make a call
+
+        Raises:
+            StaxCircuitOpenException: Raised when the circuit is open or a probe call is already in flight
+        """
+        with self._lock:
+            if self.state == CircuitState.OPEN and monotonic() - self._opened_at >= self.open_seconds:
+                self.state = CircuitState.HALF_OPEN
+
+            if self.state == CircuitState.CLOSED:
+                return
+
+            if self.state == CircuitState.HALF_OPEN and not self._probing:
+                self._probing = True
+                return
+
+            retry_in = max(0.0, self.open_seconds - (monotonic() - self._opened_at))
+            raise StaxCircuitOpenException(f"Circuit is {self.state.value}, retry in {retry_in:.0f} seconds")
+
+    def record(self, healthy: bool) -> None:
+        """Record the outcome of a call made after before_call
+
+        Args:
+            healthy (bool): False when the call failed because of the service or was slow
+        """
+        with self._lock:
+            if self.state == CircuitState.HALF_OPEN:
+                self._probing = False
+                if healthy:
+                    self.state = CircuitState.CLOSED
+                else:
+                    self._open()
+                return
+
+            self._outcomes.append(healthy)
+            failures = self._outcomes.count(False)
+
+            if (
+                len(self._outcomes) >= self.minimum_calls
+                and failures / len(self._outcomes) >= self.failure_rate_threshold
+            ):
+                self._open()
+
+    def call(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """Call a function through the circuit breaker
+
+        Raises:
+            StaxCircuitOpenException: Raised without calling the function while the circuit is open
+        """
+        self.before_call()
+        started_at = monotonic()
+
+        try:
+            result = func(*args, **kwargs)
+        except Exception as error:
+            self.record(not self.is_failure(error) and monotonic() - started_at < self.slow_call_seconds)
+            raise
+
+        self.record(monotonic() - started_at < self.slow_call_seconds)
+        return result
+
+
+class CircuitBreakerRegistry:
+    """Process wide circuit breakers keyed by endpoint, created on first use with shared settings."""
+
+    def __init__(self, **settings):
+        """
+        Args:
+            settings: Keyword arguments passed to every CircuitBreaker
+        """
+        self.settings = settings
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = Lock()
+
+    def get(self, endpoint: str) -> CircuitBreaker:
+        """Get the circuit breaker of an endpoint"""
+        with self._lock:
+            if endpoint not in self._breakers:
+                self._breakers[endpoint] = CircuitBreaker(**self.settings)
+
+            return self._breakers[endpoint]
+
+    def states(self) -> Dict[str, str]:
+        """Get the state of every circuit breaker keyed by endpoint"""
+        with self._lock:
+            return {endpoint: breaker.state.value for endpoint, breaker in self._breakers.items()}
+
+    def reset(self) -> None:
+        """Drop all circuit breakers"""
+        with self._lock:
+            self._breakers.clear()
+
+
+class CircuitBreakingClient:  # pylint: disable=too-few-public-methods
+    """Proxy of a Stax client that calls every operation through the circuit breaker of its endpoint."""
+
+    def __init__(self, client: Any, client_type: str, registry: CircuitBreakerRegistry):
+        """
+        Args:
+            client (Any): Stax client to proxy
+            client_type (str): Type of the stax client (for e.g, workloads) used to name endpoints
+            registry (CircuitBreakerRegistry): Registry holding the circuit breakers
+        """
+        self._client = client
+        self._client_type = client_type
+        self._registry = registry
+
+    def __getattr__(self, operation: str) -> Callable[..., Any]:
+        breaker = self._registry.get(f"{self._client_type}.{operation}")
+        func = getattr(self._client, operation)
+
+        def call(*args, **kwargs) -> Any:
+            return breaker.call(func, *args, **kwargs)
+
+        return call
@@ -0,0 +1,223 @@
+"""
+    Stream create/update/delete workload events from a JSONL file or stdin through the Stax Orchestrator.
+"""
+import argparse
+import json
+import sys
+from dataclasses import dataclass, field
+from threading import Lock
+from time import monotonic
+from typing import IO, Iterator, List, Optional, Set, Tuple
+
+from src.concurrency import RateLimiter, stream_concurrently
+from src.constants import WorkloadOperation
+from src.stax_orchestrator import StaxOrchestrator
+
+
+class InvalidEventException(Exception):
+    """Raised when an input line is not a valid workload event"""
+
+
+@dataclass
+class Progress:
+    """Thread safe counters of processed events with periodic throughput reporting."""
+
+    stream: IO = sys.stderr
+    report_interval: float = 1.0
+    counts: dict = field(default_factory=lambda: {"succeeded": 0, "failed": 0, "invalid": 0})
+    started_at: float = field(default_factory=monotonic)
+    _last_report: float = 0.0
+    _lock: Lock = field(default_factory=Lock)
+
+    def update(self, status: str, force: bool = False) -> None:
+        """Count a processed event and report progress at most once per report interval"""
+        with self._lock:
+            if status:
+                self.counts[status] = self.counts.get(status, 0) + 1
+
+            now = monotonic()
+            if force or now - self._last_report >= self.report_interval:
+                self._last_report = now
+                processed = sum(self.counts.values())
+                throughput = processed / max(now - self.started_at, 1e-9)
+                summary = ", ".join(f"{status} {count}" for status, count in self.counts.items())
+                self.stream.write(f"\rprocessed {processed} ({summary}) at {throughput:.1f} events/s")
+                self.stream.flush()
+
+
+class WorkloadEventRunner:
+    """Validate workload events and run them through the Stax Orchestrator."""
+
+    def __init__(
+        self, stax_orchestrator: StaxOrchestrator, wait_for_completion: bool = False, poll_interval: float = 10
+    ):
+        """
+        Args:
+            stax_orchestrator (StaxOrchestrator): Orchestrator used to validate and run events
+            wait_for_completion (bool): Wait for every workload task to finish and report its outcome
+            poll_interval (float): Seconds to wait between task status polls
+        """
+        self.stax_orchestrator = stax_orchestrator
+        self.wait_for_completion = wait_for_completion
+        self.poll_interval = poll_interval
+        self._existing_names: Optional[Set[str]] = None
+        self._existing_names_loaded = False
+        self._lock = Lock()
+
+    def get_existing_names(self) -> Optional[Set[str]]:
+        """Get the names of active workloads, listed once per run and shared by every create event of the run"""
+        with self._lock:
+            if not self._existing_names_loaded:
+                self._existing_names = self.stax_orchestrator.get_existing_workload_names()
+                self._existing_names_loaded = True
+
+        return self._existing_names
+
+    def run(self, event: dict) -> dict:
+        """Validate an event with the workload state machine rules and run its operation
+
+        Args:
+            event (dict): Workload state machine event
+
+        Returns:
+            dict: Workload and task IDs and, when waiting for completion, the final task status
+        """
+        try:
+            workload_event = self.stax_orchestrator.validate_workload_event(event)
+        except (KeyError, TypeError, ValueError) as error:
+            raise InvalidEventException(f"Invalid {event.get('operation')} event: {error!r}") from error
+
+        if event["operation"] == WorkloadOperation.CREATE:
+            response = self.stax_orchestrator.create_unique_workload(
+                existing_names=self.get_existing_names(),
+                **{key: value for key, value in workload_event.items() if value is not None},
+            )
+        elif event["operation"] == WorkloadOperation.UPDATE:
+            response = self.stax_orchestrator.update_workload(**workload_event)
+        elif event["operation"] == WorkloadOperation.DELETE:
+            response = self.stax_orchestrator.delete_workload(**workload_event)
+        else:
+            raise InvalidEventException(f"{event['operation']} events are not supported by the cli")
+
+        workload = response.get("Detail", {}).get("Workload", {})
+        result = {"workload_id": workload.get("WorkloadId"), "task_id": workload.get("TaskId")}
+
+        if self.wait_for_completion and result["task_id"]:
+            task_info = self.stax_orchestrator.wait_for_tasks([result["task_id"]], poll_interval=self.poll_interval)
+            result["task_status"] = task_info[result["task_id"]]["Status"]
+
+            if event["operation"] == WorkloadOperation.DELETE and result["task_status"] == "SUCCEEDED":
+                self.stax_orchestrator.release_workload_name(result["workload_id"], workload.get("Name"))
+
+        return result
+
+
+def read_events(lines: IO) -> Iterator[Tuple[int, str]]:
+    """Lazily read non empty lines of a JSONL stream with their line number"""
+    for line_number, line in enumerate(lines, start=1):
+        if line.strip():
+            yield line_number, line
+
+
+def process_events(  # pylint: disable=too-many-arguments
+    runner: WorkloadEventRunner,
+    lines: IO,
+    output: IO,
+    concurrency: int = 10,
+    requests_per_second: Optional[float] = None,
+    progress: Optional[Progress] = None,
+) -> dict:
+    """Run every event of a JSONL stream and write one JSON result per event as soon as it completes
+
+    Args:
+        runner (WorkloadEventRunner): Runner used to validate and run events
+        lines (IO): JSONL input stream
+        output (IO): JSONL output stream
+        concurrency (int): Maximum number of events processed concurrently
+        requests_per_second (Optional[float]): Maximum rate of events started per second
+        progress (Optional[Progress]): Progress reporter
+
+    Returns:
+        dict: Number of events per status
+    """
+    progress = progress or Progress()
+
+    def run(numbered_line: Tuple[int, str]) -> dict:
+        try:
+            event = json.loads(numbered_line[1])
+        except json.JSONDecodeError as error:
+            raise InvalidEventException(f"Invalid JSON: {error}") from error
+
+        if not isinstance(event, dict):
+            raise InvalidEventException("Event must be a JSON object")
+
+        return {"operation": event.get("operation"), **runner.run(event)}
+
+    for result in stream_concurrently(run, read_events(lines), concurrency, RateLimiter(requests_per_second)):
+        record = {"line": result.item[0]}
+
+        if result.error is None:
+            failed = result.result.get("task_status", "SUCCEEDED") != "SUCCEEDED"
+            record.update(status="failed" if failed else "succeeded", **result.result)
+        else:
+            invalid = isinstance(result.error, InvalidEventException)
+            record.update(status="invalid" if invalid else "failed", error=str(result.error))
+
+        output.write(json.dumps(record, default=str) + "\n")
+        output.flush()
+        progress.update(record["status"])
+
+    progress.update("", force=True)
+    progress.stream.write("\n")
+
+    return dict(progress.counts)
+
+
+def parse_args(args: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse stax-orchestrator command line arguments"""
+    parser = argparse.ArgumentParser(
+        prog="stax-orchestrator",
+        description="Create, update and delete Stax workloads from a stream of workload state machine events.",
+    )
+    parser.add_argument(
+        "input",
+        help="JSONL file of workload events, '-' reads from stdin",
+        nargs="?",
+        default="-",
+        type=argparse.FileType("r"),
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        help="JSONL file to write results to, '-' writes to stdout",
+        default="-",
+        type=argparse.FileType("a"),
+    )
+    parser.add_argument("-c", "--concurrency", help="Number of events to process concurrently", type=int, default=10)
+    parser.add_argument("--requests-per-second", help="Maximum number of events started per second", type=float)
+    parser.add_argument(
+        "--wait", help="Wait for workload tasks to finish and report their outcome", action="store_true"
+    )
+    parser.add_argument("--poll-interval", help="Seconds between task status polls", type=float, default=10)
+
+    return parser.parse_args(args)
+
+
+def main(args: Optional[List[str]] = None) -> int:
+    """stax-orchestrator console entry point
+
+    Returns:
+        int: 0 when every event succeeded else 1
+    """
+    arguments = parse_args(args)
+    runner = WorkloadEventRunner(StaxOrchestrator(), arguments.wait, arguments.poll_interval)
+
+    counts = process_events(
+        runner, arguments.input, arguments.output, arguments.concurrency, arguments.requests_per_second
+    )
+
+    return 0 if counts["failed"] == 0 and counts["invalid"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,140 @@
+"""
+    Helpers to run Stax api calls concurrently with a bounded worker pool and a rate limit.
+"""
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from dataclasses import dataclass
+from threading import BoundedSemaphore, Lock
+from time import monotonic, sleep
+from typing import Any, Callable, Dict, Hashable, Iterable, Iterator, List, Optional
+
+
+class RateLimiter:  # pylint: disable=too-few-public-methods
+    """Thread safe limiter that spaces out calls to stay within a requests per second budget."""
+
+    def __init__(self, requests_per_second: Optional[float] = None):
+        """
+        Args:
+            requests_per_second (Optional[float]): Maximum number of calls per second, None/0 disables limiting
+        """
+        self._interval = 1.0 / requests_per_second if requests_per_second else 0.0
+        self._next_slot = 0.0
+        self._lock = Lock()
+
+    def acquire(self) -> None:
+        """Block until the caller is allowed to make the next call"""
+        if not self._interval:
+            return
+
+        with self._lock:
+            now = monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self._interval
+
+        if slot > now:
+            sleep(slot - now)
+
+
+class KeyedLimiter:  # pylint: disable=too-few-public-methods
+    """Thread safe limiter capping the number of concurrent holders per key (e.g. per account or region)."""
+
+    def __init__(self, limit: Optional[int] = None):
+        """
+        Args:
+            limit (Optional[int]): Maximum number of concurrent holders per key, None/0 disables limiting
+        """
+        self._limit = limit
+        self._semaphores: Dict[Hashable, BoundedSemaphore] = {}
+        self._lock = Lock()
+
+    @contextmanager
+    def hold(self, key: Hashable) -> Iterator[None]:
+        """Block until a slot for the key is available and hold it for the duration of the context"""
+        if not self._limit:
+            yield
+            return
+
+        with self._lock:
+            semaphore = self._semaphores.setdefault(key, BoundedSemaphore(self._limit))
+
+        with semaphore:
+            yield
+
+
+@dataclass(frozen=True)
+class ConcurrentResult:
+    """Outcome of running a function against a single item."""
+
+    item: Any
+    result: Any = None
+    error: Optional[Exception] = None
+
+
+def _call(func: Callable[[Any], Any], item: Any, rate_limiter: Optional[RateLimiter]) -> ConcurrentResult:
+    if rate_limiter:
+        rate_limiter.acquire()
+    try:
+        return ConcurrentResult(item=item, result=func(item))
+    except Exception as error:  # pylint: disable=broad-except
+        return ConcurrentResult(item=item, error=error)
+
+
+def run_concurrently(
+    func: Callable[[Any], Any],
+    items: Iterable[Any],
+    max_workers: int = 10,
+    rate_limiter: Optional[RateLimiter] = None,
+) -> List[ConcurrentResult]:
+    """Run func against every item using a bounded thread pool
+
+    Exceptions are captured per item so that a single failure does not abort the remaining calls.
+
+    Args:
+        func (Callable): Function to call with each item
+        items (Iterable): Items to process
+        max_workers (int): Maximum number of concurrent calls
+        rate_limiter (Optional[RateLimiter]): Limiter acquired before every call
+
+    Returns:
+        List[ConcurrentResult]: Results in the same order as items
+    """
+    items = list(items)
+    if not items:
+        return []
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(items)))) as executor:
+        return list(executor.map(lambda item: _call(func, item, rate_limiter), items))
+
+
+def stream_concurrently(
+    func: Callable[[Any], Any],
+    items: Iterable[Any],
+    max_workers: int = 10,
+    rate_limiter: Optional[RateLimiter] = None,
+) -> Iterator[ConcurrentResult]:
+    """Run func against items lazily consumed from an iterable and yield results as they complete
+
+    At most twice max_workers items are read ahead, so arbitrarily large inputs are processed in constant memory.
+
+    Args:
+        func (Callable): Function to call with each item
+        items (Iterable): Items to process
+        max_workers (int): Maximum number of concurrent calls
+        rate_limiter (Optional[RateLimiter]): Limiter acquired before every call
+
+    Returns:
+        Iterator[ConcurrentResult]: Results in completion order
+    """
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        in_flight = set()
+
+        for item in items:
+            in_flight.add(executor.submit(_call, func, item, rate_limiter))
+
+            if len(in_flight) >= 2 * max_workers:
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                yield from (future.result() for future in done)
+
+        while in_flight:
+            done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            yield from (future.result() for future in done)
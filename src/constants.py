@@ -8,3 +8,26 @@ class WorkloadOperation(str, Enum):
     CREATE = "create"
     UPDATE = "update"
     DELETE = "delete"
+    FAN_OUT = "fan_out"
+
+
+@unique
+class RouterAction(str, Enum):
+    """Actions of the router lambda besides the workload operations"""
+
+    VALIDATE = "validate"
+    TASK_STATUS = "task_status"
+
+
+@unique
+class TaskStatus(str, Enum):
+    """Stax task statuses"""
+
+    STARTED = "STARTED"
+    PENDING = "PENDING"
+    RUNNING = "RUNNING"
+    SUCCEEDED = "SUCCEEDED"
+    FAILED = "FAILED"
+
+
+TERMINAL_TASK_STATUSES = frozenset({TaskStatus.SUCCEEDED, TaskStatus.FAILED})
@@ -0,0 +1,237 @@
+"""
+    Handler logic shared by the per operation lambdas and the router lambda.
+"""
+import logging
+from functools import lru_cache
+from time import time
+from typing import Optional
+
+from src.constants import TERMINAL_TASK_STATUSES
+
+# Orchestrator, payload, metric and ingestion modules are imported and their objects built on first use, so every
+# handler only loads what its own invocations need
+
+
+def get_stax_orchestrator() -> "StaxOrchestrator":
+    """Create a StaxOrchestrator, its Stax clients are shared by every orchestrator of the process"""
+    from src.stax_orchestrator import StaxOrchestrator  # pylint: disable=import-outside-toplevel
+
+    return StaxOrchestrator()
+
+
+@lru_cache(maxsize=None)
+def get_task_duration_recorder() -> Optional["TaskDurationRecorder"]:
+    """Get the process wide task duration recorder, None unless TASK_METRICS_LOCATION is set"""
+    from src.task_metrics import TaskDurationRecorder  # pylint: disable=import-outside-toplevel
+
+    return TaskDurationRecorder.from_environment()
+
+
+@lru_cache(maxsize=None)
+def get_task_info_compactor() -> "PayloadCompactor":
+    """Get the process wide compactor of task status responses (TASK_INFO_FIELDS)"""
+    # pylint: disable=import-outside-toplevel
+    from src.payloads import TASK_INFO_REQUIRED_FIELDS, PayloadCompactor
+
+    return PayloadCompactor.from_environment("TASK_INFO_FIELDS", TASK_INFO_REQUIRED_FIELDS)
+
+
+@lru_cache(maxsize=None)
+def get_workload_response_compactor() -> "PayloadCompactor":
+    """Get the process wide compactor of create/update/delete workload responses (WORKLOAD_RESPONSE_FIELDS)"""
+    # pylint: disable=import-outside-toplevel
+    from src.payloads import WORKLOAD_RESPONSE_REQUIRED_FIELDS, PayloadCompactor
+
+    return PayloadCompactor.from_environment("WORKLOAD_RESPONSE_FIELDS", WORKLOAD_RESPONSE_REQUIRED_FIELDS)
+
+
+@lru_cache(maxsize=None)
+def get_workload_event_dispatcher() -> Optional["MicroBatchDispatcher"]:
+    """Get the process wide dispatcher of queued workload events, None unless WORKLOAD_STATE_MACHINE_ARN is set"""
+    # pylint: disable=import-outside-toplevel
+    from src.ingestion import MicroBatchDispatcher, WorkloadExecutionStarter
+
+    workload_execution_starter = WorkloadExecutionStarter.from_environment()
+    if workload_execution_starter is None:
+        return None
+
+    return MicroBatchDispatcher.from_environment(
+        workload_execution_starter.start, lambda event: get_stax_orchestrator().validate_workload_event(event)
+    )
+
+
+def validate_input(event: dict) -> dict:
+    """Validate input to workload state machine
+
+    Args:
+        event (dict): Details about the workload to be deployed/updated/deleted
+
+    Returns:
+        WorkloadEvent: Details about the catalogue, workload and account
+
+    Raises:
+        KeyError: Raised when required event arguments are not present
+        ValueError: Raised when the operation is not supported
+    """
+    return get_stax_orchestrator().validate_workload_event(event)
+
+
+def stamp_task_start(response: dict, catalogue_id: Optional[str] = None, region: Optional[str] = None) -> dict:
+    """Stamp the start of the task of a create/update/delete workload response, task durations are measured from it
+
+    The catalogue and region of the workload are passed on to the task watcher with the task, so recording the task
+    duration does not need to read the workload again.
+
+    Args:
+        response (dict): Create, update or delete workload response
+        catalogue_id (Optional[str]): Catalogue of the workload, when the response does not contain it
+        region (Optional[str]): AWS region of the workload, when the response does not contain it
+
+    Returns:
+        dict: The response with Detail.Workload.TaskStartedAt set to the current time
+    """
+    workload = response.get("Detail", {}).get("Workload")
+    if isinstance(workload, dict):
+        workload["TaskStartedAt"] = time()
+        workload["CatalogueId"] = workload.get("CatalogueId") or catalogue_id
+        workload["Region"] = workload.get("Region") or region
+
+    return response
+
+
+def create_workload(event: dict) -> dict:
+    """Create a Stax workload unless a workload with the same name already exists
+
+    Args:
+        event (dict): Validated create workload event
+
+    Returns:
+        dict: Projected response data containing workload and task information
+
+    Raises:
+        WorkloadWithNameAlreadyExistsException: Raised when a workload with the same name already exists
+    """
+    response = get_stax_orchestrator().create_unique_workload(**event)
+
+    return get_workload_response_compactor().compact(
+        stamp_task_start(response, event.get("catalogue_id"), event.get("aws_region"))
+    )
+
+
+def update_workload(event: dict) -> dict:
+    """Update a Stax workload
+
+    Args:
+        event (dict): Validated update workload event
+
+    Returns:
+        dict: Projected response data containing workload and task information
+    """
+    response = get_stax_orchestrator().update_workload(**event)
+
+    return get_workload_response_compactor().compact(stamp_task_start(response))
+
+
+def delete_workload(event: dict) -> dict:
+    """Delete a Stax workload
+
+    Args:
+        event (dict): Validated delete workload event
+
+    Returns:
+        dict: Projected response data containing workload and task information
+    """
+    response = get_stax_orchestrator().delete_workload(**event)
+
+    return get_workload_response_compactor().compact(stamp_task_start(response))
+
+
+def record_task_duration(stax_orchestrator: "StaxOrchestrator", event: dict) -> None:
+    """Record the duration of a finished task per operation, catalogue and region
+
+    The workload is only read from Stax when the task watcher was not given its catalogue and region.
+
+    Args:
+        stax_orchestrator (StaxOrchestrator): Orchestrator used to look up the workload of the task
+        event (dict): Event data containing workload, task and timing information
+    """
+    try:
+        catalogue_id, region = event.get("catalogue_id"), event.get("aws_region")
+        if not catalogue_id or not region:
+            workload = stax_orchestrator.get_workload(event["workload_id"])
+            catalogue_id, region = catalogue_id or workload.get("CatalogueId"), region or workload.get("Region")
+
+        get_task_duration_recorder().record(
+            event.get("operation", "unknown"),
+            catalogue_id or "unknown",
+            region or "unknown",
+            (time() - event["task_started_at"]) * 1000,
+            task_id=event["task_id"],
+        )
+    except Exception:  # pylint: disable=broad-except
+        logging.exception("Failed to record duration of task %s", event["task_id"])
+
+
+def release_deleted_workload_name(stax_orchestrator: "StaxOrchestrator", event: dict) -> None:
+    """Release the reserved name of a workload whose delete task succeeded
+
+    Failures are only logged, a name left reserved is taken over by the next claim once its workload is DELETED.
+
+    Args:
+        stax_orchestrator (StaxOrchestrator): Orchestrator holding the workload name reservations
+        event (dict): Event data containing the workload name and ID
+    """
+    try:
+        stax_orchestrator.release_workload_name(event["workload_id"], event.get("workload_name"))
+    except Exception:  # pylint: disable=broad-except
+        logging.exception("Failed to release the name of deleted workload %s", event["workload_id"])
+
+
+def get_task_status(event: dict) -> dict:
+    """Poll for a Stax workload task status
+
+    The name of a deleted workload is only released once its delete task succeeded.
+
+    Args:
+        event (dict): Event data containing workload and task ID
+
+    Returns:
+        dict: Event including the projected task status
+    """
+    stax_orchestrator = get_stax_orchestrator()
+
+    event.setdefault("task_started_at", time())
+    task_info = stax_orchestrator.get_task_status(event["task_id"])
+    event["task_info"] = get_task_info_compactor().compact(task_info)
+
+    if get_task_duration_recorder() and task_info.get("Status") in TERMINAL_TASK_STATUSES:
+        record_task_duration(stax_orchestrator, event)
+
+    if event.get("operation") == "delete" and task_info.get("Status") == "SUCCEEDED":
+        release_deleted_workload_name(stax_orchestrator, event)
+
+    return event
+
+
+def ingest_workload_events(event: dict) -> dict:
+    """Start workload state machine executions for a micro-batch of queued workload events
+
+    Args:
+        event (dict): SQS event with the queued workload events as records
+
+    Returns:
+        dict: Batch item failures, only events whose execution could not be started are received again
+
+    Raises:
+        ValueError: Raised when WORKLOAD_STATE_MACHINE_ARN is not set
+    """
+    workload_event_dispatcher = get_workload_event_dispatcher()
+    if workload_event_dispatcher is None:
+        raise ValueError("WORKLOAD_STATE_MACHINE_ARN is not set")
+
+    report = workload_event_dispatcher.dispatch([(record["messageId"], record["body"]) for record in event["Records"]])
+
+    for rejected in report["Rejected"]:
+        logging.error("Dropped invalid workload event %s: %s", rejected["MessageId"], rejected["Error"])
+
+    return {"batchItemFailures": [{"itemIdentifier": failure["MessageId"]} for failure in report["Failed"]]}
@@ -0,0 +1,361 @@
+"""
+    Buffer workload events in an SQS compatible queue and start workload executions in priority ordered micro-batches.
+"""
+import json
+from math import ceil
+from os import environ
+from threading import Lock
+from time import monotonic
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from uuid import uuid4
+
+from src.concurrency import RateLimiter, run_concurrently
+from src.constants import WorkloadOperation
+
+# SQS accepts at most 10 entries per batch request
+MAX_QUEUE_BATCH_SIZE = 10
+
+# Events with a lower priority are started first, deletes free accounts and capacity for the creates behind them
+OPERATION_PRIORITIES = {
+    WorkloadOperation.DELETE: 0,
+    WorkloadOperation.UPDATE: 1,
+    WorkloadOperation.CREATE: 2,
+    WorkloadOperation.FAN_OUT: 3,
+}
+DEFAULT_PRIORITY = len(OPERATION_PRIORITIES)
+
+Message = Tuple[str, str]
+
+
+def get_priority(event: dict) -> int:
+    """Get the priority of a workload event, an integer priority in the event overrides the one of its operation"""
+    priority = event.get("priority")
+    if isinstance(priority, int) and not isinstance(priority, bool):
+        return priority
+
+    return OPERATION_PRIORITIES.get(event.get("operation"), DEFAULT_PRIORITY)
+
+
+def concurrency_for_rate(requests_per_second: float, latency_seconds: float) -> int:
+    """Get the number of concurrent calls needed to sustain a request rate (Little's law)
+
+    Args:
+        requests_per_second (float): Request rate to sustain
+        latency_seconds (float): Average duration of a call
+
+    Returns:
+        int: Number of workers, at least 1
+    """
+    return max(1, ceil(requests_per_second * latency_seconds))
+
+
+def is_error_code(error: Exception, code: str) -> bool:
+    """Check if a botocore or local client error has an error code"""
+    return getattr(error, "response", {}).get("Error", {}).get("Code") == code
+
+
+class LocalQueue:
+    """Thread safe in-memory stand in for the send_message_batch, receive_message and delete_message_batch
+    operations of an SQS client.
+
+    Received messages are invisible until they are deleted or their visibility timeout expires.
+    """
+
+    def __init__(self, visibility_timeout: float = 30):
+        """
+        Args:
+            visibility_timeout (float): Seconds a received message stays invisible unless the receive overrides it
+        """
+        self.visibility_timeout = visibility_timeout
+        self._queues: Dict[str, List[dict]] = {}
+        self._lock = Lock()
+
+    def send_message_batch(self, QueueUrl: str, Entries: List[dict]) -> dict:  # pylint: disable=invalid-name
+        """Append messages to the queue"""
+        successful = []
+
+        with self._lock:
+            queue = self._queues.setdefault(QueueUrl, [])
+            for entry in Entries:
+                message = {"MessageId": str(uuid4()), "Body": entry["MessageBody"], "visible_at": 0.0}
+                queue.append(message)
+                successful.append({"Id": entry["Id"], "MessageId": message["MessageId"]})
+
+        return {"Successful": successful, "Failed": []}
+
+    def receive_message(  # pylint: disable=invalid-name
+        self, QueueUrl: str, MaxNumberOfMessages: int = 1, VisibilityTimeout: Optional[float] = None, **_
+    ) -> dict:
+        """Receive the oldest visible messages, the response has no Messages when none are visible"""
+        now = monotonic()
+        visibility_timeout = self.visibility_timeout if VisibilityTimeout is None else VisibilityTimeout
+        messages = []
+
+        with self._lock:
+            for message in self._queues.get(QueueUrl, []):
+                if len(messages) == MaxNumberOfMessages:
+                    break
+                if message["visible_at"] <= now:
+                    message["visible_at"] = now + visibility_timeout
+                    message["ReceiptHandle"] = str(uuid4())
+                    messages.append({key: message[key] for key in ("MessageId", "ReceiptHandle", "Body")})
+
+        return {"Messages": messages} if messages else {}
+
+    def delete_message_batch(self, QueueUrl: str, Entries: List[dict]) -> dict:  # pylint: disable=invalid-name
+        """Delete received messages by their receipt handle"""
+        entries = {entry["ReceiptHandle"]: entry["Id"] for entry in Entries}
+
+        with self._lock:
+            queue = self._queues.get(QueueUrl, [])
+            deleted = [message["ReceiptHandle"] for message in queue if message.get("ReceiptHandle") in entries]
+            self._queues[QueueUrl] = [message for message in queue if message.get("ReceiptHandle") not in entries]
+
+        return {
+            "Successful": [{"Id": entries[handle]} for handle in deleted],
+            "Failed": [
+                {"Id": entry_id, "Code": "ReceiptHandleIsInvalid", "SenderFault": True}
+                for handle, entry_id in entries.items()
+                if handle not in deleted
+            ],
+        }
+
+
+class IngestionQueue:
+    """Send validated workload events to an SQS compatible queue and receive them in micro-batches."""
+
+    def __init__(self, queue_url: str, client: Any = None):
+        """
+        Args:
+            queue_url (str): URL of the queue
+            client (Any): SQS client or LocalQueue, a boto3 client is created on first use when None
+        """
+        self.queue_url = queue_url
+        self._client = client
+
+    @classmethod
+    def from_environment(cls) -> Optional["IngestionQueue"]:
+        """Create a queue for WORKLOAD_INGESTION_QUEUE_URL, None if ingestion is disabled"""
+        queue_url = environ.get("WORKLOAD_INGESTION_QUEUE_URL")
+
+        return cls(queue_url) if queue_url else None
+
+    @property
+    def client(self) -> Any:
+        """SQS compatible client"""
+        if self._client is None:
+            import boto3  # pylint: disable=import-outside-toplevel
+
+            self._client = boto3.client("sqs")
+
+        return self._client
+
+    def submit(self, events: Sequence[dict], validate: Callable[[dict], Any]) -> dict:
+        """Validate workload events and send the valid ones in batches of 10
+
+        Args:
+            events (Sequence[dict]): Workload state machine events
+            validate (Callable): Raises KeyError, TypeError or ValueError for invalid events
+
+        Returns:
+            dict: IDs of the accepted messages, rejected and failed events with their index and error
+        """
+        entries, rejected = [], []
+
+        for index, event in enumerate(events):
+            try:
+                validate(event)
+            except (KeyError, TypeError, ValueError) as error:
+                rejected.append({"Index": index, "Error": repr(error)})
+                continue
+            entries.append({"Id": str(index), "MessageBody": json.dumps(event, default=str)})
+
+        accepted, failed = [], []
+        for start in range(0, len(entries), MAX_QUEUE_BATCH_SIZE):
+            response = self.client.send_message_batch(
+                QueueUrl=self.queue_url, Entries=entries[start : start + MAX_QUEUE_BATCH_SIZE]
+            )
+            accepted.extend(entry["MessageId"] for entry in response.get("Successful", []))
+            failed.extend(
+                {"Index": int(entry["Id"]), "Error": entry.get("Message", entry["Code"])}
+                for entry in response.get("Failed", [])
+            )
+
+        return {"Accepted": accepted, "Rejected": rejected, "Failed": failed}
+
+    def receive(self, max_messages: int = MAX_QUEUE_BATCH_SIZE) -> List[dict]:
+        """Receive a micro-batch of up to max_messages visible messages
+
+        Args:
+            max_messages (int): Maximum number of messages, received with one call per 10 messages
+
+        Returns:
+            List[dict]: Messages with their MessageId, ReceiptHandle and Body
+        """
+        messages: List[dict] = []
+
+        while len(messages) < max_messages:
+            received = self.client.receive_message(
+                QueueUrl=self.queue_url, MaxNumberOfMessages=min(MAX_QUEUE_BATCH_SIZE, max_messages - len(messages))
+            ).get("Messages", [])
+            if not received:
+                break
+            messages.extend(received)
+
+        return messages
+
+    def delete(self, messages: Sequence[dict]) -> None:
+        """Delete processed messages in batches of 10"""
+        for start in range(0, len(messages), MAX_QUEUE_BATCH_SIZE):
+            self.client.delete_message_batch(
+                QueueUrl=self.queue_url,
+                Entries=[
+                    {"Id": str(index), "ReceiptHandle": message["ReceiptHandle"]}
+                    for index, message in enumerate(messages[start : start + MAX_QUEUE_BATCH_SIZE])
+                ],
+            )
+
+    def process(self, dispatcher: "MicroBatchDispatcher", batch_size: int = 50) -> dict:
+        """Dispatch a micro-batch of queued events and delete the started and rejected ones
+
+        Args:
+            dispatcher (MicroBatchDispatcher): Dispatcher that starts the workload executions
+            batch_size (int): Maximum number of events in the micro-batch
+
+        Returns:
+            dict: Report of the dispatcher, failed events stay in the queue and are received again
+        """
+        messages = self.receive(batch_size)
+        report = dispatcher.dispatch([(message["MessageId"], message["Body"]) for message in messages])
+
+        failed = {failure["MessageId"] for failure in report["Failed"]}
+        self.delete([message for message in messages if message["MessageId"] not in failed])
+
+        return report
+
+
+class WorkloadExecutionStarter:  # pylint: disable=too-few-public-methods
+    """Start workload state machine executions named after the queued message, so redelivered messages do not
+    start a second execution."""
+
+    def __init__(self, state_machine_arn: str, client: Any = None):
+        """
+        Args:
+            state_machine_arn (str): ARN of the workload state machine
+            client (Any): Step Functions client, a boto3 client is created on first use when None
+        """
+        self.state_machine_arn = state_machine_arn
+        self._client = client
+
+    @classmethod
+    def from_environment(cls) -> Optional["WorkloadExecutionStarter"]:
+        """Create a starter for WORKLOAD_STATE_MACHINE_ARN, None if it is not set"""
+        state_machine_arn = environ.get("WORKLOAD_STATE_MACHINE_ARN")
+
+        return cls(state_machine_arn) if state_machine_arn else None
+
+    @property
+    def client(self) -> Any:
+        """Step Functions client"""
+        if self._client is None:
+            import boto3  # pylint: disable=import-outside-toplevel
+
+            self._client = boto3.client("stepfunctions")
+
+        return self._client
+
+    def start(self, message_id: str, event: dict) -> Optional[str]:
+        """Start a workload execution for a queued event
+
+        Returns:
+            Optional[str]: ARN of the execution, None when it was already started for the message
+        """
+        try:
+            return self.client.start_execution(
+                stateMachineArn=self.state_machine_arn, name=message_id, input=json.dumps(event, default=str)
+            )["executionArn"]
+        except Exception as error:
+            if is_error_code(error, "ExecutionAlreadyExists"):
+                return None
+            raise
+
+
+class MicroBatchDispatcher:  # pylint: disable=too-few-public-methods
+    """Validate micro-batches of queued workload events and start them in priority order within a rate budget.
+
+    The worker pool is sized to sustain the rate budget at the expected call latency, so bursts are drained as
+    fast as Stax allows without being throttled.
+    """
+
+    def __init__(
+        self,
+        start: Callable[[str, dict], Any],
+        validate: Callable[[dict], Any],
+        requests_per_second: float = 5,
+        latency_seconds: float = 1,
+    ):
+        """
+        Args:
+            start (Callable): Called with the message ID and event to start its workload execution
+            validate (Callable): Raises KeyError, TypeError or ValueError for invalid events
+            requests_per_second (float): Maximum rate of started events
+            latency_seconds (float): Average duration of a start call
+        """
+        self.start = start
+        self.validate = validate
+        self.max_workers = concurrency_for_rate(requests_per_second, latency_seconds)
+        self.rate_limiter = RateLimiter(requests_per_second)
+
+    @classmethod
+    def from_environment(
+        cls, start: Callable[[str, dict], Any], validate: Callable[[dict], Any]
+    ) -> "MicroBatchDispatcher":
+        """Create a dispatcher sharing the Stax rate budget with the other concurrent dispatchers
+
+        INGESTION_REQUESTS_PER_SECOND is the budget of all dispatchers, every one of the
+        INGESTION_MAXIMUM_CONCURRENCY concurrent dispatchers gets an equal share.
+        """
+        requests_per_second = float(environ.get("INGESTION_REQUESTS_PER_SECOND", 5))
+        maximum_concurrency = int(environ.get("INGESTION_MAXIMUM_CONCURRENCY", 1))
+
+        return cls(
+            start,
+            validate,
+            requests_per_second / max(maximum_concurrency, 1),
+            float(environ.get("INGESTION_LATENCY_SECONDS", 1)),
+        )
+
+    def dispatch(self, messages: Sequence[Message]) -> dict:
+        """Validate a micro-batch of messages and start the valid events, lowest priority first
+
+        Args:
+            messages (Sequence[Message]): Message ID and JSON body of every queued event
+
+        Returns:
+            dict: Started message IDs, rejected invalid events and failed starts with their message ID and error
+        """
+        events, rejected = [], []
+
+        for message_id, body in messages:
+            try:
+                event = json.loads(body)
+                if not isinstance(event, dict):
+                    raise TypeError("Event must be a JSON object")
+                self.validate(event)
+            except (KeyError, TypeError, ValueError) as error:
+                rejected.append({"MessageId": message_id, "Error": repr(error)})
+                continue
+            events.append((message_id, event))
+
+        events.sort(key=lambda message: get_priority(message[1]))
+        results = run_concurrently(
+            lambda message: self.start(*message), events, max_workers=self.max_workers, rate_limiter=self.rate_limiter
+        )
+
+        return {
+            "Started": [result.item[0] for result in results if result.error is None],
+            "Rejected": rejected,
+            "Failed": [
+                {"MessageId": result.item[0], "Error": str(result.error)} for result in results if result.error
+            ],
+        }
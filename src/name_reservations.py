@@ -0,0 +1,303 @@
+"""
+    Race free reservation of unique workload names with conditional writes to DynamoDB or an in-memory table.
+"""
+import re
+from os import environ
+from threading import Lock
+from time import time
+from typing import Any, Dict, Optional
+from uuid import uuid4
+
+CONDITIONAL_CHECK_FAILED = "ConditionalCheckFailedException"
+NAME_ATTRIBUTE = "workload_name"
+CONDITION_CLAUSE = re.compile(
+    r"^attribute_not_exists\((?P<missing>[#\w]+)\)$|^(?P<attribute>[#\w]+)\s*(?P<operator>=|<)\s*(?P<value>:\w+)$"
+)
+
+
+class ConditionalCheckFailedException(Exception):
+    """Raised by LocalConditionalTable when a condition is not met, with the error response of the botocore error"""
+
+    def __init__(self, message: str = "The conditional request failed"):
+        super().__init__(message)
+        self.response = {"Error": {"Code": CONDITIONAL_CHECK_FAILED, "Message": message}}
+
+
+class NameAlreadyReservedException(Exception):
+    """Raised when a name is already reserved"""
+
+
+def is_conditional_check_failure(error: Exception) -> bool:
+    """Check if an error of DynamoDB or LocalConditionalTable was caused by a condition that was not met"""
+    return getattr(error, "response", {}).get("Error", {}).get("Code") == CONDITIONAL_CHECK_FAILED
+
+
+def _scalar(attribute_value: Dict[str, str]) -> Any:
+    if "N" in attribute_value:
+        return float(attribute_value["N"])
+
+    return attribute_value.get("S")
+
+
+class LocalConditionalTable:
+    """Thread safe in-memory stand in for the put_item, get_item and delete_item operations of a DynamoDB client.
+
+    Items use the DynamoDB attribute value format. Condition expressions are limited to OR joined clauses of
+    attribute_not_exists(attribute) and comparisons (= or <) of an attribute with a value placeholder.
+    """
+
+    def __init__(self, key_attribute: str = NAME_ATTRIBUTE):
+        """
+        Args:
+            key_attribute (str): Name of the partition key attribute of every table
+        """
+        self.key_attribute = key_attribute
+        self._tables: Dict[str, Dict[Any, dict]] = {}
+        self._lock = Lock()
+
+    @staticmethod
+    def _matches(item: Optional[dict], condition: Optional[str], names: dict, values: dict) -> bool:
+        if not condition:
+            return True
+
+        for clause in condition.split(" OR "):
+            match = CONDITION_CLAUSE.match(clause.strip())
+            if match is None:
+                raise ValueError(f"Unsupported condition expression {clause}")
+
+            if match["missing"]:
+                if item is None or names.get(match["missing"], match["missing"]) not in item:
+                    return True
+                continue
+
+            attribute = (item or {}).get(names.get(match["attribute"], match["attribute"]))
+            if attribute is None:
+                continue
+
+            actual, expected = _scalar(attribute), _scalar(values[match["value"]])
+            if actual == expected if match["operator"] == "=" else actual < expected:
+                return True
+
+        return False
+
+    def _write(self, table_name: str, key: dict, item: Optional[dict], **condition) -> None:
+        with self._lock:
+            table = self._tables.setdefault(table_name, {})
+            key_value = _scalar(key[self.key_attribute])
+
+            if not self._matches(
+                table.get(key_value),
+                condition.get("ConditionExpression"),
+                condition.get("ExpressionAttributeNames") or {},
+                condition.get("ExpressionAttributeValues") or {},
+            ):
+                raise ConditionalCheckFailedException()
+
+            if item is None:
+                table.pop(key_value, None)
+            else:
+                table[key_value] = dict(item)
+
+    def put_item(self, TableName: str, Item: dict, **condition) -> dict:  # pylint: disable=invalid-name
+        """Write an item when the condition expression is met
+
+        Raises:
+            ConditionalCheckFailedException: Raised when the condition expression is not met
+        """
+        self._write(TableName, Item, Item, **condition)
+        return {}
+
+    def delete_item(self, TableName: str, Key: dict, **condition) -> dict:  # pylint: disable=invalid-name
+        """Delete an item when the condition expression is met
+
+        Raises:
+            ConditionalCheckFailedException: Raised when the condition expression is not met
+        """
+        self._write(TableName, Key, None, **condition)
+        return {}
+
+    def get_item(self, TableName: str, Key: dict, **_) -> dict:  # pylint: disable=invalid-name
+        """Read an item, the response has no Item when it does not exist"""
+        with self._lock:
+            item = self._tables.get(TableName, {}).get(_scalar(Key[self.key_attribute]))
+
+        return {"Item": dict(item)} if item is not None else {}
+
+
+class NameReservations:
+    """Claim unique names with conditional writes so concurrent creates cannot both pass a name check.
+
+    A claim is pending until it is confirmed with the ID of the created workload. Pending claims expire after
+    claim_ttl_seconds, so a create that crashed between claiming and confirming does not hold the name forever.
+    """
+
+    def __init__(self, table_name: str, client: Any = None, claim_ttl_seconds: float = 900):
+        """
+        Args:
+            table_name (str): Name of the table keyed by workload_name
+            client (Any): DynamoDB client or LocalConditionalTable, a boto3 client is created on first use when None
+            claim_ttl_seconds (float): Seconds an unconfirmed claim holds a name
+        """
+        self.table_name = table_name
+        self.claim_ttl_seconds = claim_ttl_seconds
+        self._client = client
+
+    @classmethod
+    def from_environment(cls) -> Optional["NameReservations"]:
+        """Create reservations for the table in WORKLOAD_NAME_TABLE, None if reservations are disabled"""
+        table_name = environ.get("WORKLOAD_NAME_TABLE")
+
+        if not table_name:
+            return None
+
+        return cls(table_name, claim_ttl_seconds=float(environ.get("WORKLOAD_NAME_CLAIM_TTL_SECONDS", 900)))
+
+    @property
+    def client(self) -> Any:
+        """DynamoDB compatible client used for conditional writes"""
+        if self._client is None:
+            import boto3  # pylint: disable=import-outside-toplevel
+
+            self._client = boto3.client("dynamodb")
+
+        return self._client
+
+    def claim(self, name: str) -> str:
+        """Claim a name that is not reserved or whose pending claim expired
+
+        Args:
+            name (str): Name to claim
+
+        Returns:
+            str: Token of the claim, required to confirm or release it
+
+        Raises:
+            NameAlreadyReservedException: Raised when the name is already reserved
+        """
+        token = str(uuid4())
+        now = time()
+
+        try:
+            self.client.put_item(
+                TableName=self.table_name,
+                Item={
+                    NAME_ATTRIBUTE: {"S": name},
+                    "token": {"S": token},
+                    "status": {"S": "PENDING"},
+                    "expires_at": {"N": str(int(now + self.claim_ttl_seconds))},
+                },
+                ConditionExpression="attribute_not_exists(#name) OR #expires_at < :now",
+                ExpressionAttributeNames={"#name": NAME_ATTRIBUTE, "#expires_at": "expires_at"},
+                ExpressionAttributeValues={":now": {"N": str(int(now))}},
+            )
+        except Exception as error:
+            if is_conditional_check_failure(error):
+                raise NameAlreadyReservedException(f"Name {name} is already reserved") from error
+            raise
+
+        return token
+
+    def confirm(self, name: str, token: str, workload_id: str) -> None:
+        """Hold a claimed name until the workload is deleted
+
+        Args:
+            name (str): Claimed name
+            token (str): Token returned by claim
+            workload_id (str): ID of the workload created with the name
+
+        Raises:
+            NameAlreadyReservedException: Raised when the claim expired and the name was claimed again
+            ValueError: Raised when there is no workload ID to hold the name for
+        """
+        if not workload_id:
+            raise ValueError(f"Claim of name {name} can not be confirmed without a workload ID")
+
+        try:
+            self.client.put_item(
+                TableName=self.table_name,
+                Item={
+                    NAME_ATTRIBUTE: {"S": name},
+                    "token": {"S": token},
+                    "status": {"S": "ACTIVE"},
+                    "workload_id": {"S": str(workload_id)},
+                },
+                ConditionExpression="#token = :token",
+                ExpressionAttributeNames={"#token": "token"},
+                ExpressionAttributeValues={":token": {"S": token}},
+            )
+        except Exception as error:
+            if is_conditional_check_failure(error):
+                raise NameAlreadyReservedException(f"Claim of name {name} expired") from error
+            raise
+
+    def reserve(self, name: str, workload_id: str) -> bool:
+        """Reserve the name of an existing workload unless the name is already reserved
+
+        Returns:
+            bool: True when the name was reserved, False when it already was
+
+        Raises:
+            ValueError: Raised when there is no workload ID to hold the name for
+        """
+        if not workload_id:
+            raise ValueError(f"Name {name} can not be reserved without a workload ID")
+
+        try:
+            self.client.put_item(
+                TableName=self.table_name,
+                Item={
+                    NAME_ATTRIBUTE: {"S": name},
+                    "token": {"S": str(uuid4())},
+                    "status": {"S": "ACTIVE"},
+                    "workload_id": {"S": str(workload_id)},
+                },
+                ConditionExpression="attribute_not_exists(#name)",
+                ExpressionAttributeNames={"#name": NAME_ATTRIBUTE},
+            )
+        except Exception as error:
+            if is_conditional_check_failure(error):
+                return False
+            raise
+
+        return True
+
+    def get_workload_id(self, name: str) -> Optional[str]:
+        """Get the ID of the workload a name is reserved for
+
+        Args:
+            name (str): Reserved name
+
+        Returns:
+            Optional[str]: Workload ID, None when the name is not reserved or only claimed
+        """
+        item = self.client.get_item(TableName=self.table_name, Key={NAME_ATTRIBUTE: {"S": name}}).get("Item") or {}
+
+        return item.get("workload_id", {}).get("S") if item.get("status", {}).get("S") == "ACTIVE" else None
+
+    def release(self, name: str, token: Optional[str] = None, workload_id: Optional[str] = None) -> bool:
+        """Release a name claimed with a token or reserved for a workload
+
+        Args:
+            name (str): Reserved name
+            token (Optional[str]): Only release the claim with this token
+            workload_id (Optional[str]): Only release the name when it is reserved for this workload
+
+        Returns:
+            bool: True when the name was released, False when it is held by another claim or workload
+        """
+        attribute, value = ("token", token) if token else ("workload_id", workload_id)
+
+        try:
+            self.client.delete_item(
+                TableName=self.table_name,
+                Key={NAME_ATTRIBUTE: {"S": name}},
+                ConditionExpression="#attribute = :value",
+                ExpressionAttributeNames={"#attribute": attribute},
+                ExpressionAttributeValues={":value": {"S": str(value)}},
+            )
+        except Exception as error:
+            if is_conditional_check_failure(error):
+                return False
+            raise
+
+        return True
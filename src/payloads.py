@@ -0,0 +1,140 @@
+"""
+    Keep state machine payloads small by projecting Stax responses and offloading large ones to an object store.
+"""
+import json
+from os import environ
+from typing import Optional, Sequence
+from uuid import uuid4
+
+from src.storage import read_object, write_object
+
+ALL_FIELDS = "*"
+CLAIM_CHECK_KEY = "PayloadLocation"
+PAYLOAD_OFFLOAD_LOCATION = "PAYLOAD_OFFLOAD_LOCATION"
+PAYLOAD_OFFLOAD_THRESHOLD_BYTES = "PAYLOAD_OFFLOAD_THRESHOLD_BYTES"
+
+# Fields the state machines read from ReadTask responses and create/update/delete workload responses
+TASK_INFO_REQUIRED_FIELDS = ("TaskId", "Status")
+WORKLOAD_RESPONSE_REQUIRED_FIELDS = (
+    "Detail.Workload.Name",
+    "Detail.Workload.WorkloadId",
+    "Detail.Workload.TaskId",
+    "Detail.Workload.TaskStartedAt",
+    "Detail.Workload.CatalogueId",
+    "Detail.Workload.Region",
+)
+
+
+def payload_size(payload: dict) -> int:
+    """Get the size in bytes of a payload serialised to JSON"""
+    return len(json.dumps(payload, default=str).encode())
+
+
+def project(payload: dict, fields: Sequence[str]) -> dict:
+    """Copy the fields of a payload given as dotted paths, missing fields are skipped
+
+    Args:
+        payload (dict): Payload to project
+        fields (Sequence[str]): Dotted paths of the fields to keep (for e.g, Detail.Workload.TaskId), * keeps all fields
+
+    Returns:
+        dict: New payload with only the given fields
+    """
+    if ALL_FIELDS in fields:
+        return dict(payload)
+
+    projected: dict = {}
+
+    for field in fields:
+        keys = field.split(".")
+        value = payload
+
+        for key in keys:
+            if not isinstance(value, dict) or key not in value:
+                break
+            value = value[key]
+        else:
+            target = projected
+            for key in keys[:-1]:
+                target = target.setdefault(key, {})
+            target[keys[-1]] = value
+
+    return projected
+
+
+def load_payload(payload: dict) -> dict:
+    """Get the full payload behind a claim check, payloads that were not offloaded are returned as is"""
+    if CLAIM_CHECK_KEY not in payload:
+        return payload
+
+    return json.loads(read_object(payload[CLAIM_CHECK_KEY]))
+
+
+class PayloadCompactor:  # pylint: disable=too-few-public-methods
+    """Project payloads to the configured fields and offload payloads above a size threshold (claim check).
+
+    The full payload of an offloaded response is written to the offload location and its URL is kept in the
+    projected payload under PayloadLocation. When the projection itself is above the threshold only the
+    required fields are kept.
+    """
+
+    def __init__(
+        self,
+        fields: Sequence[str],
+        required_fields: Sequence[str],
+        offload_location: Optional[str] = None,
+        threshold_bytes: int = 65536,
+    ):
+        """
+        Args:
+            fields (Sequence[str]): Dotted paths of the fields to keep, * keeps all fields
+            required_fields (Sequence[str]): Fields that are always kept because the state machines read them
+            offload_location (Optional[str]): Local directory or s3://bucket/prefix url, None disables offloading
+            threshold_bytes (int): Payloads larger than this are offloaded
+        """
+        self.fields = tuple(fields)
+        self.required_fields = tuple(required_fields)
+        self.offload_location = offload_location
+        self.threshold_bytes = threshold_bytes
+
+    @classmethod
+    def from_environment(cls, fields_variable: str, required_fields: Sequence[str]) -> "PayloadCompactor":
+        """Create a compactor configured by environment variables
+
+        Args:
+            fields_variable (str): Environment variable with comma separated fields to keep, defaults to required_fields
+            required_fields (Sequence[str]): Fields that are always kept
+
+        Returns:
+            PayloadCompactor: Compactor offloading to PAYLOAD_OFFLOAD_LOCATION above PAYLOAD_OFFLOAD_THRESHOLD_BYTES
+        """
+        fields = [field.strip() for field in environ.get(fields_variable, "").split(",") if field.strip()]
+
+        return cls(
+            fields or required_fields,
+            required_fields,
+            environ.get(PAYLOAD_OFFLOAD_LOCATION) or None,
+            int(environ.get(PAYLOAD_OFFLOAD_THRESHOLD_BYTES, 65536)),
+        )
+
+    def compact(self, payload: dict) -> dict:
+        """Project a payload and offload it when it is above the size threshold
+
+        Args:
+            payload (dict): Stax response
+
+        Returns:
+            dict: Projected payload, with a PayloadLocation reference when the full payload was offloaded
+        """
+        compacted = project(payload, self.fields + self.required_fields)
+
+        if not self.offload_location or payload_size(payload) <= self.threshold_bytes:
+            return compacted
+
+        location = f"{self.offload_location.rstrip('/')}/{uuid4()}.json"
+        write_object(location, json.dumps(payload, default=str))
+
+        if payload_size(compacted) > self.threshold_bytes:
+            compacted = project(payload, self.required_fields)
+
+        return {**compacted, CLAIM_CHECK_KEY: location}
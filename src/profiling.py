@@ -0,0 +1,91 @@
+"""
+    Opt-in per invocation profiling of lambda handlers.
+"""
+import cProfile
+import io
+import logging
+import marshal
+import pstats
+import tracemalloc
+from datetime import datetime, timezone
+from functools import wraps
+from os import environ
+from typing import Any, Callable
+from uuid import uuid4
+
+from src.storage import write_object
+
+PROFILE_HANDLERS = "PROFILE_HANDLERS"
+PROFILE_OUTPUT_LOCATION = "PROFILE_OUTPUT_LOCATION"
+PROFILE_TOP_ENTRIES = 30
+
+
+def profiling_enabled() -> bool:
+    """Check if handler profiling has been switched on with the PROFILE_HANDLERS environment variable"""
+    return environ.get(PROFILE_HANDLERS, "false").lower() == "true"
+
+
+def get_profile_report(profiler: cProfile.Profile, snapshot: tracemalloc.Snapshot, peak_memory: int) -> str:
+    """Render the slowest functions and largest allocations of an invocation as text
+
+    Args:
+        profiler (cProfile.Profile): Profiler that ran during the invocation
+        snapshot (tracemalloc.Snapshot): Allocations still alive at the end of the invocation
+        peak_memory (int): Peak traced memory in bytes
+
+    Returns:
+        str: Profile report
+    """
+    report = io.StringIO()
+    pstats.Stats(profiler, stream=report).sort_stats(pstats.SortKey.CUMULATIVE).print_stats(PROFILE_TOP_ENTRIES)
+
+    report.write(f"Peak traced memory: {peak_memory / 1024:.1f} KiB\n")
+    for statistic in snapshot.statistics("lineno")[:PROFILE_TOP_ENTRIES]:
+        report.write(f"{statistic}\n")
+
+    return report.getvalue()
+
+
+def profile_handler(handler: Callable[[dict, Any], Any]) -> Callable[[dict, Any], Any]:
+    """Profile CPU time and allocations of every invocation of a lambda handler
+
+    Profiling is decided once at import time; when PROFILE_HANDLERS is not "true" the handler is returned
+    unchanged so there is no overhead. Profiles are written to PROFILE_OUTPUT_LOCATION (local directory or
+    s3://bucket/prefix url, defaults to /tmp/profiles) as a pstats compatible .prof file and a text report.
+
+    Args:
+        handler (Callable): Lambda handler to profile
+
+    Returns:
+        Callable: Profiled lambda handler
+    """
+    if not profiling_enabled():
+        return handler
+
+    @wraps(handler)
+    def profiled_handler(event: dict, context: Any) -> Any:
+        profiler = cProfile.Profile()
+        tracemalloc.start()
+        profiler.enable()
+
+        try:
+            return handler(event, context)
+        finally:
+            profiler.disable()
+            snapshot = tracemalloc.take_snapshot()
+            _, peak_memory = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            try:
+                location = environ.get(PROFILE_OUTPUT_LOCATION, "/tmp/profiles").rstrip("/")
+                function_name = getattr(context, "function_name", handler.__module__)
+                request_id = getattr(context, "aws_request_id", str(uuid4()))
+                path = f"{location}/{function_name}/{datetime.now(timezone.utc):%Y%m%dT%H%M%S}-{request_id}"
+
+                profiler.create_stats()
+                write_object(f"{path}.prof", marshal.dumps(profiler.stats))
+                write_object(f"{path}.txt", get_profile_report(profiler, snapshot, peak_memory))
+            except Exception:  # pylint: disable=broad-except
+                logging.exception("Failed to write profile of %s", handler.__name__)
+
+    return profiled_handler
@@ -0,0 +1,307 @@
+"""
+    Deploy the Stax Orchestrator application from the Serverless Application Repository to several accounts and regions.
+"""
+from dataclasses import dataclass, field
+from enum import Enum
+from threading import Lock
+from time import monotonic, sleep
+from typing import Any, Callable, Dict, List, Optional
+
+import boto3
+from botocore.exceptions import ClientError
+from botocore.exceptions import ConnectionError as BotocoreConnectionError
+
+from src.concurrency import run_concurrently
+
+SAR_STACK_NAME_PREFIX = "serverlessrepo-"
+THROTTLING_ERROR_CODES = frozenset({"Throttling", "ThrottlingException", "TooManyRequestsException"})
+
+
+class DeploymentStatus(str, Enum):
+    """Stages of a stack deployment to a single target"""
+
+    CREATING_CHANGE_SET = "CREATING_CHANGE_SET"
+    DEPLOYING_STACK = "DEPLOYING_STACK"
+    SUCCEEDED = "SUCCEEDED"
+    FAILED = "FAILED"
+
+
+@dataclass(frozen=True)
+class StackTarget:
+    """AWS region and, optionally, the named profile or IAM role of the account to deploy to."""
+
+    region: str
+    profile_name: Optional[str] = None
+    role_arn: Optional[str] = None
+
+    def __str__(self) -> str:
+        return "/".join(filter(None, [self.profile_name or self.role_arn, self.region]))
+
+
+@dataclass
+class StackDeployment:  # pylint: disable=too-many-instance-attributes
+    """Progress and timing of the deployment of a stack to a single target."""
+
+    target: StackTarget
+    status: DeploymentStatus = DeploymentStatus.CREATING_CHANGE_SET
+    change_set_id: Optional[str] = None
+    stack_id: Optional[str] = None
+    stack_status: Optional[str] = None
+    error: Optional[str] = None
+    started_at: Optional[float] = None
+    timings: Dict[str, float] = field(default_factory=dict)
+    polls: int = 0
+
+    def __post_init__(self):
+        if self.started_at is None:
+            self.started_at = monotonic()
+
+    @property
+    def finished(self) -> bool:
+        """True when the deployment succeeded or failed"""
+        return self.status in (DeploymentStatus.SUCCEEDED, DeploymentStatus.FAILED)
+
+    def mark(self, stage: str) -> None:
+        """Record the number of seconds since the deployment started when a stage completed"""
+        self.timings[stage] = round(monotonic() - self.started_at, 3)
+
+    def fail(self, error: str) -> None:
+        """Mark the deployment as failed"""
+        self.status = DeploymentStatus.FAILED
+        self.error = error
+        self.mark("total_seconds")
+
+    def to_dict(self) -> dict:
+        """Get a JSON compatible report of the deployment"""
+        return {
+            "target": str(self.target),
+            "status": self.status.value,
+            "change_set_id": self.change_set_id,
+            "stack_id": self.stack_id,
+            "stack_status": self.stack_status,
+            "error": self.error,
+            "polls": self.polls,
+            **self.timings,
+        }
+
+
+class AdaptivePoller:  # pylint: disable=too-few-public-methods
+    """Poll many deployments from a single loop, backing off on deployments that are not progressing.
+
+    The delay of a deployment is reset whenever its state changes and grows geometrically up to max_delay
+    while it stays the same, throttling and connection errors double the delay. Any other error fails only the
+    deployment it was raised for.
+    """
+
+    def __init__(
+        self,
+        initial_delay: float = 2,
+        max_delay: float = 30,
+        backoff: float = 1.5,
+        sleep_func: Callable[[float], None] = sleep,
+    ):
+        """
+        Args:
+            initial_delay (float): Seconds to wait before polling a deployment that just changed state
+            max_delay (float): Maximum number of seconds between polls of a deployment
+            backoff (float): Factor the delay grows by while a deployment does not change state
+            sleep_func (Callable): Function used to wait between polls
+        """
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.backoff = backoff
+        self.sleep = sleep_func
+
+    def run(
+        self, deployments: List[StackDeployment], poll: Callable[[StackDeployment], bool], timeout: float = 3600
+    ) -> None:
+        """Poll deployments until every deployment finished or the timeout expired
+
+        Args:
+            deployments (List[StackDeployment]): Deployments to poll
+            poll (Callable): Advances a deployment, returns True when the deployment changed state
+            timeout (float): Maximum number of seconds to poll for
+        """
+        deadline = monotonic() + timeout
+        delays = {id(deployment): self.initial_delay for deployment in deployments}
+        next_poll_at = {id(deployment): monotonic() + self.initial_delay for deployment in deployments}
+
+        while True:
+            pending = [deployment for deployment in deployments if not deployment.finished]
+            if not pending:
+                return
+
+            wake_at = min(next_poll_at[id(deployment)] for deployment in pending)
+            if wake_at > deadline:
+                for deployment in pending:
+                    deployment.fail(f"Timed out after {timeout} seconds while {deployment.status.value}")
+                return
+
+            self.sleep(max(0.0, wake_at - monotonic()))
+
+            for deployment in pending:
+                key = id(deployment)
+                if next_poll_at[key] > monotonic():
+                    continue
+
+                deployment.polls += 1
+                try:
+                    changed = poll(deployment)
+                    delays[key] = self.initial_delay if changed else min(self.max_delay, delays[key] * self.backoff)
+                except ClientError as error:
+                    if error.response.get("Error", {}).get("Code") not in THROTTLING_ERROR_CODES:
+                        deployment.fail(str(error))
+                    delays[key] = min(self.max_delay, delays[key] * 2)
+                except BotocoreConnectionError:
+                    # Connection errors and read timeouts are retried until the deadline
+                    delays[key] = min(self.max_delay, delays[key] * 2)
+                except Exception as error:  # pylint: disable=broad-except
+                    deployment.fail(str(error))
+
+                next_poll_at[key] = monotonic() + delays[key]
+
+
+def get_client(service_name: str, target: StackTarget) -> Any:
+    """Create a boto3 client for the account and region of a deployment target
+
+    Args:
+        service_name (str): Name of the AWS service
+        target (StackTarget): Deployment target
+
+    Returns:
+        Any: boto3 client
+    """
+    session = boto3.Session(profile_name=target.profile_name, region_name=target.region)
+
+    if target.role_arn:
+        credentials = session.client("sts").assume_role(
+            RoleArn=target.role_arn, RoleSessionName="stax-orchestrator-deployer"
+        )["Credentials"]
+        session = boto3.Session(
+            aws_access_key_id=credentials["AccessKeyId"],
+            aws_secret_access_key=credentials["SecretAccessKey"],
+            aws_session_token=credentials["SessionToken"],
+            region_name=target.region,
+        )
+
+    return session.client(service_name)
+
+
+class StackDeployer:  # pylint: disable=too-many-instance-attributes
+    """Create and execute Serverless Application Repository change sets for many targets concurrently."""
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        application_id: str,
+        semantic_version: str,
+        stack_name: str,
+        parameters: Dict[str, str],
+        client_factory: Callable[[str, StackTarget], Any] = get_client,
+        poller: Optional[AdaptivePoller] = None,
+        max_workers: int = 10,
+    ):
+        """
+        Args:
+            application_id (str): ARN of the Serverless Application Repository application
+            semantic_version (str): Version of the application to deploy
+            stack_name (str): Name of the stack, Serverless Application Repository prefixes it with serverlessrepo-
+            parameters (Dict[str, str]): CloudFormation parameter overrides
+            client_factory (Callable): Called with a service name and target to create AWS clients
+            poller (Optional[AdaptivePoller]): Poller used to track change sets and stacks
+            max_workers (int): Maximum number of change sets created concurrently
+        """
+        self.application_id = application_id
+        self.semantic_version = semantic_version
+        self.stack_name = stack_name
+        self.parameters = parameters
+        self.client_factory = client_factory
+        self.poller = poller or AdaptivePoller()
+        self.max_workers = max_workers
+        self._clients: Dict[tuple, Any] = {}
+        self._clients_lock = Lock()
+
+    def _client(self, service_name: str, target: StackTarget) -> Any:
+        key = (service_name, target)
+        # Change sets are created from several threads, boto3 sessions and clients must not be created concurrently
+        with self._clients_lock:
+            if key not in self._clients:
+                self._clients[key] = self.client_factory(service_name, target)
+
+            return self._clients[key]
+
+    def create_change_set(self, deployment: StackDeployment) -> None:
+        """Create the change set of a deployment
+
+        Args:
+            deployment (StackDeployment): Deployment to create the change set for
+        """
+        response = self._client("serverlessrepo", deployment.target).create_cloud_formation_change_set(
+            ApplicationId=self.application_id,
+            Capabilities=["CAPABILITY_IAM", "CAPABILITY_RESOURCE_POLICY"],
+            SemanticVersion=self.semantic_version,
+            StackName=self.stack_name,
+            ParameterOverrides=[{"Name": key, "Value": value} for key, value in self.parameters.items()],
+        )
+        deployment.change_set_id = response["ChangeSetId"]
+        deployment.stack_id = response.get("StackId") or f"{SAR_STACK_NAME_PREFIX}{self.stack_name}"
+
+    def poll(self, deployment: StackDeployment) -> bool:
+        """Advance a deployment by checking its change set or stack once
+
+        Args:
+            deployment (StackDeployment): Deployment to advance
+
+        Returns:
+            bool: True when the deployment changed state
+        """
+        cloudformation = self._client("cloudformation", deployment.target)
+
+        if deployment.status == DeploymentStatus.CREATING_CHANGE_SET:
+            change_set = cloudformation.describe_change_set(ChangeSetName=deployment.change_set_id)
+
+            if change_set["Status"] == "FAILED":
+                deployment.fail(change_set.get("StatusReason", "Change set creation failed"))
+                return True
+            if change_set["Status"] != "CREATE_COMPLETE":
+                return False
+
+            deployment.mark("change_set_seconds")
+            cloudformation.execute_change_set(ChangeSetName=deployment.change_set_id, StackName=deployment.stack_id)
+            deployment.status = DeploymentStatus.DEPLOYING_STACK
+            return True
+
+        stack_status = cloudformation.describe_stacks(StackName=deployment.stack_id)["Stacks"][0]["StackStatus"]
+        changed = stack_status != deployment.stack_status
+        deployment.stack_status = stack_status
+
+        if stack_status.endswith("_IN_PROGRESS"):
+            return changed
+
+        if stack_status in ("CREATE_COMPLETE", "UPDATE_COMPLETE", "IMPORT_COMPLETE"):
+            deployment.status = DeploymentStatus.SUCCEEDED
+            deployment.mark("stack_seconds")
+            deployment.mark("total_seconds")
+        else:
+            deployment.fail(f"Stack deployment finished with status {stack_status}")
+
+        return True
+
+    def deploy(self, targets: List[StackTarget], timeout: float = 3600) -> List[StackDeployment]:
+        """Deploy the application to every target and wait until all deployments finished
+
+        Args:
+            targets (List[StackTarget]): Accounts and regions to deploy to
+            timeout (float): Maximum number of seconds to wait for all deployments
+
+        Returns:
+            List[StackDeployment]: Deployments in the same order as targets
+        """
+        deployments = [StackDeployment(target) for target in dict.fromkeys(targets)]
+
+        for result in run_concurrently(self.create_change_set, deployments, max_workers=self.max_workers):
+            if result.error is not None:
+                result.item.fail(str(result.error))
+
+        self.poller.run(deployments, self.poll, timeout=timeout)
+
+        return deployments
@@ -0,0 +1,166 @@
+"""
+    Build Stax clients once per process from a precompiled snapshot of the resolved Stax OpenAPI schema.
+"""
+import argparse
+import logging
+import os
+import pickle
+from threading import Lock
+from time import monotonic
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Snapshot shipped next to this module in the lambda layer, see build-StaxLibLayer in the Makefile
+SCHEMA_SNAPSHOT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "stax_schema.pickle")
+
+
+def get_schema_snapshot_path() -> str:
+    """Get the path of the schema snapshot, STAX_SCHEMA_SNAPSHOT overrides the one shipped in the lambda layer"""
+    return os.environ.get("STAX_SCHEMA_SNAPSHOT", SCHEMA_SNAPSHOT_PATH)
+
+
+def build_schema_snapshot(snapshot_path: str, live_schema: bool = True) -> dict:
+    """Load and resolve the Stax OpenAPI schema the way staxapp does and save the result as a snapshot
+
+    Args:
+        snapshot_path (str): Local path to write the snapshot to
+        live_schema (bool): Load the live schema of the Stax API instead of the one bundled with staxapp
+
+    Returns:
+        dict: Snapshot of the staxapp version, schema, operation map and resolved schema
+    """
+    # pylint: disable=import-outside-toplevel,protected-access
+    import staxapp
+    from staxapp.config import Config as StaxConfig
+    from staxapp.contract import StaxContract
+    from staxapp.openapi import StaxClient
+
+    StaxConfig.load_live_schema = live_schema
+    StaxClient._operation_map.clear()
+    StaxClient._map_paths_to_operations()
+    StaxContract.set_schema(StaxClient._schema)
+
+    snapshot = {
+        "staxapp_version": staxapp.__version__,
+        "schema": StaxClient._schema,
+        "operation_map": StaxClient._operation_map,
+        "resolved_schema": StaxContract._resolved_schema,
+    }
+
+    os.makedirs(os.path.dirname(snapshot_path) or ".", exist_ok=True)
+    with open(snapshot_path, "wb") as file:
+        pickle.dump(snapshot, file, protocol=pickle.HIGHEST_PROTOCOL)
+
+    return snapshot
+
+
+def load_schema_snapshot(snapshot_path: Optional[str] = None) -> bool:
+    """Prime staxapp with a schema snapshot so constructing a StaxClient skips loading and resolving the schema
+
+    Args:
+        snapshot_path (Optional[str]): Path of the snapshot, defaults to get_schema_snapshot_path()
+
+    Returns:
+        bool: Whether the snapshot was loaded, staxapp loads the schema itself when it was not
+    """
+    # pylint: disable=import-outside-toplevel,protected-access
+    import staxapp
+    from staxapp.contract import StaxContract
+    from staxapp.openapi import StaxClient
+
+    snapshot_path = snapshot_path or get_schema_snapshot_path()
+    if not os.path.exists(snapshot_path):
+        return False
+
+    with open(snapshot_path, "rb") as file:
+        snapshot = pickle.load(file)
+
+    if snapshot["staxapp_version"] != staxapp.__version__:
+        logging.warning(
+            "Ignoring Stax schema snapshot %s built for staxapp %s, staxapp %s is installed",
+            snapshot_path,
+            snapshot["staxapp_version"],
+            staxapp.__version__,
+        )
+        return False
+
+    StaxClient._schema = snapshot["schema"]
+    StaxClient._operation_map.update(snapshot["operation_map"])
+    StaxContract._swagger_doc = snapshot["schema"]
+    StaxContract._resolved_schema = snapshot["resolved_schema"]
+    return True
+
+
+class SharedStaxClient:  # pylint: disable=too-few-public-methods
+    """Stax client that can be shared between threads.
+
+    A StaxClient remembers the name of the last looked up operation on the instance and its operation wrapper reads
+    it back when called, so every operation is looked up on a shallow copy of the client.
+    """
+
+    def __init__(self, client: Any):
+        """
+        Args:
+            client (Any): Stax client to share
+        """
+        self._client = client
+
+    def __getattr__(self, operation: str) -> Callable[..., Any]:
+        client = object.__new__(type(self._client))
+        client.__dict__.update(self._client.__dict__)
+        return getattr(client, operation)
+
+
+class StaxClientCache:
+    """Process wide cache of Stax clients per client type with TTL eviction."""
+
+    def __init__(self, ttl_seconds: float):
+        """
+        Args:
+            ttl_seconds (float): Number of seconds a cached client stays valid, the Stax access keys are read again
+                when a client expires
+        """
+        self.ttl_seconds = ttl_seconds
+        self._clients: Dict[str, Tuple[Any, float]] = {}
+        self._lock = Lock()
+
+    def get(self, client_type: str, factory: Callable[[str], Any]) -> Any:
+        """Get the cached client of a client type, creating a new one when missing or expired
+
+        Args:
+            client_type (str): Type of stax client (for e.g, workloads)
+            factory (Callable): Creates a client of a client type
+
+        Returns:
+            Any: Cached client
+        """
+        with self._lock:
+            client, expires_at = self._clients.get(client_type, (None, 0.0))
+            if client is None or monotonic() >= expires_at:
+                client = factory(client_type)
+                self._clients[client_type] = (client, monotonic() + self.ttl_seconds)
+
+            return client
+
+    def clear(self) -> None:
+        """Drop every cached client"""
+        with self._lock:
+            self._clients.clear()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Build the Stax schema snapshot shipped in the lambda layer"""
+    parser = argparse.ArgumentParser(description="Build a snapshot of the resolved Stax OpenAPI schema.")
+    parser.add_argument("snapshot_path", nargs="?", default=SCHEMA_SNAPSHOT_PATH, help="Path to write the snapshot to")
+    parser.add_argument(
+        "--bundled-schema",
+        action="store_true",
+        help="Use the schema bundled with staxapp instead of the live schema of the Stax API",
+    )
+    args = parser.parse_args(argv)
+
+    snapshot = build_schema_snapshot(args.snapshot_path, live_schema=not args.bundled_schema)
+    print(f"Wrote snapshot of {len(snapshot['operation_map'])} Stax client types to {args.snapshot_path}")
+
+
+if __name__ == "__main__":
+    main()
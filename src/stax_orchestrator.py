@@ -1,44 +1,106 @@
 """
     Common logic to interact with Stax to create/update/delete workloads and monitor task status.
 """
+# pylint: disable=too-many-lines
 import logging
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
+from hashlib import sha256
+from itertools import zip_longest
 from os import environ
-from typing import Optional
+from threading import Lock
+from time import monotonic, sleep, time
+from typing import Dict, List, Optional, Set
 from uuid import UUID, uuid4
 
-import boto3
-from aws_lambda_powertools.utilities import parameters
-from aws_xray_sdk.core import patch_all, xray_recorder
-from staxapp.config import Config as StaxConfig
-from staxapp.openapi import StaxClient
+from staxapp.exceptions import ValidationException
+
+from src.catalogue_gc import (
+    MANIFEST_NAME,
+    batched,
+    find_stale_manifests,
+    find_stale_versions,
+    get_referenced_version_ids,
+)
+from src.catalogue_index import CatalogueIndex, CatalogueNotFoundException, get_semver_key
+from src.catalogue_template import CatalogueTemplateCache, load_template, validate_workload_parameters
+from src.circuit_breaker import CircuitBreakerRegistry, CircuitBreakingClient
+from src.concurrency import KeyedLimiter, RateLimiter, run_concurrently
+from src.constants import TERMINAL_TASK_STATUSES, WorkloadOperation
+from src.name_reservations import NameAlreadyReservedException, NameReservations
+from src.stax_client import SharedStaxClient, StaxClientCache, load_schema_snapshot
+from src.storage import delete_objects, list_objects, read_object
+from src.task_status_cache import TaskStatusCache
+from src.tracing import configure_tracing
+from src.ttl_cache import TTLCache
+from src.workload_index import Criterion, WorkloadIndex, WorkloadIndexCache
 
 logging.getLogger().setLevel(environ.get("LOG_LEVEL", logging.INFO))
 
-xray_recorder.configure(service="StaxOrchestrator:Libs")
-patch_all()
+configure_tracing("StaxOrchestrator:Libs")
+
+# Fan out instance names are shortened to fit this length
+MAX_WORKLOAD_NAME_LENGTH = 64
+
+catalogue_index_cache: TTLCache[CatalogueIndex] = TTLCache(
+    ttl_seconds=float(environ.get("CATALOGUE_CACHE_TTL_SECONDS", 300))
+)
+catalogue_template_cache = CatalogueTemplateCache(max_size=int(environ.get("CATALOGUE_TEMPLATE_CACHE_SIZE", 128)))
+task_status_cache = TaskStatusCache(
+    max_size=int(environ.get("TASK_STATUS_CACHE_SIZE", 1024)),
+    ttl_seconds=float(environ.get("TASK_STATUS_CACHE_TTL_SECONDS", 5)),
+)
+stax_circuit_breakers = CircuitBreakerRegistry(
+    failure_rate_threshold=float(environ.get("STAX_CIRCUIT_FAILURE_RATE_THRESHOLD", 0.5)),
+    slow_call_seconds=float(environ.get("STAX_CIRCUIT_SLOW_CALL_SECONDS", 10)),
+    open_seconds=float(environ.get("STAX_CIRCUIT_OPEN_SECONDS", 30)),
+    ignored_exceptions=(ValidationException,),
+)
+workload_name_reservations = NameReservations.from_environment()
+# Guards the existing_names sets that concurrent create_unique_workload calls check and add names to
+existing_workload_names_lock = Lock()
+stax_client_cache = StaxClientCache(ttl_seconds=float(environ.get("STAX_CLIENT_TTL_SECONDS", 21600)))
+workload_index_cache = WorkloadIndexCache(ttl_seconds=float(environ.get("WORKLOAD_INDEX_TTL_SECONDS", 21600)))
 
 
-def get_stax_client(client_type: str) -> StaxClient:
-    """Initialize and return stax client object
+def parameter_validation_enabled() -> bool:
+    """Check if workload events are validated against catalogue templates (VALIDATE_WORKLOAD_PARAMETERS)"""
+    return environ.get("VALIDATE_WORKLOAD_PARAMETERS", "false").lower() == "true"
+
+
+def create_stax_client(client_type: str) -> CircuitBreakingClient:
+    """Initialize and return stax client object, every operation is called through its endpoint's circuit breaker
     Args:
         client_type (str): Type of stax client to instantiate (for e.g, workloads)
     """
+    # pylint: disable=import-outside-toplevel
+    from aws_lambda_powertools.utilities import parameters
+    from staxapp.config import Config as StaxConfig
+    from staxapp.openapi import StaxClient
+
     ssm_provider = parameters.SSMProvider()
     StaxConfig.access_key = ssm_provider.get("/orchestrator/stax/access/key", max_age=21600, decrypt=True)
     StaxConfig.secret_key = ssm_provider.get("/orchestrator/stax/access/key/secret", max_age=21600, decrypt=True)
+    load_schema_snapshot()
 
-    return StaxClient(client_type)
+    return CircuitBreakingClient(SharedStaxClient(StaxClient(client_type)), client_type, stax_circuit_breakers)
 
 
-class StaxOrchestrator:
+def get_stax_client(client_type: str) -> CircuitBreakingClient:
+    """Get the stax client of a client type, clients are created once per process and shared by every orchestrator
+    Args:
+        client_type (str): Type of stax client (for e.g, workloads)
+    """
+    return stax_client_cache.get(client_type, create_stax_client)
+
+
+class StaxOrchestrator:  # pylint: disable=too-many-public-methods
     """Interact with Stax to create workloads and monitor workload task status."""
 
-    _workload_client: StaxClient = None
-    _tasks_client: StaxClient = None
+    _workload_client: CircuitBreakingClient = None
+    _tasks_client: CircuitBreakingClient = None
 
     @property
-    def workload_client(self) -> StaxClient:
+    def workload_client(self) -> CircuitBreakingClient:
         """Initialize and return stax workload client object"""
         if not self._workload_client:
             self._workload_client = get_stax_client("workloads")
@@ -46,7 +108,7 @@ class StaxOrchestrator:
         return self._workload_client
 
     @property
-    def tasks_client(self) -> StaxClient:
+    def tasks_client(self) -> CircuitBreakingClient:
         """Initialize and return stax tasks client object"""
         if not self._tasks_client:
             self._tasks_client = get_stax_client("tasks")
@@ -78,9 +140,53 @@ class StaxOrchestrator:
         workload_id: UUID
         catalogue_version_id: UUID
 
+    @dataclass(frozen=True)
+    class DeploymentTarget:
+        """Stax AWS account and region to deploy a workload instance to."""
+
+        aws_account_id: UUID
+        aws_region: str
+
+    @dataclass(frozen=True)
+    class WorkloadSelector:
+        """Criteria used to select workloads for bulk operations, unset criteria match every workload."""
+
+        name_prefix: Optional[str] = None
+        workload_tags: Optional[dict] = None
+        aws_account_id: Optional[UUID] = None
+        catalogue_id: Optional[UUID] = None
+        status: Optional[str] = "ACTIVE"
+
+        def matches(self, workload: dict) -> bool:
+            """Check if a Stax workload matches all criteria of the selector
+
+            Args:
+                workload (dict): Stax workload as returned by ReadWorkloads
+
+            Returns:
+                bool: True if the workload matches the selector else False
+            """
+            if self.name_prefix and not workload.get("Name", "").startswith(self.name_prefix):
+                return False
+
+            if self.aws_account_id and workload.get("AccountId") != self.aws_account_id:
+                return False
+
+            if self.catalogue_id and workload.get("CatalogueId") != self.catalogue_id:
+                return False
+
+            if self.status and workload.get("Status") != self.status:
+                return False
+
+            tags = workload.get("Tags") or {}
+            return all(tags.get(key) == value for key, value in (self.workload_tags or {}).items())
+
     class WorkloadWithNameAlreadyExistsException(Exception):
         """Raised when workload with same name already exists in Stax"""
 
+    class TaskTrackingTimeoutException(Exception):
+        """Raised when tracked tasks do not reach a terminal state in time"""
+
     # pylint: disable=too-many-arguments
     def create_catalogue(
         self,
@@ -89,6 +195,7 @@ class StaxOrchestrator:
         cloudformation_manifest_path: str,
         description: str,
         catalogue_id: UUID = None,
+        version_tag: str = None,
     ) -> dict:
         """Creates/Updates a Stax Catalogue with given cloudformation template
 
@@ -98,9 +205,19 @@ class StaxOrchestrator:
             cloudformation_manifest_path (str): Local path to the cloudformation manifest
             description (str): Catalogue description
             catalogue_id (UUID): ID of the catalogue if updating.
+            version_tag (str): Semantic version (e.g. 1.2.0) to resolve the catalogue version by tag or "latest"
+
+        Raises:
+            ValueError: Raised when the version tag is not a semantic version without build metadata
         """
+        import boto3  # pylint: disable=import-outside-toplevel
+
+        if version_tag and (get_semver_key(version_tag) is None or "+" in version_tag):
+            raise ValueError(f"Version tag {version_tag} is not a semantic version such as 1.2.0")
+
         s3_resource = boto3.resource("s3")
-        catalogue_version = str(uuid4())
+        # The UUID keeps manifest names unique, the tag is stored as semver build metadata
+        catalogue_version = f"{version_tag}+{uuid4()}" if version_tag else str(uuid4())
         cfn_name = f"{catalogue_version}-{catalogue_name}.yaml"
         s3_resource.Bucket(bucket_name).upload_file(cloudformation_manifest_path, cfn_name)
 
@@ -110,19 +227,173 @@ class StaxOrchestrator:
             TemplateURL: s3://{bucket_name}/{cfn_name}
         """
         if catalogue_id:
-            return self.workload_client.CreateCatalogueVersion(
+            response = self.workload_client.CreateCatalogueVersion(
                 ManifestBody=manifest_body,
                 Version=catalogue_version,
                 Description=description,
                 catalogue_id=catalogue_id,
             )
+        else:
+            response = self.workload_client.CreateCatalogueItem(
+                Name=catalogue_name,
+                ManifestBody=manifest_body,
+                Version=catalogue_version,
+                Description=description,
+            )
+
+        catalogue_index_cache.invalidate()
+
+        return response
 
-        return self.workload_client.CreateCatalogueItem(
-            Name=catalogue_name,
-            ManifestBody=manifest_body,
-            Version=catalogue_version,
-            Description=description,
+    def get_catalogue_versions(self, catalogue_id: UUID) -> List[dict]:
+        """Poll Stax to get all versions of a catalogue
+
+        Args:
+            catalogue_id (UUID): ID of the catalogue
+
+        Returns:
+            List[dict]: Catalogue versions
+        """
+        response = self.workload_client.ReadCatalogueItems(catalogue_id=catalogue_id)
+
+        return [
+            version
+            for workload_catalogue in response.get("WorkloadCatalogues", [])
+            for catalogue in workload_catalogue.get("WorkloadCatalogueItems", [])
+            for version in catalogue.get("Versions") or []
+        ]
+
+    def get_catalogue_index(self) -> CatalogueIndex:
+        """Get the process wide cached catalogue index, refreshing it once its TTL has expired
+
+        Returns:
+            CatalogueIndex: Index of catalogues by name
+        """
+        return catalogue_index_cache.get(
+            lambda: CatalogueIndex.from_response(
+                self.workload_client.ReadCatalogueItems(), self.get_catalogue_versions
+            )
+        )
+
+    # pylint: disable=too-many-arguments,too-many-locals
+    def collect_catalogue_garbage(
+        self,
+        bucket_name: str,
+        keep_versions: int = 3,
+        dry_run: bool = False,
+        min_orphan_age_seconds: float = 86400,
+        max_workers: int = 10,
+        requests_per_second: Optional[float] = 5,
+    ) -> dict:
+        """Delete catalogue versions and manifests that no workload references, from a single inventory pass
+
+        The default version, the versions used by workloads and the keep_versions most recent versions of every
+        catalogue are kept. Catalogue versions are deleted concurrently and rate limited, then their manifests and
+        orphaned manifests are deleted from the bucket in batches of up to 1000 keys.
+
+        Args:
+            bucket_name (str): Name of the s3 bucket create_catalogue uploads manifests to
+            keep_versions (int): Number of most recent versions to keep per catalogue
+            dry_run (bool): Only report the catalogue versions and manifests that would be deleted
+            min_orphan_age_seconds (float): Minimum age of manifests that no catalogue version uses
+            max_workers (int): Maximum number of concurrent delete calls
+            requests_per_second (Optional[float]): Maximum rate of Stax calls, None disables rate limiting
+
+        Returns:
+            dict: Stale catalogue versions and manifests, the deleted ones and failed deletions
+        """
+        location = f"s3://{bucket_name}"
+        rate_limiter = RateLimiter(requests_per_second)
+        catalogues = [
+            catalogue
+            for workload_catalogue in self.workload_client.ReadCatalogueItems().get("WorkloadCatalogues", [])
+            for catalogue in workload_catalogue.get("WorkloadCatalogueItems", [])
+            if catalogue.get("Status", "ACTIVE") != "DELETED"
+        ]
+
+        # Every live version must be known, otherwise its manifest would look orphaned
+        missing_versions = [catalogue for catalogue in catalogues if "Versions" not in catalogue]
+        for result in run_concurrently(
+            lambda catalogue: self.get_catalogue_versions(catalogue["Id"]), missing_versions, max_workers, rate_limiter
+        ):
+            if result.error is not None:
+                raise result.error
+            result.item["Versions"] = result.result
+
+        stale_versions = find_stale_versions(
+            [catalogue for catalogue in catalogues if catalogue.get("Status", "ACTIVE") == "ACTIVE"],
+            get_referenced_version_ids(self.get_workloads()["Workloads"]),
+            keep_versions,
+        )
+        stale_manifests = find_stale_manifests(
+            list_objects(location), catalogues, stale_versions, min_orphan_age_seconds, time()
         )
+        report = {"DryRun": dry_run, "CatalogueVersions": stale_versions, "Manifests": stale_manifests}
+
+        if dry_run:
+            return report
+
+        version_results = run_concurrently(
+            lambda version: self.workload_client.DeleteCatalogueVersion(
+                catalogue_id=version["CatalogueId"], version_id=version["CatalogueVersionId"]
+            ),
+            stale_versions,
+            max_workers=max_workers,
+            rate_limiter=rate_limiter,
+        )
+        failed = [
+            {**result.item, "Error": str(result.error)} for result in version_results if result.error is not None
+        ]
+
+        if len(failed) < len(stale_versions):
+            catalogue_index_cache.invalidate()
+
+        # Manifests of versions that could not be deleted are still used by their catalogue version
+        still_used = {version["WorkloadVersion"] for version in failed}
+        manifests = [
+            name for name in stale_manifests if MANIFEST_NAME.match(name)["workload_version"] not in still_used
+        ]
+        deleted_manifests = []
+
+        for result in run_concurrently(lambda batch: delete_objects(location, batch), batched(manifests), max_workers):
+            errors = result.result if result.error is None else dict.fromkeys(result.item, str(result.error))
+            failed.extend({"Manifest": name, "Error": error} for name, error in errors.items())
+            deleted_manifests.extend(name for name in result.item if name not in errors)
+
+        return {
+            **report,
+            "DeletedCatalogueVersions": [result.item for result in version_results if result.error is None],
+            "DeletedManifests": deleted_manifests,
+            "Failed": failed,
+        }
+
+    def resolve_catalogue(self, catalogue_name: str, catalogue_version: Optional[str] = None) -> dict:
+        """Resolve a catalogue name and version tag to catalogue and catalogue version IDs
+
+        Args:
+            catalogue_name (str): Name of the catalogue
+            catalogue_version (Optional[str]): "latest" or a version tag, None to use the catalogue default version
+
+        Returns:
+            dict: catalogue_id and, when a version was requested, catalogue_version_id
+        """
+        return self.get_catalogue_index().resolve(catalogue_name, catalogue_version)
+
+    def resolve_catalogue_references(self, event: dict) -> dict:
+        """Resolve catalogue_name/catalogue_version in an event to IDs, explicit IDs take precedence
+
+        Args:
+            event (dict): Details about the workload
+
+        Returns:
+            dict: Event including catalogue_id and catalogue_version_id where they could be resolved
+        """
+        if not event.get("catalogue_name") or (event.get("catalogue_id") and not event.get("catalogue_version")):
+            return event
+
+        resolved = self.resolve_catalogue(event["catalogue_name"], event.get("catalogue_version"))
+
+        return {**event, **{key: value for key, value in resolved.items() if not event.get(key)}}
 
     # pylint: disable=too-many-arguments
     def create_workload(
@@ -134,6 +405,7 @@ class StaxOrchestrator:
         catalogue_version_id: UUID = None,
         workload_parameters: Optional[dict] = None,
         workload_tags: Optional[dict] = None,
+        validate_parameters: bool = False,
     ) -> dict:
         """Create a Stax workload with given catalogue and workload information
 
@@ -145,7 +417,14 @@ class StaxOrchestrator:
             catalogue_version_id (Optional[str]): Deploy a certain version of the catalogue
             workload_parameters (Optional[dict], optional): Workload cloudformation parameters
             workload_tags (Optional[dict], optional): Tags to attach to the workload to be created
+            validate_parameters (bool): Check workload parameters against the catalogue template before creating
+
+        Raises:
+            WorkloadParametersInvalidException: Raised when validate_parameters is set and parameters are invalid
         """
+        if validate_parameters:
+            self.validate_workload_parameters(catalogue_id, workload_parameters, catalogue_version_id)
+
         create_workload_payload = {
             "Name": workload_name,
             "CatalogueId": catalogue_id,
@@ -162,7 +441,456 @@ class StaxOrchestrator:
         if workload_tags:
             create_workload_payload["Tags"] = workload_tags
 
-        return self.workload_client.CreateWorkload(**create_workload_payload)
+        response = self.workload_client.CreateWorkload(**create_workload_payload)
+
+        workload = response.get("Detail", {}).get("Workload", {})
+        if workload.get("WorkloadId"):
+            workload_index_cache.upsert(
+                {
+                    "Id": workload["WorkloadId"],
+                    "Name": workload_name,
+                    "CatalogueId": catalogue_id,
+                    "AccountId": aws_account_id,
+                    "Region": aws_region,
+                    "Status": "CREATE_IN_PROGRESS",
+                    "Tags": workload_tags or {},
+                }
+            )
+
+        return response
+
+    def create_unique_workload(
+        self, workload_name: str, existing_names: Optional[Set[str]] = None, **workload_kwargs
+    ) -> dict:
+        """Create a Stax workload unless a workload with the same name already exists
+
+        When WORKLOAD_NAME_TABLE is set the name is claimed with a conditional write before Stax is called and
+        released again if the create fails, otherwise the name is checked against existing_names or the list of all
+        workloads.
+
+        Args:
+            workload_name (str): Name of the workload to create
+            existing_names (Optional[Set[str]]): Names of active workloads to check the name against instead of
+                listing all workloads, see get_existing_workload_names. The name is added while it is created, so
+                concurrent calls sharing the set create a name once. Ignored when WORKLOAD_NAME_TABLE is set.
+            workload_kwargs: Keyword arguments of create_workload
+
+        Returns:
+            dict: Create workload response
+
+        Raises:
+            WorkloadWithNameAlreadyExistsException: Raised when a workload with the same name already exists
+        """
+        if workload_name_reservations is None:
+            if existing_names is None:
+                if self.workload_with_name_already_exists(workload_name):
+                    raise self.WorkloadWithNameAlreadyExistsException(
+                        f"Workload with name {workload_name} already exists"
+                    )
+
+                return self.create_workload(workload_name, **workload_kwargs)
+
+            with existing_workload_names_lock:
+                if workload_name in existing_names:
+                    raise self.WorkloadWithNameAlreadyExistsException(
+                        f"Workload with name {workload_name} already exists"
+                    )
+                existing_names.add(workload_name)
+
+            try:
+                return self.create_workload(workload_name, **workload_kwargs)
+            except Exception:
+                with existing_workload_names_lock:
+                    existing_names.discard(workload_name)
+                raise
+
+        token = self.claim_workload_name(workload_name)
+
+        try:
+            response = self.create_workload(workload_name, **workload_kwargs)
+        except Exception:
+            workload_name_reservations.release(workload_name, token=token)
+            raise
+
+        # The workload exists from here on, failing to hold its name must not fail the create
+        workload_id = response.get("Detail", {}).get("Workload", {}).get("WorkloadId")
+        if not workload_id:
+            logging.warning("Stax returned no ID for workload %s, its name claim is left to expire", workload_name)
+            return response
+
+        try:
+            workload_name_reservations.confirm(workload_name, token, workload_id)
+        except NameAlreadyReservedException:
+            if workload_name_reservations.reserve(workload_name, workload_id):
+                logging.warning(
+                    "Claim of name %s expired, reserved it again for workload %s", workload_name, workload_id
+                )
+            else:
+                logging.error(
+                    "Claim of name %s expired and it was claimed again, workload %s is not protected by its name",
+                    workload_name,
+                    workload_id,
+                )
+        except Exception:  # pylint: disable=broad-except
+            logging.exception("Failed to confirm the claim of name %s for workload %s", workload_name, workload_id)
+
+        return response
+
+    def claim_workload_name(self, workload_name: str) -> str:
+        """Claim a workload name in WORKLOAD_NAME_TABLE, taking over names still reserved for deleted workloads
+
+        Names are released once the delete task of their workload succeeded. When that task was not watched, e.g.
+        for deletes from python, the name stays reserved until a create finds its workload deleted.
+
+        Args:
+            workload_name (str): Name of the workload to create
+
+        Returns:
+            str: Token of the claim
+
+        Raises:
+            WorkloadWithNameAlreadyExistsException: Raised when the name is reserved for a workload that exists
+        """
+        try:
+            return workload_name_reservations.claim(workload_name)
+        except NameAlreadyReservedException as error:
+            workload_id = workload_name_reservations.get_workload_id(workload_name)
+            if not workload_id or self.get_workload(workload_id).get("Status") != "DELETED":
+                raise self.WorkloadWithNameAlreadyExistsException(
+                    f"Workload with name {workload_name} already exists"
+                ) from error
+
+        workload_name_reservations.release(workload_name, workload_id=workload_id)
+
+        try:
+            return workload_name_reservations.claim(workload_name)
+        except NameAlreadyReservedException as error:
+            raise self.WorkloadWithNameAlreadyExistsException(
+                f"Workload with name {workload_name} already exists"
+            ) from error
+
+    def release_workload_name(self, workload_id: UUID, workload_name: Optional[str] = None) -> bool:
+        """Release the name of a deleted workload when WORKLOAD_NAME_TABLE is set
+
+        Args:
+            workload_id (UUID): ID of the workload the name is reserved for
+            workload_name (Optional[str]): Name of the workload, read from Stax when needed and not given
+
+        Returns:
+            bool: True when the name was released
+        """
+        if workload_name_reservations is None:
+            return False
+
+        if workload_name is None:
+            workload_name = self.get_workload(workload_id)["Name"]
+
+        return workload_name_reservations.release(workload_name, workload_id=workload_id)
+
+    def get_existing_workload_names(self) -> Optional[Set[str]]:
+        """Get the names of all active workloads to check the names of new workloads against
+
+        Returns:
+            Optional[Set[str]]: Names of active workloads, None when names are claimed in WORKLOAD_NAME_TABLE instead
+        """
+        if workload_name_reservations:
+            return None
+
+        return {workload["Name"] for workload in self.get_workloads()["Workloads"] if workload["Status"] == "ACTIVE"}
+
+    def reserve_existing_workload_names(self) -> dict:
+        """Reserve the names of all active workloads, run once after enabling WORKLOAD_NAME_TABLE
+
+        Returns:
+            dict: Names that were reserved and names that already were
+        """
+        if workload_name_reservations is None:
+            raise ValueError("WORKLOAD_NAME_TABLE is not set")
+
+        reserved, already_reserved = [], []
+        for workload in self.get_workloads()["Workloads"]:
+            if workload["Status"] == "ACTIVE":
+                added = workload_name_reservations.reserve(workload["Name"], workload["Id"])
+                (reserved if added else already_reserved).append(workload["Name"])
+
+        return {"Reserved": reserved, "AlreadyReserved": already_reserved}
+
+    def read_catalogue_templates(self, catalogue_version_id: UUID) -> Optional[List[str]]:
+        """Read the CloudFormation templates of a catalogue version from Stax
+
+        Args:
+            catalogue_version_id (UUID): ID of the catalogue version
+
+        Returns:
+            Optional[List[str]]: Template bodies, None if the manifest has no CloudFormation resource
+        """
+        manifest = load_template(
+            read_object(self.workload_client.ReadCatalogueManifest(version_id=catalogue_version_id)["url"])
+        )
+        resources = (manifest or {}).get("Resources") or []
+        # Manifest resources are a list of single resource mappings, e.g. [{"WorkloadSSM": {"Type": ...}}]
+        resources = (
+            resources.items()
+            if isinstance(resources, dict)
+            else [resource for resource_mapping in resources for resource in resource_mapping.items()]
+        )
+        template_names = [
+            name for name, resource in resources if str(resource.get("Type", "")).lower() == "aws::cloudformation"
+        ]
+
+        if not template_names:
+            return None
+
+        return [
+            read_object(
+                self.workload_client.ReadCatalogueTemplate(version_id=catalogue_version_id, name=template_name)["url"]
+            )
+            for template_name in template_names
+        ]
+
+    def get_catalogue_template_parameters(
+        self, catalogue_id: UUID, catalogue_version_id: Optional[UUID] = None
+    ) -> Optional[Dict[str, dict]]:
+        """Get the parameters of the CloudFormation templates of a catalogue version
+
+        The version is looked up in the cached catalogue index and its templates are read from Stax once, catalogue
+        versions are immutable so their parameters are cached by catalogue version ID.
+
+        Args:
+            catalogue_id (UUID): ID of the catalogue
+            catalogue_version_id (Optional[UUID]): ID of the catalogue version, defaults to the catalogue version
+
+        Returns:
+            Optional[Dict[str, dict]]: Template parameters keyed by name, None if the catalogue version has no
+                CloudFormation template
+
+        Raises:
+            CatalogueNotFoundException: Raised when the catalogue version does not exist
+        """
+        try:
+            catalogue_version_id = self.get_catalogue_index().get_version_id(catalogue_id, catalogue_version_id)
+        except CatalogueNotFoundException:
+            # The version may have been created after the index was cached
+            catalogue_index_cache.invalidate()
+            catalogue_version_id = self.get_catalogue_index().get_version_id(catalogue_id, catalogue_version_id)
+
+        return catalogue_template_cache.get(catalogue_version_id, self.read_catalogue_templates)
+
+    def validate_workload_parameters(
+        self, catalogue_id: UUID, workload_parameters: Optional[dict], catalogue_version_id: Optional[UUID] = None
+    ) -> None:
+        """Check required parameters, unknown keys, allowed values and type constraints against the catalogue template
+
+        Args:
+            catalogue_id (UUID): ID of the catalogue
+            workload_parameters (Optional[dict]): Workload cloudformation parameters
+            catalogue_version_id (Optional[UUID]): ID of the catalogue version, defaults to the catalogue version
+
+        Raises:
+            WorkloadParametersInvalidException: Raised when the parameters are invalid
+        """
+        template_parameters = self.get_catalogue_template_parameters(catalogue_id, catalogue_version_id)
+
+        if template_parameters is None:
+            logging.warning("Catalogue %s has no template to validate workload parameters against", catalogue_id)
+            return
+
+        validate_workload_parameters(template_parameters, workload_parameters)
+
+    def get_deployment_targets(self, event: dict) -> List["StaxOrchestrator.DeploymentTarget"]:
+        """Get the deployment targets of a fan out event
+
+        Targets are either a list of {"aws_account_id", "aws_region"} or a matrix of
+        {"aws_account_ids": [...], "aws_regions": [...]}. Duplicates are dropped and targets are interleaved
+        across accounts and regions so consecutive deployments hit different accounts and regions.
+
+        Args:
+            event (dict): Fan out event containing targets
+
+        Returns:
+            List[DeploymentTarget]: Deployment targets
+        """
+        targets = event["targets"]
+
+        if isinstance(targets, dict):
+            targets = [
+                {"aws_account_id": aws_account_id, "aws_region": aws_region}
+                for aws_account_id in targets["aws_account_ids"]
+                for aws_region in targets["aws_regions"]
+            ]
+
+        targets_by_account = {}
+        for target in targets:
+            deployment_target = self.DeploymentTarget(target["aws_account_id"], target["aws_region"])
+            account_targets = targets_by_account.setdefault(deployment_target.aws_account_id, [])
+            if deployment_target not in account_targets:
+                account_targets.append(deployment_target)
+
+        rotated_targets = [
+            account_targets[offset % len(account_targets) :] + account_targets[: offset % len(account_targets)]
+            for offset, account_targets in enumerate(targets_by_account.values())
+        ]
+
+        return [target for targets in zip_longest(*rotated_targets) for target in targets if target]
+
+    def get_fan_out_workload_name(self, workload_name: str, target: "StaxOrchestrator.DeploymentTarget") -> str:
+        """Get the deterministic name of a workload instance deployed to a target
+
+        Args:
+            workload_name (str): Name of the workload to deploy
+            target (DeploymentTarget): Account and region the instance is deployed to
+
+        Returns:
+            str: <workload_name>-<aws_region>-<account ID>, at most 64 characters. Workload names that do not fit are
+                shortened and end with a hash of the full name so different workloads keep different names.
+        """
+        suffix = f"-{target.aws_region}-{target.aws_account_id}"
+
+        if len(workload_name) + len(suffix) > MAX_WORKLOAD_NAME_LENGTH:
+            name_hash = sha256(workload_name.encode()).hexdigest()[:8]
+            workload_name = f"{workload_name[: MAX_WORKLOAD_NAME_LENGTH - len(suffix) - 9]}-{name_hash}"
+
+        return f"{workload_name}{suffix}"
+
+    def get_fan_out_workload_kwargs(self, event: dict) -> List[dict]:
+        """Expand a fan out event into create workload keyword arguments for every target
+
+        Args:
+            event (dict): Workload spec and targets to deploy it to
+
+        Returns:
+            List[dict]: Create workload keyword arguments per target
+        """
+        event = self.resolve_catalogue_references(event)
+        optional_kwargs = ["catalogue_version_id", "workload_parameters", "workload_tags"]
+
+        return [
+            {
+                "aws_account_id": target.aws_account_id,
+                "aws_region": target.aws_region,
+                "catalogue_id": event["catalogue_id"],
+                "workload_name": self.get_fan_out_workload_name(event["workload_name"], target),
+                **{
+                    optional_kwarg: event[optional_kwarg]
+                    for optional_kwarg in optional_kwargs
+                    if event.get(optional_kwarg)
+                },
+            }
+            for target in self.get_deployment_targets(event)
+        ]
+
+    def get_fan_out_waves(
+        self, workload_kwargs: List[dict], max_per_account: Optional[int] = None, max_per_region: Optional[int] = None
+    ) -> List[List[dict]]:
+        """Split fan out instances into waves with at most max_per_account instances per account and max_per_region
+        instances per region, so a state machine running one wave at a time keeps the concurrency caps
+
+        Args:
+            workload_kwargs (List[dict]): Create workload keyword arguments per target, see get_fan_out_workload_kwargs
+            max_per_account (Optional[int]): Maximum number of instances per account in a wave, None for no limit
+            max_per_region (Optional[int]): Maximum number of instances per region in a wave, None for no limit
+
+        Returns:
+            List[List[dict]]: Waves of create workload keyword arguments, in target order
+        """
+        if not max_per_account and not max_per_region:
+            return [workload_kwargs] if workload_kwargs else []
+
+        waves: List[List[dict]] = []
+        wave_counts: List[Dict[str, Dict[str, int]]] = []
+
+        def fits(counts: Dict[str, Dict[str, int]], kwargs: dict) -> bool:
+            return (not max_per_account or counts["account"].get(kwargs["aws_account_id"], 0) < max_per_account) and (
+                not max_per_region or counts["region"].get(kwargs["aws_region"], 0) < max_per_region
+            )
+
+        for kwargs in workload_kwargs:
+            wave_index = next((index for index, counts in enumerate(wave_counts) if fits(counts, kwargs)), None)
+            if wave_index is None:
+                waves.append([])
+                wave_counts.append({"account": {}, "region": {}})
+                wave_index = len(waves) - 1
+
+            waves[wave_index].append(kwargs)
+            counts = wave_counts[wave_index]
+            counts["account"][kwargs["aws_account_id"]] = counts["account"].get(kwargs["aws_account_id"], 0) + 1
+            counts["region"][kwargs["aws_region"]] = counts["region"].get(kwargs["aws_region"], 0) + 1
+
+        return waves
+
+    # pylint: disable=too-many-arguments,too-many-locals
+    def create_workloads(
+        self,
+        event: dict,
+        max_workers: int = 20,
+        max_per_account: Optional[int] = None,
+        max_per_region: Optional[int] = None,
+        requests_per_second: Optional[float] = 5,
+        wait_for_completion: bool = False,
+        poll_interval: float = 10,
+    ) -> dict:
+        """Create one workload spec in every target account and region concurrently
+
+        Instances that already exist under their deterministic name are skipped so a rollout can be re-run. Every
+        instance is created with create_unique_workload, so its name is claimed first when WORKLOAD_NAME_TABLE is set,
+        otherwise all workloads are listed once up front.
+
+        Args:
+            event (dict): Workload spec and targets, see get_fan_out_workload_kwargs
+            max_workers (int): Maximum number of concurrent deployments
+            max_per_account (Optional[int]): Maximum number of concurrent deployments per account, defaults to the
+                max_per_account of the event
+            max_per_region (Optional[int]): Maximum number of concurrent deployments per region, defaults to the
+                max_per_region of the event
+            requests_per_second (Optional[float]): Maximum rate of create calls, None disables rate limiting
+            wait_for_completion (bool): Hold the account/region slots until each workload task has finished
+            poll_interval (float): Seconds to wait between task status polls when waiting for completion
+
+        Returns:
+            dict: Created, skipped and failed instances with their task IDs and, when waiting, final task status
+        """
+        workload_kwargs = self.get_fan_out_workload_kwargs(event)
+        existing_names = self.get_existing_workload_names()
+        # create_unique_workload adds the names it creates to existing_names, skip only the names listed up front
+        listed_names = set(existing_names or ())
+        account_limiter = KeyedLimiter(max_per_account or event.get("max_per_account"))
+        region_limiter = KeyedLimiter(max_per_region or event.get("max_per_region"))
+        rate_limiter = RateLimiter(requests_per_second)
+
+        def deploy(kwargs: dict) -> dict:
+            with account_limiter.hold(kwargs["aws_account_id"]), region_limiter.hold(kwargs["aws_region"]):
+                rate_limiter.acquire()
+                response = self.create_unique_workload(existing_names=existing_names, **kwargs)
+                workload = response.get("Detail", {}).get("Workload", {})
+                deployment = {"WorkloadId": workload.get("WorkloadId"), "TaskId": workload.get("TaskId")}
+
+                if wait_for_completion and deployment["TaskId"]:
+                    task_info = self.wait_for_tasks([deployment["TaskId"]], poll_interval=poll_interval)
+                    deployment["TaskStatus"] = task_info[deployment["TaskId"]]["Status"]
+
+                return deployment
+
+        pending = [kwargs for kwargs in workload_kwargs if kwargs["workload_name"] not in listed_names]
+        results = run_concurrently(deploy, pending, max_workers=max_workers)
+
+        def describe(kwargs: dict) -> dict:
+            return {key: kwargs[key] for key in ("workload_name", "aws_account_id", "aws_region")}
+
+        created = [{**describe(result.item), **result.result} for result in results if result.error is None]
+        # Names found taken when claiming them are skipped like the existing workloads listed up front
+        already_exists = [isinstance(result.error, self.WorkloadWithNameAlreadyExistsException) for result in results]
+
+        return {
+            "Created": created,
+            "Skipped": [describe(kwargs) for kwargs in workload_kwargs if kwargs["workload_name"] in listed_names]
+            + [describe(result.item) for result, exists in zip(results, already_exists) if exists],
+            "Failed": [
+                {**describe(result.item), "Error": str(result.error)}
+                for result, exists in zip(results, already_exists)
+                if result.error and not exists
+            ],
+            "TaskIds": [deployment["TaskId"] for deployment in created if deployment["TaskId"]],
+        }
 
     def get_parameters_list(self, workload_parameters: dict) -> list:
         """Takes a dict of params/values and converts them into a list of dicts
@@ -178,32 +906,272 @@ class StaxOrchestrator:
     def get_task_status(self, task_id: UUID) -> dict:
         """Poll Stax to get status of a given workload task
 
+        Finished tasks are served from the task status cache without calling Stax, unfinished tasks are
+        only served from the cache for TASK_STATUS_CACHE_TTL_SECONDS.
+
         Args:
             task_id (UUID): ID of the task to get status for
 
         Returns:
             dict: Task status information
         """
-        return self.tasks_client.ReadTask(task_id=task_id)
+        return task_status_cache.get(task_id, lambda task_id: self.tasks_client.ReadTask(task_id=task_id))
+
+    @staticmethod
+    def get_task_status_cache_stats() -> dict:
+        """Get hit and miss counters of the task status cache
+
+        Returns:
+            dict: Number of cache hits, misses and cached tasks
+        """
+        return task_status_cache.stats()
+
+    def get_tasks_status(self, task_ids: List[UUID], max_workers: int = 10) -> dict:
+        """Poll Stax concurrently to get status of several workload tasks
+
+        Args:
+            task_ids (List[UUID]): IDs of the tasks to get status for
+            max_workers (int): Maximum number of concurrent ReadTask calls
+
+        Returns:
+            dict: Task status information keyed by task ID, errors are reported under an Error key
+        """
+        results = run_concurrently(self.get_task_status, task_ids, max_workers=max_workers)
+
+        return {
+            result.item: result.result if result.error is None else {"Error": str(result.error)} for result in results
+        }
+
+    def wait_for_tasks(
+        self, task_ids: List[UUID], poll_interval: float = 10, timeout: float = 7200, max_workers: int = 10
+    ) -> dict:
+        """Track several workload tasks together until every task has succeeded or failed
+
+        Args:
+            task_ids (List[UUID]): IDs of the tasks to track
+            poll_interval (float): Seconds to wait between polls
+            timeout (float): Maximum number of seconds to wait for all tasks
+            max_workers (int): Maximum number of concurrent ReadTask calls
+
+        Returns:
+            dict: Final task status information keyed by task ID
+
+        Raises:
+            TaskTrackingTimeoutException: Raised when tasks are still in progress after the timeout
+        """
+        deadline = monotonic() + timeout
+        finished = {}
+        pending = list(task_ids)
+
+        while pending:
+            for task_id, task_info in self.get_tasks_status(pending, max_workers=max_workers).items():
+                if task_info.get("Status") in TERMINAL_TASK_STATUSES:
+                    finished[task_id] = task_info
 
-    def get_workloads(self) -> dict:
+            pending = [task_id for task_id in pending if task_id not in finished]
+
+            if pending:
+                if monotonic() + poll_interval > deadline:
+                    raise self.TaskTrackingTimeoutException(f"Tasks {pending} did not finish within {timeout} seconds")
+                sleep(poll_interval)
+
+        return finished
+
+    def get_workloads(self, include_tags: bool = False) -> dict:
         """Poll Stax to get a list of all workloads
 
+        Args:
+            include_tags (bool): Include the tags of workloads that are not deleted, see add_workload_tags
+
         Returns:
             dict: Dictionary containing lists of workloads.
         """
-        return self.workload_client.ReadWorkloads()
+        workloads = self.workload_client.ReadWorkloads()
+
+        if include_tags:
+            self.add_workload_tags(
+                [workload for workload in workloads["Workloads"] if workload.get("Status") != "DELETED"]
+            )
+
+        return workloads
+
+    def add_workload_tags(
+        self, workloads: List[dict], max_workers: int = 10, requests_per_second: Optional[float] = 5
+    ) -> List[dict]:
+        """Read the tags of workloads one by one and add them to the workloads in place
+
+        Only the single workload endpoint of Stax accepts include_tags, workloads listed by ReadWorkloads have no Tags.
+
+        Args:
+            workloads (List[dict]): Stax workloads as returned by ReadWorkloads
+            max_workers (int): Maximum number of concurrent ReadWorkloads calls
+            requests_per_second (Optional[float]): Maximum rate of ReadWorkloads calls, None disables rate limiting
+
+        Returns:
+            List[dict]: The workloads with their Tags
+
+        Raises:
+            Exception: The first error of reading the tags of a workload
+        """
+        results = run_concurrently(
+            lambda workload: self.workload_client.ReadWorkloads(workload_id=workload["Id"], include_tags=True),
+            workloads,
+            max_workers=max_workers,
+            rate_limiter=RateLimiter(requests_per_second),
+        )
+
+        for result in results:
+            if result.error is not None:
+                raise result.error
+            result.item["Tags"] = result.result["Workloads"][0].get("Tags") or {}
+
+        return workloads
+
+    def get_workload(self, workload_id: UUID) -> dict:
+        """Poll Stax to get a single workload
+
+        Args:
+            workload_id (UUID): ID of the workload
+
+        Returns:
+            dict: Stax workload
+        """
+        return self.workload_client.ReadWorkloads(workload_id=workload_id)["Workloads"][0]
+
+    def get_workload_index(self) -> WorkloadIndex:
+        """Get the process wide workload index, rebuilt from a new inventory snapshot once its TTL has expired
+
+        A snapshot is a single ReadWorkloads call, tags are only read by query_workloads for tag queries.
+
+        Returns:
+            WorkloadIndex: Index of workloads by tag, account, region, catalogue and status
+        """
+        return workload_index_cache.get(lambda: workload_index_cache.build(self.get_workloads()["Workloads"]))
+
+    # pylint: disable=too-many-arguments
+    def query_workloads(
+        self,
+        tags: Optional[Dict[str, Criterion]] = None,
+        any_tags: Optional[Dict[str, Criterion]] = None,
+        aws_account_id: Optional[Criterion] = None,
+        aws_region: Optional[Criterion] = None,
+        catalogue_id: Optional[Criterion] = None,
+        status: Optional[Criterion] = "ACTIVE",
+    ) -> List[dict]:
+        """Find workloads with the workload index, every criterion is a value or a list of values of which any matches
+
+        Tag queries read the tags of the workloads matching every other criterion whose tags were not read before.
+
+        Args:
+            tags (Optional[dict]): Tags that must all match, e.g. {"owner": "platform", "environment": ["dev", "test"]}
+            any_tags (Optional[dict]): Tags of which at least one must match
+            aws_account_id (Optional[Criterion]): Stax AWS account ID(s)
+            aws_region (Optional[Criterion]): AWS region(s)
+            catalogue_id (Optional[Criterion]): Catalogue ID(s)
+            status (Optional[Criterion]): Workload status(es), None matches every status
+
+        Returns:
+            List[dict]: Matching Stax workloads
+        """
+        attributes = {
+            "aws_account_id": aws_account_id,
+            "aws_region": aws_region,
+            "catalogue_id": catalogue_id,
+            "status": status,
+        }
+        index = self.get_workload_index()
+
+        if tags or any_tags:
+            untagged = [dict(workload) for workload in index.query(**attributes) if "Tags" not in workload]
+            if untagged:
+                workload_index_cache.add_tags(self.add_workload_tags(untagged))
+                index = self.get_workload_index()
+
+        return index.query(tags=tags, any_tags=any_tags, **attributes)
+
+    def select_workloads(self, selector: "StaxOrchestrator.WorkloadSelector") -> List[dict]:
+        """Get all workloads matching a selector, tags are only read for workloads matching every other criterion
+
+        Args:
+            selector (WorkloadSelector): Criteria to match workloads against
+
+        Returns:
+            List[dict]: Matching Stax workloads
+        """
+        untagged_selector = replace(selector, workload_tags=None)
+        candidates = [
+            workload for workload in self.get_workloads()["Workloads"] if untagged_selector.matches(workload)
+        ]
+
+        if selector.workload_tags:
+            self.add_workload_tags(candidates)
+
+        return [workload for workload in candidates if selector.matches(workload)]
 
     def delete_workload(self, workload_id: UUID) -> dict:
         """Delete a Stax workload
 
+        Its name stays reserved when WORKLOAD_NAME_TABLE is set, the name is released with release_workload_name
+        once the delete task succeeded.
+
         Args:
             workload_id (UUID): ID of the workload to delete
 
         Returns:
             dict: Delete workload response
         """
-        return self.workload_client.DeleteWorkload(workload_id=workload_id)
+        response = self.workload_client.DeleteWorkload(workload_id=workload_id)
+        workload_index_cache.remove(workload_id)
+
+        return response
+
+    def delete_workloads(
+        self,
+        selector: "StaxOrchestrator.WorkloadSelector",
+        dry_run: bool = False,
+        max_workers: int = 10,
+        requests_per_second: Optional[float] = 5,
+    ) -> dict:
+        """Delete all Stax workloads matching a selector concurrently
+
+        Args:
+            selector (WorkloadSelector): Criteria to match workloads to delete
+            dry_run (bool): Only report the workloads that would be deleted
+            max_workers (int): Maximum number of concurrent delete calls
+            requests_per_second (Optional[float]): Maximum rate of delete calls, None disables rate limiting
+
+        Returns:
+            dict: Matched workloads, deleted workloads with their task IDs and failed deletions
+        """
+        workloads = [
+            {"WorkloadId": workload["Id"], "Name": workload["Name"]} for workload in self.select_workloads(selector)
+        ]
+
+        if dry_run:
+            return {"DryRun": True, "Workloads": workloads}
+
+        results = run_concurrently(
+            lambda workload: self.delete_workload(workload["WorkloadId"]),
+            workloads,
+            max_workers=max_workers,
+            rate_limiter=RateLimiter(requests_per_second),
+        )
+
+        deleted, failed = [], []
+        for result in results:
+            if result.error is not None:
+                failed.append({**result.item, "Error": str(result.error)})
+            else:
+                task_id = result.result.get("Detail", {}).get("Workload", {}).get("TaskId")
+                deleted.append({**result.item, "TaskId": task_id})
+
+        return {
+            "DryRun": False,
+            "Workloads": workloads,
+            "Deleted": deleted,
+            "Failed": failed,
+            "TaskIds": [workload["TaskId"] for workload in deleted if workload["TaskId"]],
+        }
 
     def update_workload(self, workload_id: UUID, catalogue_version_id: UUID) -> dict:
         """Update a Stax workload
@@ -243,6 +1211,8 @@ class StaxOrchestrator:
         Returns:
             dict: Dictionary of create workload keyword arguments.
         """
+        event = self.resolve_catalogue_references(event)
+
         workload_kwargs = {
             "aws_account_id": event["aws_account_id"],
             "aws_region": event["aws_region"],
@@ -267,6 +1237,8 @@ class StaxOrchestrator:
         Returns:
             dict: Dictionary of update workload keyword arguments.
         """
+        event = self.resolve_catalogue_references(event)
+
         return {
             "catalogue_version_id": event["catalogue_version_id"],
             "workload_id": event["workload_id"],
@@ -282,3 +1254,56 @@ class StaxOrchestrator:
             dict: Dictionary of update workload keyword arguments.
         """
         return {"workload_id": event["workload_id"]}
+
+    def validate_workload_event(self, event: dict) -> dict:
+        """Validate a workload state machine event and get the arguments of its operation
+
+        Args:
+            event (dict): Details about the workload to be deployed/updated/deleted
+
+        Returns:
+            dict: Details about the catalogue, workload and account
+
+        Raises:
+            KeyError: Raised when required event arguments are not present
+            ValueError: Raised when the operation is not supported or workload parameters do not match the catalogue
+        """
+        if event["operation"] == WorkloadOperation.CREATE:
+            workload_kwargs = self.get_create_workload_kwargs(event)
+            if parameter_validation_enabled():
+                self.validate_workload_parameters(
+                    workload_kwargs["catalogue_id"],
+                    workload_kwargs.get("workload_parameters"),
+                    workload_kwargs.get("catalogue_version_id"),
+                )
+            return self.CreateWorkloadEvent(**workload_kwargs).__dict__
+
+        if event["operation"] == WorkloadOperation.UPDATE:
+            workload_kwargs = self.get_update_workload_kwargs(event)
+            return self.UpdateWorkloadEvent(**workload_kwargs).__dict__
+
+        if event["operation"] == WorkloadOperation.DELETE:
+            workload_kwargs = self.get_delete_workload_kwargs(event)
+            return self.DeleteWorkloadEvent(**workload_kwargs).__dict__
+
+        if event["operation"] == WorkloadOperation.FAN_OUT:
+            fan_out_kwargs = self.get_fan_out_workload_kwargs(event)
+            if parameter_validation_enabled() and fan_out_kwargs:
+                self.validate_workload_parameters(
+                    fan_out_kwargs[0]["catalogue_id"],
+                    fan_out_kwargs[0].get("workload_parameters"),
+                    fan_out_kwargs[0].get("catalogue_version_id"),
+                )
+            waves = self.get_fan_out_waves(
+                fan_out_kwargs,
+                int(event.get("max_per_account") or 0) or None,
+                int(event.get("max_per_region") or 0) or None,
+            )
+            return {
+                "workload_waves": [
+                    [self.CreateWorkloadEvent(**workload_kwargs).__dict__ for workload_kwargs in wave]
+                    for wave in waves
+                ]
+            }
+
+        raise ValueError(f"{event['operation']} is not a supported operation.")
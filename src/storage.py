@@ -0,0 +1,161 @@
+"""
+    Read and write objects on the local filesystem or an S3 compatible object store.
+"""
+import os
+from typing import Dict, Iterator, Sequence, Tuple, Union
+from urllib.parse import urlparse
+
+
+def write_object(path: str, body: Union[str, bytes]) -> None:
+    """Write an object to a local path or s3://bucket/key url
+
+    Args:
+        path (str): Local path or s3 url of the object
+        body (Union[str, bytes]): Content of the object
+    """
+    body = body.encode() if isinstance(body, str) else body
+    url = urlparse(path)
+
+    if url.scheme == "s3":
+        import boto3  # pylint: disable=import-outside-toplevel
+
+        boto3.client("s3").put_object(Bucket=url.netloc, Key=url.path.lstrip("/"), Body=body)
+        return
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "wb") as file:
+        file.write(body)
+
+
+def read_object(path: str) -> str:
+    """Read a text object from a local path, s3://bucket/key url or https url
+
+    Args:
+        path (str): Local path or url of the object
+
+    Returns:
+        str: Content of the object
+    """
+    url = urlparse(path)
+
+    if url.scheme == "s3":
+        import boto3  # pylint: disable=import-outside-toplevel
+
+        return boto3.client("s3").get_object(Bucket=url.netloc, Key=url.path.lstrip("/"))["Body"].read().decode()
+
+    if url.scheme in ("http", "https"):
+        from urllib.request import urlopen  # pylint: disable=import-outside-toplevel
+
+        with urlopen(path, timeout=30) as response:
+            return response.read().decode()
+
+    with open(path, encoding="utf-8") as file:
+        return file.read()
+
+
+def is_missing_object(error: Exception) -> bool:
+    """Check if reading an object with read_object failed because the object does not exist"""
+    return isinstance(error, FileNotFoundError) or getattr(error, "response", {}).get("Error", {}).get("Code") in (
+        "NoSuchKey",
+        "404",
+    )
+
+
+def read_objects(location: str, suffix: str = "") -> Iterator[str]:
+    """Read every text object below a local directory or s3://bucket/prefix url
+
+    Args:
+        location (str): Local directory or s3 url
+        suffix (str): Only read objects whose name ends with the suffix
+
+    Returns:
+        Iterator[str]: Content of the objects
+    """
+    url = urlparse(location)
+
+    if url.scheme == "s3":
+        import boto3  # pylint: disable=import-outside-toplevel
+
+        s3_client = boto3.client("s3")
+        prefix = url.path.strip("/")
+        for page in s3_client.get_paginator("list_objects_v2").paginate(Bucket=url.netloc, Prefix=prefix):
+            for s3_object in page.get("Contents", []):
+                if s3_object["Key"].endswith(suffix):
+                    yield s3_client.get_object(Bucket=url.netloc, Key=s3_object["Key"])["Body"].read().decode()
+        return
+
+    if not os.path.isdir(location):
+        return
+
+    for file_name in sorted(os.listdir(location)):
+        if file_name.endswith(suffix):
+            with open(os.path.join(location, file_name), encoding="utf-8") as file:
+                yield file.read()
+
+
+def _relative_key(key: str, prefix: str) -> str:
+    return key[len(prefix) + 1 :] if prefix else key
+
+
+def list_objects(location: str) -> Iterator[Tuple[str, float]]:
+    """List the objects below a local directory or s3://bucket/prefix url
+
+    Args:
+        location (str): Local directory or s3 url
+
+    Returns:
+        Iterator[Tuple[str, float]]: Name of every object relative to the location and its last modified timestamp
+    """
+    url = urlparse(location)
+
+    if url.scheme == "s3":
+        import boto3  # pylint: disable=import-outside-toplevel
+
+        prefix = url.path.strip("/")
+        paginator = boto3.client("s3").get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=url.netloc, Prefix=f"{prefix}/" if prefix else ""):
+            for s3_object in page.get("Contents", []):
+                yield _relative_key(s3_object["Key"], prefix), s3_object["LastModified"].timestamp()
+        return
+
+    if not os.path.isdir(location):
+        return
+
+    for file_name in sorted(os.listdir(location)):
+        path = os.path.join(location, file_name)
+        if os.path.isfile(path):
+            yield file_name, os.path.getmtime(path)
+
+
+def delete_objects(location: str, names: Sequence[str]) -> Dict[str, str]:
+    """Delete objects below a local directory or s3://bucket/prefix url in a single request
+
+    Args:
+        location (str): Local directory or s3 url
+        names (Sequence[str]): Names of the objects relative to the location, at most 1000 for s3
+
+    Returns:
+        Dict[str, str]: Error message of every object that could not be deleted
+    """
+    url = urlparse(location)
+    errors: Dict[str, str] = {}
+
+    if url.scheme == "s3":
+        import boto3  # pylint: disable=import-outside-toplevel
+
+        prefix = url.path.strip("/")
+        keys = [f"{prefix}/{name}" if prefix else name for name in names]
+        response = boto3.client("s3").delete_objects(
+            Bucket=url.netloc, Delete={"Objects": [{"Key": key} for key in keys], "Quiet": True}
+        )
+        for error in response.get("Errors", []):
+            errors[_relative_key(error["Key"], prefix)] = error.get("Message", error.get("Code", ""))
+        return errors
+
+    for name in names:
+        try:
+            os.remove(os.path.join(location, name))
+        except OSError as error:
+            errors[name] = str(error)
+
+    return errors
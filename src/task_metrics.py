@@ -0,0 +1,254 @@
+"""
+    Record Stax task durations into mergeable histograms for capacity planning.
+"""
+import json
+from collections import OrderedDict
+from math import ceil, log2
+from os import environ
+from threading import Lock
+from time import monotonic
+from typing import Dict, Optional
+from uuid import uuid4
+
+from src.storage import read_objects, write_object
+
+TASK_METRICS_LOCATION = "TASK_METRICS_LOCATION"
+
+
+class DurationHistogram:
+    """HDR style histogram of durations in milliseconds.
+
+    Values are grouped into power of two buckets that are split into linear sub buckets, keeping the
+    relative error below 10^-significant_figures while only storing buckets that have been hit.
+    Histograms with the same precision can be merged which allows recording to be sharded.
+    """
+
+    def __init__(self, significant_figures: int = 2, counts: Optional[Dict[int, int]] = None):
+        """
+        Args:
+            significant_figures (int): Number of significant decimal digits to keep for every value
+            counts (Optional[Dict[int, int]]): Recorded counts keyed by bucket index
+        """
+        self.significant_figures = significant_figures
+        self._sub_bucket_bits = ceil(log2(2 * 10**significant_figures))
+        self._sub_bucket_count = 1 << self._sub_bucket_bits
+        self._sub_bucket_half_count = self._sub_bucket_count // 2
+        self.counts: Dict[int, int] = dict(counts or {})
+
+    def _index(self, value: int) -> int:
+        if value < self._sub_bucket_count:
+            return value
+
+        shift = value.bit_length() - self._sub_bucket_bits
+        return shift * self._sub_bucket_half_count + (value >> shift)
+
+    def _highest_equivalent_value(self, index: int) -> int:
+        if index < self._sub_bucket_count:
+            return index
+
+        shift = index // self._sub_bucket_half_count - 1
+        sub_bucket = index - shift * self._sub_bucket_half_count
+        return ((sub_bucket + 1) << shift) - 1
+
+    @property
+    def total_count(self) -> int:
+        """Number of recorded values"""
+        return sum(self.counts.values())
+
+    def record(self, value: float, count: int = 1) -> None:
+        """Record a duration
+
+        Args:
+            value (float): Duration in milliseconds
+            count (int): Number of times the duration was observed
+        """
+        index = self._index(max(0, int(value)))
+        self.counts[index] = self.counts.get(index, 0) + count
+
+    def merge(self, other: "DurationHistogram") -> "DurationHistogram":
+        """Add the counts of another histogram to this histogram
+
+        Args:
+            other (DurationHistogram): Histogram with the same precision
+
+        Returns:
+            DurationHistogram: This histogram
+        """
+        if other.significant_figures != self.significant_figures:
+            raise ValueError("Only histograms with the same significant figures can be merged.")
+
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+
+        return self
+
+    def percentile(self, percentile: float) -> int:
+        """Get the duration at or below which the given percentage of recorded values fall
+
+        Args:
+            percentile (float): Percentile between 0 and 100
+
+        Returns:
+            int: Duration in milliseconds, 0 when nothing has been recorded
+        """
+        target = max(1, ceil(self.total_count * percentile / 100))
+        seen = 0
+
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= target:
+                return self._highest_equivalent_value(index)
+
+        return 0
+
+    def summary(self) -> dict:
+        """Get count, min, max and common percentiles of the recorded durations"""
+        if not self.counts:
+            return {"count": 0}
+
+        return {
+            "count": self.total_count,
+            "min": self._highest_equivalent_value(min(self.counts)),
+            "max": self._highest_equivalent_value(max(self.counts)),
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+        }
+
+    def to_dict(self) -> dict:
+        """Serialise the histogram to a JSON compatible dictionary"""
+        return {"significant_figures": self.significant_figures, "counts": self.counts}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "DurationHistogram":
+        """Deserialise a histogram created by to_dict"""
+        return cls(data["significant_figures"], {int(index): count for index, count in data["counts"].items()})
+
+
+class TaskDurationRecorder:  # pylint: disable=too-many-instance-attributes
+    """Record task durations per operation, catalogue and region and persist them as a shard.
+
+    Every recorder owns a single shard object below the location (a local directory or an s3://bucket/prefix
+    url) so concurrent lambda containers never overwrite each other, shards are merged on export. Durations are
+    buffered and the shard is written at most once per flush interval, and every task is only recorded once.
+    """
+
+    def __init__(
+        self,
+        location: str,
+        shard_id: Optional[str] = None,
+        flush_interval_seconds: float = 60,
+        max_task_ids: int = 10000,
+    ):
+        """
+        Args:
+            location (str): Local directory or s3://bucket/prefix url to persist histograms to
+            shard_id (Optional[str]): Name of the shard owned by this recorder
+            flush_interval_seconds (float): Minimum number of seconds between writes of the shard
+            max_task_ids (int): Number of recorded task IDs remembered to skip tasks that are recorded again
+        """
+        self.location = location.rstrip("/")
+        self.shard_id = shard_id or str(uuid4())
+        self.flush_interval_seconds = flush_interval_seconds
+        self.max_task_ids = max_task_ids
+        self.histograms: Dict[str, DurationHistogram] = {}
+        self._recorded_task_ids: "OrderedDict[str, None]" = OrderedDict()
+        self._pending = 0
+        self._flushed_at: Optional[float] = None
+        self._lock = Lock()
+
+    @classmethod
+    def from_environment(cls) -> Optional["TaskDurationRecorder"]:
+        """Create a recorder for the location in TASK_METRICS_LOCATION, None if recording is disabled"""
+        location = environ.get(TASK_METRICS_LOCATION)
+
+        if not location:
+            return None
+
+        return cls(location, flush_interval_seconds=float(environ.get("TASK_METRICS_FLUSH_INTERVAL_SECONDS", 60)))
+
+    @staticmethod
+    def get_key(operation: str, catalogue_id: str, region: str) -> str:
+        """Get the histogram key for an operation, catalogue and region"""
+        return f"{operation}/{catalogue_id}/{region}"
+
+    # pylint: disable=too-many-arguments
+    def record(
+        self, operation: str, catalogue_id: str, region: str, duration_ms: float, task_id: Optional[str] = None
+    ) -> bool:
+        """Record a task duration, the shard is written when the flush interval has passed
+
+        Args:
+            operation (str): Workload operation of the task
+            catalogue_id (str): Catalogue of the workload
+            region (str): AWS region of the workload
+            duration_ms (float): Task duration in milliseconds
+            task_id (Optional[str]): ID of the task, durations of a task that was already recorded are skipped
+
+        Returns:
+            bool: Whether the duration was recorded
+        """
+        with self._lock:
+            if task_id is not None:
+                if task_id in self._recorded_task_ids:
+                    return False
+
+                self._recorded_task_ids[task_id] = None
+                while len(self._recorded_task_ids) > self.max_task_ids:
+                    self._recorded_task_ids.popitem(last=False)
+
+            key = self.get_key(operation, catalogue_id, region)
+            self.histograms.setdefault(key, DurationHistogram()).record(duration_ms)
+            self._pending += 1
+            flush_due = self._flushed_at is None or monotonic() - self._flushed_at >= self.flush_interval_seconds
+
+        if flush_due:
+            self.flush()
+
+        return True
+
+    def flush(self) -> None:
+        """Persist recorded histograms to this recorder's shard, if any were recorded since the last flush"""
+        with self._lock:
+            if not self._pending:
+                return
+
+            body = json.dumps({key: histogram.to_dict() for key, histogram in self.histograms.items()})
+            write_object(f"{self.location}/{self.shard_id}.json", body)
+            self._pending = 0
+            self._flushed_at = monotonic()
+
+
+def load_histograms(location: str) -> Dict[str, DurationHistogram]:
+    """Load and merge all histogram shards below a location
+
+    Args:
+        location (str): Local directory or s3://bucket/prefix url
+
+    Returns:
+        Dict[str, DurationHistogram]: Merged histograms keyed by operation/catalogue/region
+    """
+    histograms: Dict[str, DurationHistogram] = {}
+
+    for body in read_objects(location, suffix=".json"):
+        for key, data in json.loads(body).items():
+            histogram = DurationHistogram.from_dict(data)
+            if key in histograms:
+                histograms[key].merge(histogram)
+            else:
+                histograms[key] = histogram
+
+    return histograms
+
+
+def export_task_durations(location: str) -> dict:
+    """Export duration summaries (milliseconds) per operation, catalogue and region
+
+    Args:
+        location (str): Local directory or s3://bucket/prefix url
+
+    Returns:
+        dict: Summaries keyed by operation/catalogue/region
+    """
+    return {key: histogram.summary() for key, histogram in sorted(load_histograms(location).items())}
@@ -0,0 +1,85 @@
+"""
+    Process wide cache of Stax task status responses that keeps finished tasks and briefly keeps running tasks.
+"""
+from collections import OrderedDict
+from threading import Lock
+from time import monotonic
+from typing import Callable, Hashable, Optional, Tuple
+
+from src.constants import TERMINAL_TASK_STATUSES
+
+
+class TaskStatusCache:
+    """Bounded LRU cache of ReadTask responses.
+
+    Responses of succeeded or failed tasks never change so they are kept until evicted by newer entries,
+    responses of tasks that are still in progress are only reused for a short time.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl_seconds: float = 5):
+        """
+        Args:
+            max_size (int): Maximum number of cached tasks, 0 disables caching
+            ttl_seconds (float): Number of seconds the status of an unfinished task stays valid
+        """
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, Tuple[dict, Optional[float]]]" = OrderedDict()
+        self._lock = Lock()
+
+    def _lookup(self, task_id: Hashable) -> Optional[dict]:
+        with self._lock:
+            entry = self._entries.get(task_id)
+
+            if entry is not None and (entry[1] is None or monotonic() < entry[1]):
+                self._entries.move_to_end(task_id)
+                self.hits += 1
+                return entry[0]
+
+            self.misses += 1
+            return None
+
+    def _store(self, task_id: Hashable, task_info: dict) -> None:
+        if not self.max_size:
+            return
+
+        terminal = isinstance(task_info, dict) and task_info.get("Status") in TERMINAL_TASK_STATUSES
+
+        with self._lock:
+            self._entries[task_id] = (task_info, None if terminal else monotonic() + self.ttl_seconds)
+            self._entries.move_to_end(task_id)
+
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def get(self, task_id: Hashable, loader: Callable[[Hashable], dict]) -> dict:
+        """Get the cached status of a task, loading it when missing or expired
+
+        Args:
+            task_id (Hashable): ID of the task
+            loader (Callable): Called with the task ID to read the task status from Stax
+
+        Returns:
+            dict: Task status information
+        """
+        task_info = self._lookup(task_id)
+
+        if task_info is None:
+            task_info = loader(task_id)
+            self._store(task_id, task_info)
+
+        return task_info
+
+    def stats(self) -> dict:
+        """Get hit and miss counters and the number of cached tasks"""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._entries)}
+
+    def clear(self) -> None:
+        """Drop all cached tasks and reset the counters"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
@@ -0,0 +1,34 @@
+"""
+    Configure AWS X-Ray tracing only for functions deployed with tracing enabled.
+"""
+from os import environ
+
+LAMBDA_TRACING_ENABLED = "LAMBDA_TRACING_ENABLED"
+
+
+def tracing_enabled() -> bool:
+    """Check if X-Ray tracing has been enabled through the LAMBDA_TRACING_ENABLED environment variable"""
+    return environ.get(LAMBDA_TRACING_ENABLED, "false").lower() == "true"
+
+
+def configure_tracing(service: str) -> bool:
+    """Configure the X-Ray recorder and patch supported libraries when tracing is enabled
+
+    The X-Ray SDK (and botocore which it imports) is only loaded when tracing is enabled to keep the memory
+    footprint and cold start of functions without tracing small.
+
+    Args:
+        service (str): Name of the traced service
+
+    Returns:
+        bool: True if tracing was configured else False
+    """
+    if not tracing_enabled():
+        return False
+
+    from aws_xray_sdk.core import patch_all, xray_recorder  # pylint: disable=import-outside-toplevel
+
+    xray_recorder.configure(service=service)
+    patch_all()
+
+    return True
@@ -0,0 +1,53 @@
+"""
+    Process wide cache of a single value loaded on demand, with TTL eviction and explicit invalidation.
+"""
+from threading import Lock
+from time import monotonic
+from typing import Callable, Generic, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class TTLCache(Generic[T]):
+    """Process wide cache of a value that is loaded again once its TTL has expired or it was invalidated."""
+
+    def __init__(self, ttl_seconds: float):
+        """
+        Args:
+            ttl_seconds (float): Number of seconds a loaded value stays valid
+        """
+        self.ttl_seconds = ttl_seconds
+        self._value: Optional[T] = None
+        self._expires_at = 0.0
+        self._lock = Lock()
+
+    def get(self, loader: Callable[[], T]) -> T:
+        """Get the cached value, loading a new one when missing or expired
+
+        Args:
+            loader (Callable): Loads a fresh value
+
+        Returns:
+            T: Cached value
+        """
+        with self._lock:
+            if self._value is None or monotonic() >= self._expires_at:
+                self._value = loader()
+                self._expires_at = monotonic() + self.ttl_seconds
+
+            return self._value
+
+    def update(self, apply: Callable[[T], None]) -> None:
+        """Apply an in-place change to the cached value, if one is loaded
+
+        Args:
+            apply (Callable): Called with the cached value while holding the lock
+        """
+        with self._lock:
+            if self._value is not None:
+                apply(self._value)
+
+    def invalidate(self) -> None:
+        """Drop the cached value so the next lookup loads it again"""
+        with self._lock:
+            self._value = None
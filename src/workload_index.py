@@ -0,0 +1,220 @@
+"""
+    In-memory inverted index of Stax workloads by tag, account, region, catalogue and status.
+"""
+from threading import Lock
+from typing import Dict, Hashable, Iterable, List, Optional, Set, Tuple, Union
+
+from src.ttl_cache import TTLCache
+
+# Indexed workload attributes by the name used in queries
+INDEXED_ATTRIBUTES = {
+    "aws_account_id": "AccountId",
+    "aws_region": "Region",
+    "catalogue_id": "CatalogueId",
+    "status": "Status",
+}
+
+Criterion = Union[str, Iterable[str]]
+
+
+def _values(criterion: Criterion) -> List[str]:
+    return [criterion] if isinstance(criterion, str) else list(criterion)
+
+
+class WorkloadIndex:
+    """Posting sets of workload IDs per attribute value and tag, queries intersect the smallest sets first."""
+
+    def __init__(self, workloads: Iterable[dict] = ()):
+        """
+        Args:
+            workloads (Iterable[dict]): Stax workloads, only workloads with Tags are found by tag queries
+        """
+        self._workloads: Dict[Hashable, dict] = {}
+        self._postings: Dict[Tuple[str, str], Set[Hashable]] = {}
+        self._order: Dict[Hashable, int] = {}
+        self._lock = Lock()
+
+        for workload in workloads:
+            self._add(workload)
+
+    @classmethod
+    def from_response(cls, response: dict) -> "WorkloadIndex":
+        """Build an index from a ReadWorkloads response"""
+        return cls(response.get("Workloads", []))
+
+    @staticmethod
+    def _keys(workload: dict) -> List[Tuple[str, str]]:
+        keys = [
+            (name, workload[attribute]) for name, attribute in INDEXED_ATTRIBUTES.items() if workload.get(attribute)
+        ]
+        keys.extend((f"tag:{key}", value) for key, value in (workload.get("Tags") or {}).items())
+
+        return keys
+
+    def _add(self, workload: dict) -> None:
+        workload_id = workload["Id"]
+        self._workloads[workload_id] = workload
+        self._order.setdefault(workload_id, len(self._order))
+
+        for key in self._keys(workload):
+            self._postings.setdefault(key, set()).add(workload_id)
+
+    def _remove(self, workload_id: Hashable) -> None:
+        workload = self._workloads.pop(workload_id, None)
+        if workload is None:
+            return
+
+        for key in self._keys(workload):
+            postings = self._postings.get(key)
+            if postings is not None:
+                postings.discard(workload_id)
+                if not postings:
+                    del self._postings[key]
+
+    def upsert(self, workload: dict) -> None:
+        """Add a workload or replace the indexed version of it
+
+        Args:
+            workload (dict): Stax workload with at least its Id
+        """
+        with self._lock:
+            self._remove(workload["Id"])
+            self._add(workload)
+
+    def remove(self, workload_id: Hashable) -> None:
+        """Remove a workload from the index, unknown IDs are ignored"""
+        with self._lock:
+            self._remove(workload_id)
+            self._order.pop(workload_id, None)
+
+    def __len__(self) -> int:
+        return len(self._workloads)
+
+    def _postings_of(self, key_prefix: str, name: str, criterion: Criterion) -> List[Set[Hashable]]:
+        return [self._postings.get((f"{key_prefix}{name}", value), set()) for value in _values(criterion)]
+
+    def query(
+        self,
+        tags: Optional[Dict[str, Criterion]] = None,
+        any_tags: Optional[Dict[str, Criterion]] = None,
+        **attributes: Optional[Criterion],
+    ) -> List[dict]:
+        """Find workloads by tags and attributes
+
+        Every criterion is either a value or a collection of values of which any matches.
+
+        Args:
+            tags (Optional[Dict[str, Criterion]]): Tags that must all match (AND)
+            any_tags (Optional[Dict[str, Criterion]]): Tags of which at least one must match (OR)
+            attributes: aws_account_id, aws_region, catalogue_id and status criteria that must all match
+
+        Returns:
+            List[dict]: Matching workloads in the order they were indexed
+
+        Raises:
+            ValueError: Raised when an attribute is not indexed
+        """
+        unknown = set(attributes) - set(INDEXED_ATTRIBUTES)
+        if unknown:
+            raise ValueError(f"Workloads are not indexed by {', '.join(sorted(unknown))}")
+
+        with self._lock:
+            # Every criterion is a list of posting sets of which any must contain a workload
+            criteria = [
+                self._postings_of("", name, criterion)
+                for name, criterion in attributes.items()
+                if criterion is not None
+            ]
+            criteria.extend(self._postings_of("tag:", key, criterion) for key, criterion in (tags or {}).items())
+
+            if any_tags:
+                criteria.append(
+                    [
+                        postings
+                        for key, criterion in any_tags.items()
+                        for postings in self._postings_of("tag:", key, criterion)
+                    ]
+                )
+
+            if not criteria:
+                return list(self._workloads.values())
+
+            # Start from the most selective criterion, intersections only walk the smaller set so large posting
+            # sets of common values (e.g. status ACTIVE) are never copied
+            criteria.sort(key=lambda postings: sum(map(len, postings)))
+            matched = set().union(*criteria[0])
+            for postings in criteria[1:]:
+                matched = set().union(*(matched & posting for posting in postings))
+
+            return [self._workloads[workload_id] for workload_id in sorted(matched, key=self._order.__getitem__)]
+
+
+class WorkloadIndexCache(TTLCache[WorkloadIndex]):
+    """Process wide cache of a workload index built from one inventory snapshot and updated incrementally.
+
+    Stax only returns tags when reading one workload at a time, so tags are read for tag queries only and kept across
+    rebuilds of the index.
+    """
+
+    def __init__(self, ttl_seconds: float):
+        """
+        Args:
+            ttl_seconds (float): Number of seconds an index stays valid
+        """
+        super().__init__(ttl_seconds)
+        self._tags: Dict[Hashable, dict] = {}
+        self._tags_lock = Lock()
+
+    def build(self, workloads: Iterable[dict]) -> WorkloadIndex:
+        """Build an index of listed workloads with the tags read before, tags of unlisted workloads are dropped
+
+        Args:
+            workloads (Iterable[dict]): Stax workloads as returned by ReadWorkloads
+
+        Returns:
+            WorkloadIndex: Index of the workloads
+        """
+        workloads = list(workloads)
+
+        with self._tags_lock:
+            self._tags = {
+                workload["Id"]: self._tags[workload["Id"]] for workload in workloads if workload["Id"] in self._tags
+            }
+            for workload in workloads:
+                if workload["Id"] in self._tags:
+                    workload["Tags"] = self._tags[workload["Id"]]
+
+        return WorkloadIndex(workloads)
+
+    def clear(self) -> None:
+        """Drop the cached index and the tags read so far"""
+        with self._tags_lock:
+            self._tags.clear()
+
+        self.invalidate()
+
+    def add_tags(self, workloads: List[dict]) -> None:
+        """Keep the tags of workloads and apply them to the cached index, if one is loaded
+
+        Args:
+            workloads (List[dict]): Stax workloads with their Tags
+        """
+        with self._tags_lock:
+            self._tags.update((workload["Id"], workload["Tags"]) for workload in workloads)
+
+        self.update(lambda index: [index.upsert(workload) for workload in workloads])
+
+    def upsert(self, workload: dict) -> None:
+        """Apply a created or changed workload to the cached index, if one is loaded"""
+        if "Tags" in workload:
+            with self._tags_lock:
+                self._tags[workload["Id"]] = workload["Tags"]
+
+        self.update(lambda index: index.upsert(workload))
+
+    def remove(self, workload_id: Hashable) -> None:
+        """Remove a deleted workload from the cached index, if one is loaded"""
+        with self._tags_lock:
+            self._tags.pop(workload_id, None)
+
+        self.update(lambda index: index.remove(workload_id))
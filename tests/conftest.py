@@ -10,3 +10,33 @@ def get_stax_client_mock() -> Mock:
     """
     with patch("src.stax_orchestrator.get_stax_client") as stax_client_mock:
         yield stax_client_mock
+
+
+@pytest.fixture(autouse=True)
+def clear_caches() -> None:
+    """
+    Start every test with empty task status, catalogue index, catalogue template, workload index and stax client
+    caches, and handler objects built from the environment of the test
+    """
+    # pylint: disable=import-outside-toplevel
+    from src import handlers
+    from src.stax_orchestrator import (
+        catalogue_index_cache,
+        catalogue_template_cache,
+        stax_client_cache,
+        task_status_cache,
+        workload_index_cache,
+    )
+
+    task_status_cache.clear()
+    catalogue_index_cache.invalidate()
+    catalogue_template_cache.clear()
+    workload_index_cache.clear()
+    stax_client_cache.clear()
+    for get_handler_object in (
+        handlers.get_task_duration_recorder,
+        handlers.get_task_info_compactor,
+        handlers.get_workload_response_compactor,
+        handlers.get_workload_event_dispatcher,
+    ):
+        get_handler_object.cache_clear()
@@ -2,13 +2,14 @@ from functions.delete_workload.app import lambda_handler
 
 
 class TestDeleteWorkloadLambda:
-    event: dict = {"workload_name": "some-workload-name"}
-
     def test_delete_workload_lambda(self, mocker):
+        # data
+        event: dict = {"workload_name": "some-workload-name"}
+
         # mock
-        stax_orchestrator_mock = mocker.patch("functions.delete_workload.app.StaxOrchestrator")
+        handler_mock = mocker.patch("functions.delete_workload.app.handlers.delete_workload")
 
         # test
-        assert lambda_handler(self.event, {}) == stax_orchestrator_mock.return_value.delete_workload.return_value
+        assert lambda_handler(event, {}) == handler_mock.return_value
 
-        stax_orchestrator_mock.return_value.delete_workload.assert_called_once_with(**self.event)
+        handler_mock.assert_called_once_with(event)
@@ -0,0 +1,139 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+pytestmark = pytest.mark.skipif(not sys.platform.startswith("linux"), reason="Peak RSS is read from /proc")
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+
+# Peak RSS (MiB) budgets per handler, with headroom to stay within MemorySize: 128.
+IMPORT_RSS_BUDGET_MB = 32
+WARM_RSS_BUDGET_MB = 64
+
+# Importing a handler must take less than this share of the time to import its lazy dependencies
+IMPORT_TIME_BUDGET_RATIO = 0.5
+
+# Dependencies that must only be loaded once a handler actually talks to AWS or Stax
+LAZY_DEPENDENCIES = ["aws_lambda_powertools", "aws_xray_sdk", "boto3", "botocore", "requests", "staxapp.openapi"]
+
+# Modules of this repo that handlers must only load once an invocation needs them
+LAZY_MODULES = ["src.ingestion", "src.payloads", "src.stax_orchestrator", "src.task_metrics"]
+
+HANDLERS = [
+    "create_workload",
+    "delete_workload",
+    "get_task_status",
+    "ingest_workload_events",
+    "router",
+    "update_workload",
+    "validate_input",
+]
+
+MEASURE_HANDLER = """
+import importlib, json, re, sys, time
+
+def peak_rss_mb():
+    # VmHWM is reset on exec unlike ru_maxrss which inherits the peak of the forking pytest process
+    with open("/proc/self/status", encoding="utf-8") as status:
+        return int(re.search(r"VmHWM:\\s+(\\d+) kB", status.read()).group(1)) / 1024
+
+started_at = time.perf_counter()
+app = importlib.import_module(sys.argv[1])
+import_seconds = time.perf_counter() - started_at
+import_rss_mb = peak_rss_mb()
+import_loaded = sorted(name for name in sys.argv[2].split(",") if name in sys.modules)
+
+dependency_seconds = None
+
+if sys.argv[3]:
+    app.lambda_handler(json.loads(sys.argv[3]), None)
+else:
+    started_at = time.perf_counter()
+    import boto3, staxapp.openapi
+    from aws_lambda_powertools.utilities import parameters
+    dependency_seconds = time.perf_counter() - started_at
+
+    # Build the Stax clients of a warm container from the schema snapshot, without calling SSM or the Stax API
+    from unittest import mock
+    from staxapp.config import Config
+    from src.stax_orchestrator import get_stax_client
+
+    Config.cached_api_config = {"caching": f"https://{Config.hostname}/{Config.API_VERSION}/public/config"}
+    with mock.patch("aws_lambda_powertools.utilities.parameters.SSMProvider"):
+        get_stax_client("workloads")
+        get_stax_client("tasks")
+
+print(json.dumps({
+    "import_seconds": import_seconds,
+    "dependency_seconds": dependency_seconds,
+    "import_rss_mb": import_rss_mb,
+    "warm_rss_mb": peak_rss_mb(),
+    "import_loaded": import_loaded,
+    "warm_loaded": sorted(name for name in sys.argv[2].split(",") if name in sys.modules),
+}))
+"""
+
+
+@pytest.fixture(scope="module")
+def schema_snapshot(tmp_path_factory) -> str:
+    """
+    Build the Stax schema snapshot shipped in the lambda layer from the schema bundled with staxapp
+    """
+    snapshot_path = str(tmp_path_factory.mktemp("layer") / "stax_schema.pickle")
+    subprocess.run(
+        [sys.executable, "-m", "src.stax_client", snapshot_path, "--bundled-schema"],
+        capture_output=True,
+        check=True,
+        cwd=REPO_ROOT,
+    )
+    return snapshot_path
+
+
+def measure_handler(handler: str, schema_snapshot: str, event: dict = None) -> dict:
+    env = {
+        "PATH": "",
+        "AWS_DEFAULT_REGION": "ap-southeast-2",
+        "LAMBDA_TRACING_ENABLED": "false",
+        "STAX_SCHEMA_SNAPSHOT": schema_snapshot,
+    }
+    process = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            MEASURE_HANDLER,
+            f"functions.{handler}.app",
+            ",".join(LAZY_DEPENDENCIES + LAZY_MODULES),
+            json.dumps(event) if event else "",
+        ],
+        capture_output=True,
+        check=True,
+        cwd=REPO_ROOT,
+        env=env,
+        text=True,
+    )
+    return json.loads(process.stdout)
+
+
+class TestHandlerFootprint:
+    @pytest.mark.parametrize("handler", HANDLERS)
+    def test_handler_import_budget(self, handler, schema_snapshot):
+        # test
+        footprint = measure_handler(handler, schema_snapshot)
+
+        assert footprint["import_loaded"] == []
+        assert footprint["import_rss_mb"] < IMPORT_RSS_BUDGET_MB
+        assert footprint["import_seconds"] < IMPORT_TIME_BUDGET_RATIO * footprint["dependency_seconds"]
+        assert footprint["warm_rss_mb"] < WARM_RSS_BUDGET_MB
+
+    def test_validate_input_does_not_load_stax_client(self, schema_snapshot):
+        # data
+        event = {"operation": "create", **json.loads((REPO_ROOT / "events" / "create_workload.json").read_text())}
+
+        # test
+        footprint = measure_handler("validate_input", schema_snapshot, event)
+
+        assert footprint["warm_loaded"] == ["src.stax_orchestrator"]
+        assert footprint["warm_rss_mb"] < IMPORT_RSS_BUDGET_MB
@@ -2,18 +2,14 @@ from functions.get_task_status.app import lambda_handler
 
 
 class TestGetTaskStatusLambda:
-    def test_get_task_status(self, mocker):
+    def test_get_task_status_lambda(self, mocker):
         # data
-        event: dict = {"task_id": "some-task-id"}
+        event: dict = {"workload_name": "some-workload-name"}
 
         # mock
-        stax_orchestrator_mock = mocker.patch("functions.get_task_status.app.StaxOrchestrator")
-        result: dict = {
-            "task_id": "some-task-id",
-            "task_info": stax_orchestrator_mock.return_value.get_task_status.return_value,
-        }
+        handler_mock = mocker.patch("functions.get_task_status.app.handlers.get_task_status")
 
         # test
-        lambda_handler(event, {}) == result
+        assert lambda_handler(event, {}) == handler_mock.return_value
 
-        stax_orchestrator_mock.return_value.get_task_status.assert_called_once_with(event["task_id"])
+        handler_mock.assert_called_once_with(event)
@@ -0,0 +1,15 @@
+from functions.ingest_workload_events.app import lambda_handler
+
+
+class TestIngestWorkloadEventsLambda:
+    def test_ingest_workload_events_lambda(self, mocker):
+        # data
+        event: dict = {"Records": []}
+
+        # mock
+        handler_mock = mocker.patch("functions.ingest_workload_events.app.handlers.ingest_workload_events")
+
+        # test
+        assert lambda_handler(event, {}) == handler_mock.return_value
+
+        handler_mock.assert_called_once_with(event)
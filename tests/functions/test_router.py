@@ -0,0 +1,95 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from functions.router.app import ROUTES, lambda_handler
+
+STATE_MACHINES_DIR = Path(__file__).resolve().parents[2] / "statemachines"
+
+ROUTER_ACTIONS = {
+    "${ValidateInputLambdaArn}": "validate",
+    "${CreateWorkloadLambdaArn}": "create",
+    "${UpdateWorkloadLambdaArn}": "update",
+    "${DeleteWorkloadLambdaArn}": "delete",
+    "${GetTaskStatusLambdaArn}": "task_status",
+}
+
+
+def route_states(states: dict) -> dict:
+    """Replace lambda tasks of a state machine with router tasks that pass the InputPath as the event"""
+    routed = {}
+
+    for name, state in states.items():
+        routed[name] = {}
+        for key, value in state.items():
+            if key == "InputPath" and state.get("Resource") in ROUTER_ACTIONS:
+                continue
+            if key == "Resource" and value in ROUTER_ACTIONS:
+                routed[name][key] = "${RouterLambdaArn}"
+                routed[name]["Parameters"] = {"action": ROUTER_ACTIONS[value], "event.$": state.get("InputPath", "$")}
+            elif key == "Iterator":
+                routed[name][key] = {**value, "States": route_states(value["States"])}
+            else:
+                routed[name][key] = value
+
+    return routed
+
+
+class TestRouterLambda:
+    @pytest.mark.parametrize("action", ["validate", "create", "update", "delete", "task_status"])
+    def test_router_dispatches_action(self, mocker, action):
+        # data
+        event: dict = {"workload_name": "some-workload-name"}
+
+        # mock
+        handler_mock = mocker.Mock()
+        mocker.patch.dict(ROUTES, {action: handler_mock})
+
+        # test
+        assert lambda_handler({"action": action, "event": event}, {}) == handler_mock.return_value
+
+        handler_mock.assert_called_once_with(event)
+
+    def test_router_routes_to_shared_handlers(self):
+        # test
+        assert {action: route.__name__ for action, route in ROUTES.items()} == {
+            "validate": "validate_input",
+            "create": "create_workload",
+            "update": "update_workload",
+            "delete": "delete_workload",
+            "task_status": "get_task_status",
+        }
+
+    def test_router_unsupported_action(self):
+        # test
+        with pytest.raises(ValueError, match="Unsupported action fan_out"):
+            lambda_handler({"action": "fan_out", "event": {}}, {})
+
+
+class TestRouterStateMachines:
+    @pytest.mark.parametrize("state_machine", ["workload", "task_watcher"])
+    def test_router_state_machine_matches_state_machine(self, state_machine):
+        # data
+        definition = json.loads((STATE_MACHINES_DIR / f"{state_machine}.asl.json").read_text())
+        router_definition = json.loads((STATE_MACHINES_DIR / f"{state_machine}_router.asl.json").read_text())
+
+        # test
+        assert router_definition["StartAt"] == definition["StartAt"]
+        assert router_definition["States"] == route_states(definition["States"])
+        assert "LambdaArn}" not in json.dumps(router_definition).replace("${RouterLambdaArn}", "")
+
+    @pytest.mark.parametrize("state_machine", ["workload", "workload_router"])
+    def test_fan_out_instances_catch_failures(self, state_machine):
+        # data
+        definition = json.loads((STATE_MACHINES_DIR / f"{state_machine}.asl.json").read_text())
+        fan_out = definition["States"]["Fan Out Create Workloads"]
+        wave = fan_out["Iterator"]["States"]["Create Workload Wave"]
+
+        # test
+        assert fan_out["ItemsPath"] == "$.workload_event.workload_waves"
+        assert fan_out["MaxConcurrency"] == 1
+        for state in wave["Iterator"]["States"].values():
+            if state["Type"] == "Task":
+                assert state["Catch"][0]["ErrorEquals"] == ["States.ALL"]
+                assert wave["Iterator"]["States"][state["Catch"][0]["Next"]]["Parameters"]["status"] == "FAILED"
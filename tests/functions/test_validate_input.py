@@ -1,67 +1,15 @@
-import pytest
-
 from functions.validate_input.app import lambda_handler
 
 
 class TestValidateInputLambda:
-    def test_validate_input_workload_create(self, mocker):
+    def test_validate_input_lambda(self, mocker):
         # data
-        event: dict = {"operation": "create"}
+        event: dict = {"workload_name": "some-workload-name"}
 
         # mock
-        stax_orchestrator_mock = mocker.patch("functions.validate_input.app.StaxOrchestrator")
+        handler_mock = mocker.patch("functions.validate_input.app.handlers.validate_input")
 
         # test
-        assert (
-            lambda_handler(event, {}) == stax_orchestrator_mock.return_value.CreateWorkloadEvent.return_value.__dict__
-        )
-
-        stax_orchestrator_mock.return_value.get_create_workload_kwargs.assert_called_once_with(event)
-        stax_orchestrator_mock.return_value.CreateWorkloadEvent.assert_called_once_with(
-            **stax_orchestrator_mock.return_value.get_create_workload_kwargs.return_value
-        )
-
-    def test_validate_input_workload_update(self, mocker):
-        # data
-        event: dict = {"operation": "update"}
-
-        # mock
-        stax_orchestrator_mock = mocker.patch("functions.validate_input.app.StaxOrchestrator")
-
-        # test
-        assert (
-            lambda_handler(event, {}) == stax_orchestrator_mock.return_value.UpdateWorkloadEvent.return_value.__dict__
-        )
-
-        stax_orchestrator_mock.return_value.get_update_workload_kwargs.assert_called_once_with(event)
-        stax_orchestrator_mock.return_value.UpdateWorkloadEvent.assert_called_once_with(
-            **stax_orchestrator_mock.return_value.get_update_workload_kwargs.return_value
-        )
-
-    def test_validate_input_workload_delete(self, mocker):
-        # data
-        event: dict = {"operation": "delete"}
+        assert lambda_handler(event, {}) == handler_mock.return_value
 
-        # mock
-        stax_orchestrator_mock = mocker.patch("functions.validate_input.app.StaxOrchestrator")
-
-        # test
-        assert (
-            lambda_handler(event, {}) == stax_orchestrator_mock.return_value.DeleteWorkloadEvent.return_value.__dict__
-        )
-
-        stax_orchestrator_mock.return_value.get_delete_workload_kwargs.assert_called_once_with(event)
-        stax_orchestrator_mock.return_value.DeleteWorkloadEvent.assert_called_once_with(
-            **stax_orchestrator_mock.return_value.get_delete_workload_kwargs.return_value
-        )
-
-    def test_validate_input_workload_value_error(self, mocker):
-        # data
-        event: dict = {"operation": "unsupported-operation"}
-
-        # mock
-        mocker.patch("functions.validate_input.app.StaxOrchestrator")
-
-        # test
-        with pytest.raises(ValueError):
-            lambda_handler(event, {})
+        handler_mock.assert_called_once_with(event)
@@ -0,0 +1,89 @@
+from src.catalogue_gc import batched, find_stale_manifests, find_stale_versions, get_referenced_version_ids
+
+UUIDS = [f"0000000{number}-0000-4000-8000-000000000000" for number in range(6)]
+
+
+class TestCatalogueGc:
+    catalogues = [
+        {
+            "Id": "dynamo-cat-id",
+            "Name": "simple-dynamodb",
+            "Status": "ACTIVE",
+            "CatalogueVersionId": "v1",
+            "Versions": [
+                {
+                    "Id": f"v{number}",
+                    "WorkloadVersion": UUIDS[number],
+                    "Status": "ACTIVE",
+                    "CreatedTS": f"2023-0{number}",
+                }
+                for number in range(1, 6)
+            ]
+            + [{"Id": "v0", "WorkloadVersion": UUIDS[0], "Status": "FAILED", "CreatedTS": "2023-00"}],
+        },
+        {"Id": "vpc-cat-id", "Name": "vpc", "Status": "ACTIVE", "Versions": None},
+    ]
+
+    def test_batched(self):
+        # test
+        assert batched(list(range(5)), 2) == [[0, 1], [2, 3], [4]]
+        assert len(batched(list(range(2001)))) == 3
+
+    def test_get_referenced_version_ids(self):
+        # test
+        assert get_referenced_version_ids(
+            [
+                {"Status": "ACTIVE", "CatalogueVersionId": "v2"},
+                {"Status": "CREATE_IN_PROGRESS", "CatalogueVersionId": "v3"},
+                {"Status": "DELETED", "CatalogueVersionId": "v4"},
+                {"Status": "ACTIVE"},
+            ]
+        ) == {"v2", "v3"}
+
+    def test_find_stale_versions(self):
+        # test
+        stale_versions = find_stale_versions(self.catalogues, {"v2"}, keep_versions=2)
+
+        # v5 and v4 are the most recent, v2 is referenced, v1 is the default and v0 is not active
+        assert stale_versions == [
+            {
+                "CatalogueId": "dynamo-cat-id",
+                "CatalogueName": "simple-dynamodb",
+                "CatalogueVersionId": "v3",
+                "WorkloadVersion": UUIDS[3],
+                "CreatedTS": "2023-03",
+            }
+        ]
+
+    def test_find_stale_manifests(self):
+        # data
+        orphan = "11111111-0000-4000-8000-000000000000-removed.yaml"
+        recent_orphan = "22222222-0000-4000-8000-000000000000-uploading.yaml"
+        tagged_orphan = "1.2.0-rc.1+33333333-0000-4000-8000-000000000000-tagged-removed.yaml"
+        manifests = [
+            (f"{UUIDS[3]}-simple-dynamodb.yaml", 0),
+            (f"{UUIDS[4]}-simple-dynamodb.yaml", 0),
+            (f"{UUIDS[0]}-simple-dynamodb.yaml", 0),
+            (orphan, 0),
+            (tagged_orphan, 0),
+            (recent_orphan, 990),
+            ("packaged/template.yaml", 0),
+            ("5d41402abc4b2a76b9719d911017c592", 0),
+        ]
+        stale_versions = find_stale_versions(self.catalogues, set(), keep_versions=2)
+
+        # test
+        assert find_stale_manifests(manifests, self.catalogues, stale_versions, 60, now=1000) == [
+            f"{UUIDS[3]}-simple-dynamodb.yaml",
+            orphan,
+            tagged_orphan,
+        ]
+
+    def test_find_stale_manifests_of_deleted_catalogues(self):
+        # data
+        catalogues = [{**self.catalogues[0], "Status": "DELETED"}]
+
+        # test
+        assert find_stale_manifests([(f"{UUIDS[5]}-simple-dynamodb.yaml", 0)], catalogues, [], 60, now=1000) == [
+            f"{UUIDS[5]}-simple-dynamodb.yaml"
+        ]
@@ -0,0 +1,129 @@
+import pytest
+
+from src import catalogue_index
+from src.catalogue_index import CatalogueIndex
+
+
+class TestCatalogueIndex:
+    response = {
+        "WorkloadCatalogues": [
+            {
+                "WorkloadCatalogueItems": [
+                    {
+                        "Id": "dynamo-cat-id",
+                        "Name": "simple-dynamodb",
+                        "Status": "ACTIVE",
+                        "Versions": [
+                            {"Id": "v1", "WorkloadVersion": "1.0.0", "Status": "ACTIVE", "CreatedTS": "2023-01-01"},
+                            {"Id": "v2", "WorkloadVersion": "1.1.0", "Status": "ACTIVE", "CreatedTS": "2023-02-01"},
+                            {"Id": "v3", "WorkloadVersion": "2.0.0", "Status": "FAILED", "CreatedTS": "2023-03-01"},
+                        ],
+                    },
+                    {"Id": "vpc-cat-id", "Name": "vpc", "Status": "ACTIVE", "CatalogueVersionId": "vpc-v1"},
+                    {"Id": "deleted-cat-id", "Name": "deleted", "Status": "DELETED"},
+                ]
+            }
+        ]
+    }
+
+    def test_resolve_catalogue_name(self):
+        # test
+        assert CatalogueIndex.from_response(self.response).resolve("simple-dynamodb") == {
+            "catalogue_id": "dynamo-cat-id"
+        }
+
+    def test_resolve_latest_version(self):
+        # test
+        assert CatalogueIndex.from_response(self.response).resolve("simple-dynamodb", "latest") == {
+            "catalogue_id": "dynamo-cat-id",
+            "catalogue_version_id": "v2",
+        }
+
+    def test_resolve_version_tag(self):
+        # test
+        assert CatalogueIndex.from_response(self.response).resolve("simple-dynamodb", "1.0.0") == {
+            "catalogue_id": "dynamo-cat-id",
+            "catalogue_version_id": "v1",
+        }
+
+    def test_resolve_latest_orders_by_semantic_version(self):
+        index = CatalogueIndex(
+            [
+                {
+                    "Id": "vpc-cat-id",
+                    "Name": "vpc",
+                    "Versions": [
+                        {
+                            "Id": "v10",
+                            "WorkloadVersion": "1.10.0+uuid-a",
+                            "Status": "ACTIVE",
+                            "CreatedTS": "2023-01-01",
+                        },
+                        {"Id": "v9", "WorkloadVersion": "1.9.0", "Status": "ACTIVE", "CreatedTS": "2023-03-01"},
+                        {"Id": "rc", "WorkloadVersion": "1.10.0-rc.1", "Status": "ACTIVE", "CreatedTS": "2023-04-01"},
+                        {"Id": "uuid", "WorkloadVersion": "some-uuid", "Status": "ACTIVE", "CreatedTS": "2023-05-01"},
+                    ],
+                }
+            ]
+        )
+
+        # test
+        assert index.resolve("vpc", "latest")["catalogue_version_id"] == "v10"
+        assert index.resolve("vpc", "1.10.0")["catalogue_version_id"] == "v10"
+        assert index.resolve("vpc", "1.10.0-rc.1")["catalogue_version_id"] == "rc"
+
+    def test_resolve_latest_without_semantic_versions(self):
+        index = CatalogueIndex(
+            [
+                {
+                    "Id": "vpc-cat-id",
+                    "Name": "vpc",
+                    "Versions": [
+                        {"Id": "new", "WorkloadVersion": "uuid-b", "Status": "ACTIVE", "CreatedTS": "2023-02-01"},
+                        {"Id": "old", "WorkloadVersion": "uuid-a", "Status": "ACTIVE", "CreatedTS": "2023-01-01"},
+                    ],
+                }
+            ]
+        )
+
+        # test
+        assert index.resolve("vpc", "latest")["catalogue_version_id"] == "new"
+
+    def test_get_semver_key(self):
+        # test
+        assert catalogue_index.get_semver_key("not-a-version") is None
+        assert catalogue_index.get_semver_key("1.0.0-alpha") < catalogue_index.get_semver_key("1.0.0-alpha.1")
+        assert catalogue_index.get_semver_key("1.0.0-alpha.1") < catalogue_index.get_semver_key("1.0.0-alpha.beta")
+        assert catalogue_index.get_semver_key("1.0.0-beta.2") < catalogue_index.get_semver_key("1.0.0-beta.11")
+        assert catalogue_index.get_semver_key("1.0.0-rc.1") < catalogue_index.get_semver_key("v1.0.0+build")
+
+    def test_resolve_latest_falls_back_to_current_version(self):
+        # test
+        assert CatalogueIndex.from_response(self.response).resolve("vpc", "latest") == {
+            "catalogue_id": "vpc-cat-id",
+            "catalogue_version_id": "vpc-v1",
+        }
+
+    def test_resolve_loads_missing_versions(self, mocker):
+        versions_loader = mocker.Mock(return_value=[{"Id": "vpc-v2", "WorkloadVersion": "2.0.0", "Status": "ACTIVE"}])
+        index = CatalogueIndex([{"Id": "vpc-cat-id", "Name": "vpc"}], versions_loader)
+
+        # test
+        assert index.resolve("vpc", "2.0.0")["catalogue_version_id"] == "vpc-v2"
+        assert index.resolve("vpc", "vpc-v2")["catalogue_version_id"] == "vpc-v2"
+        versions_loader.assert_called_once_with("vpc-cat-id")
+
+    def test_resolve_unknown_catalogue(self):
+        # test
+        with pytest.raises(catalogue_index.CatalogueNotFoundException):
+            CatalogueIndex.from_response(self.response).resolve("deleted")
+
+    def test_resolve_unknown_version(self):
+        index = CatalogueIndex.from_response(self.response)
+
+        # test
+        with pytest.raises(catalogue_index.CatalogueNotFoundException):
+            index.resolve("simple-dynamodb", "2.0.0")
+
+        with pytest.raises(catalogue_index.CatalogueNotFoundException):
+            CatalogueIndex([{"Id": "empty-cat-id", "Name": "empty"}]).resolve("empty", "latest")
@@ -0,0 +1,135 @@
+from pathlib import Path
+
+import pytest
+
+from src.catalogue_template import (
+    CatalogueTemplateCache,
+    WorkloadParametersInvalidException,
+    load_template,
+    validate_workload_parameters,
+)
+
+TEMPLATES = Path(__file__).resolve().parents[1] / "sample-workload-templates"
+
+
+class TestLoadTemplate:
+    def test_load_json_template(self):
+        # test
+        template = load_template((TEMPLATES / "dynamo.json").read_text())
+
+        assert template["Parameters"]["ReadCapacityUnits"]["Type"] == "Number"
+
+    def test_load_yaml_template_with_short_form_functions(self):
+        # test
+        template = load_template((TEMPLATES / "vpc.yaml").read_text())
+
+        assert template["Parameters"] == {
+            "VPCName": {
+                "Description": "The name of the VPC being created.",
+                "Type": "String",
+                "Default": "VPC Public and Private with NAT",
+            }
+        }
+        assert load_template("Value: !GetAtt VPC.CidrBlock\nRef: !Ref VPC\nSub: !Sub [a, {b: c}]\nIf: !If {a: b}") == {
+            "Value": {"Fn::GetAtt": ["VPC", "CidrBlock"]},
+            "Ref": {"Ref": "VPC"},
+            "Sub": {"Fn::Sub": ["a", {"b": "c"}]},
+            "If": {"Fn::If": {"a": "b"}},
+        }
+
+
+class TestValidateWorkloadParameters:
+    template_parameters = {
+        **load_template((TEMPLATES / "dynamo.json").read_text())["Parameters"],
+        "Environment": {"Type": "String", "AllowedValues": ["dev", "prod"], "Default": "dev"},
+        "Ports": {"Type": "List<Number>", "MinValue": 1, "Default": "443"},
+        "Zones": {"Type": "CommaDelimitedList", "AllowedValues": ["a", "b"], "Default": "a"},
+    }
+
+    def test_valid_parameters(self):
+        # test
+        validate_workload_parameters(
+            self.template_parameters,
+            {"HashKeyElementName": "id", "ReadCapacityUnits": 50, "Ports": "80, 443", "Zones": "a,b"},
+        )
+
+    def test_invalid_parameters(self):
+        # test
+        with pytest.raises(WorkloadParametersInvalidException) as error:
+            validate_workload_parameters(
+                self.template_parameters,
+                {
+                    "ReadCapacityUnit": "5",
+                    "HashKeyElementType": "SN",
+                    "ReadCapacityUnits": "1",
+                    "WriteCapacityUnits": "lots",
+                    "Environment": "test",
+                    "Ports": "0,80",
+                    "Zones": "c",
+                },
+            )
+
+        assert error.value.errors == [
+            "ReadCapacityUnit is not a parameter of the catalogue",
+            "HashKeyElementName is required",
+            "HashKeyElementType is longer than 1 characters (must be either S or N)",
+            "HashKeyElementType does not match pattern [S|N] (must be either S or N)",
+            "ReadCapacityUnits value 1 is less than 5 (must be between 5 and 10000)",
+            "WriteCapacityUnits value lots is not a number",
+            "Environment value test is not one of ['dev', 'prod']",
+            "Ports value 0 is less than 1",
+            "Zones value c is not one of ['a', 'b']",
+        ]
+        assert isinstance(error.value, ValueError)
+
+    def test_invalid_string_length_and_number_range(self):
+        # test
+        with pytest.raises(WorkloadParametersInvalidException) as error:
+            validate_workload_parameters(
+                self.template_parameters, {"HashKeyElementName": "", "ReadCapacityUnits": "10001"}
+            )
+
+        assert error.value.errors == [
+            "HashKeyElementName is shorter than 1 characters (must contain only alphanumberic characters)",
+            "ReadCapacityUnits value 10001 is greater than 10000 (must be between 5 and 10000)",
+        ]
+
+
+class TestCatalogueTemplateCache:
+    def test_parse_caches_by_content_hash(self, mocker):
+        # mock
+        load_template_mock = mocker.patch(
+            "src.catalogue_template.load_template", return_value={"Parameters": {"Name": {"Type": "String"}}}
+        )
+        cache = CatalogueTemplateCache(max_size=1)
+
+        # test
+        assert cache.parse("template-1") == {"Name": {"Type": "String"}}
+        assert cache.parse("template-1") == {"Name": {"Type": "String"}}
+        assert load_template_mock.call_count == 1
+
+        cache.parse("template-2")
+        cache.parse("template-1")
+        assert load_template_mock.call_count == 3
+
+    def test_get_loads_templates_once_per_key(self, mocker):
+        # mock
+        loader = mocker.Mock(
+            side_effect=lambda key: {
+                "v1": ['{"Parameters": {"Name": {"Type": "String"}}}'],
+                "v2": ['{"Parameters": {"Name": {"Type": "String"}}}', '{"Parameters": {"Size": {"Type": "Number"}}}'],
+            }.get(key)
+        )
+        cache = CatalogueTemplateCache(max_size=2)
+
+        # test
+        assert cache.get("v1", loader) == {"Name": {"Type": "String"}}
+        assert cache.get("v1", loader) == {"Name": {"Type": "String"}}
+        assert cache.get("v2", loader) == {"Name": {"Type": "String"}, "Size": {"Type": "Number"}}
+        assert cache.get("v3", loader) is None
+        assert cache.get("v3", loader) is None
+        assert loader.call_count == 3
+
+        # v1 was evicted when v3 was cached
+        cache.get("v1", loader)
+        assert loader.call_count == 4
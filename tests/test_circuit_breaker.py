@@ -0,0 +1,110 @@
+import pytest
+
+from src.circuit_breaker import (
+    CircuitBreaker,
+    CircuitBreakerRegistry,
+    CircuitBreakingClient,
+    CircuitState,
+    StaxCircuitOpenException,
+)
+
+
+class ApiException(Exception):
+    def __init__(self, status_code: int):
+        super().__init__(f"Api Exception: {status_code}")
+        self.status_code = status_code
+
+
+class TestCircuitBreaker:
+    def fail(self, breaker: CircuitBreaker, error: Exception, times: int = 1) -> None:
+        for _ in range(times):
+            with pytest.raises(type(error)):
+                breaker.call(self.raise_error, error)
+
+    @staticmethod
+    def raise_error(error: Exception) -> None:
+        raise error
+
+    def test_call_opens_when_failure_rate_reached(self, mocker):
+        # mock
+        breaker = CircuitBreaker(failure_rate_threshold=0.5, minimum_calls=4)
+        func = mocker.Mock(return_value="response")
+
+        # test
+        assert breaker.call(func, "arg", key="value") == "response"
+        func.assert_called_once_with("arg", key="value")
+        breaker.call(func)
+        self.fail(breaker, ApiException(503))
+        assert breaker.state == CircuitState.CLOSED
+
+        self.fail(breaker, ConnectionError("timed out"))
+        assert breaker.state == CircuitState.OPEN
+
+        with pytest.raises(StaxCircuitOpenException, match="Circuit is OPEN, retry in 30 seconds"):
+            breaker.call(func)
+        assert func.call_count == 2
+
+    def test_call_ignores_client_errors(self):
+        # mock
+        breaker = CircuitBreaker(minimum_calls=2, ignored_exceptions=(KeyError,))
+
+        # test
+        self.fail(breaker, ApiException(404), times=2)
+        self.fail(breaker, KeyError("invalid payload"), times=2)
+        assert breaker.state == CircuitState.CLOSED
+
+        self.fail(breaker, ApiException(429), times=4)
+        assert breaker.state == CircuitState.OPEN
+
+    def test_call_counts_slow_calls_as_unhealthy(self, mocker):
+        # mock
+        mocker.patch("src.circuit_breaker.monotonic", side_effect=[0, 11, 20, 31, 40])
+        breaker = CircuitBreaker(slow_call_seconds=10, minimum_calls=2)
+
+        # test
+        breaker.call(lambda: "slow response")
+        self.fail(breaker, ApiException(400))
+        assert breaker.state == CircuitState.OPEN
+
+    def test_call_probes_half_open_circuit(self, mocker):
+        # mock
+        monotonic_mock = mocker.patch("src.circuit_breaker.monotonic", return_value=100.0)
+        breaker = CircuitBreaker(open_seconds=30, minimum_calls=1)
+        self.fail(breaker, ApiException(500))
+
+        # test
+        monotonic_mock.return_value = 131.0
+        breaker.before_call()
+        assert breaker.state == CircuitState.HALF_OPEN
+        with pytest.raises(StaxCircuitOpenException, match="Circuit is HALF_OPEN"):
+            breaker.before_call()
+
+        breaker.record(healthy=False)
+        assert breaker.state == CircuitState.OPEN
+
+        monotonic_mock.return_value = 200.0
+        assert breaker.call(lambda: "recovered") == "recovered"
+        assert breaker.state == CircuitState.CLOSED
+
+
+class TestCircuitBreakingClient:
+    def test_operations_share_breakers_per_endpoint(self, mocker):
+        # mock
+        stax_client = mocker.Mock()
+        stax_client.ReadTask.side_effect = ApiException(502)
+        registry = CircuitBreakerRegistry(minimum_calls=1)
+        first_client = CircuitBreakingClient(stax_client, "tasks", registry)
+        second_client = CircuitBreakingClient(stax_client, "tasks", registry)
+
+        # test
+        with pytest.raises(ApiException):
+            first_client.ReadTask(task_id="some-task-id")
+        with pytest.raises(StaxCircuitOpenException):
+            second_client.ReadTask(task_id="some-task-id")
+
+        assert second_client.ReadTasks() == stax_client.ReadTasks.return_value
+        stax_client.ReadTask.assert_called_once_with(task_id="some-task-id")
+        assert registry.states() == {"tasks.ReadTask": "OPEN", "tasks.ReadTasks": "CLOSED"}
+
+        registry.reset()
+        assert registry.states() == {}
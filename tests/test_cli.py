@@ -0,0 +1,291 @@
+import io
+import json
+import runpy
+import sys
+from pathlib import Path
+
+import pytest
+from staxapp.api import Api
+from staxapp.config import Config as StaxConfig
+from staxapp.contract import StaxContract
+from staxapp.openapi import StaxClient
+
+from src.circuit_breaker import CircuitBreakerRegistry, CircuitBreakingClient
+from src.cli import InvalidEventException, Progress, WorkloadEventRunner, main, process_events
+from src.concurrency import run_concurrently
+from src.name_reservations import LocalConditionalTable, NameReservations
+from src.stax_client import SharedStaxClient
+from src.stax_orchestrator import StaxOrchestrator
+
+CREATE_WORKLOAD_EVENT = Path(__file__).resolve().parents[1] / "events" / "create_workload.json"
+
+
+class TestWorkloadEventRunner:
+    create_response = {"Detail": {"Workload": {"WorkloadId": "some-workload-id", "TaskId": "some-task-id"}}}
+
+    def test_run_create(self, mocker):
+        stax_orchestrator = mocker.Mock()
+        stax_orchestrator.validate_workload_event.return_value = {"workload_name": "w-1", "workload_tags": None}
+        stax_orchestrator.create_unique_workload.return_value = self.create_response
+
+        # test
+        assert WorkloadEventRunner(stax_orchestrator).run({"operation": "create"}) == {
+            "workload_id": "some-workload-id",
+            "task_id": "some-task-id",
+        }
+        stax_orchestrator.create_unique_workload.assert_called_once_with(
+            existing_names=stax_orchestrator.get_existing_workload_names.return_value, workload_name="w-1"
+        )
+
+    def test_run_creates_list_workloads_once_and_create_a_name_once(self, mocker):
+        # mock
+        mocker.patch("src.stax_orchestrator.workload_name_reservations", None)
+        stax_orchestrator = StaxOrchestrator()
+        mocker.patch.object(
+            stax_orchestrator, "get_workloads", return_value={"Workloads": [{"Name": "taken", "Status": "ACTIVE"}]}
+        )
+        create_workload_mock = mocker.patch.object(
+            stax_orchestrator, "create_workload", return_value=self.create_response
+        )
+        runner = WorkloadEventRunner(stax_orchestrator)
+        events = [
+            {
+                "operation": "create",
+                "workload_name": workload_name,
+                "catalogue_id": "some-catalogue-id",
+                "aws_account_id": "some-account-id",
+                "aws_region": "ap-southeast-2",
+            }
+            for workload_name in ("w-1", "w-1", "taken", "w-2")
+        ]
+
+        # test
+        results = run_concurrently(runner.run, events, max_workers=4)
+
+        assert sorted(result.item["workload_name"] for result in results if result.error is None) == ["w-1", "w-2"]
+        assert all(
+            isinstance(result.error, StaxOrchestrator.WorkloadWithNameAlreadyExistsException)
+            for result in results
+            if result.error
+        )
+        assert sorted(call.args[0] for call in create_workload_mock.call_args_list) == ["w-1", "w-2"]
+        stax_orchestrator.get_workloads.assert_called_once_with()
+
+    def test_run_create_duplicate_name(self, mocker):
+        stax_orchestrator = mocker.Mock()
+        stax_orchestrator.validate_workload_event.return_value = {"workload_name": "w-1"}
+        stax_orchestrator.create_unique_workload.side_effect = Exception("Workload with name w-1 already exists")
+
+        # test
+        with pytest.raises(Exception, match="already exists"):
+            WorkloadEventRunner(stax_orchestrator).run({"operation": "create"})
+
+    def test_run_update_and_wait(self, mocker):
+        stax_orchestrator = mocker.Mock()
+        stax_orchestrator.validate_workload_event.return_value = {"workload_id": "some-workload-id"}
+        stax_orchestrator.update_workload.return_value = self.create_response
+        stax_orchestrator.wait_for_tasks.return_value = {"some-task-id": {"Status": "FAILED"}}
+
+        # test
+        assert WorkloadEventRunner(stax_orchestrator, wait_for_completion=True, poll_interval=1).run(
+            {"operation": "update"}
+        ) == {"workload_id": "some-workload-id", "task_id": "some-task-id", "task_status": "FAILED"}
+        stax_orchestrator.wait_for_tasks.assert_called_once_with(["some-task-id"], poll_interval=1)
+
+    def test_run_delete(self, mocker):
+        stax_orchestrator = mocker.Mock()
+        stax_orchestrator.validate_workload_event.return_value = {"workload_id": "some-workload-id"}
+        stax_orchestrator.delete_workload.return_value = {}
+
+        # test
+        assert WorkloadEventRunner(stax_orchestrator).run({"operation": "delete"}) == {
+            "workload_id": None,
+            "task_id": None,
+        }
+        stax_orchestrator.delete_workload.assert_called_once_with(workload_id="some-workload-id")
+
+    def test_run_delete_and_wait_releases_name(self, mocker):
+        stax_orchestrator = mocker.Mock()
+        stax_orchestrator.validate_workload_event.return_value = {"workload_id": "some-workload-id"}
+        stax_orchestrator.delete_workload.return_value = {
+            "Detail": {"Workload": {**self.create_response["Detail"]["Workload"], "Name": "w-1"}}
+        }
+        stax_orchestrator.wait_for_tasks.return_value = {"some-task-id": {"Status": "SUCCEEDED"}}
+
+        # test
+        WorkloadEventRunner(stax_orchestrator, wait_for_completion=True).run({"operation": "delete"})
+
+        stax_orchestrator.release_workload_name.assert_called_once_with("some-workload-id", "w-1")
+
+    def test_run_invalid_event(self, mocker):
+        stax_orchestrator = mocker.Mock()
+        stax_orchestrator.validate_workload_event.side_effect = KeyError("workload_id")
+
+        # test
+        with pytest.raises(InvalidEventException):
+            WorkloadEventRunner(stax_orchestrator).run({"operation": "delete"})
+
+    def test_run_unsupported_operation(self, mocker):
+        # test
+        with pytest.raises(InvalidEventException):
+            WorkloadEventRunner(mocker.Mock()).run({"operation": "fan_out"})
+
+
+class TestProcessEvents:
+    def test_process_events(self, mocker):
+        runner = mocker.Mock()
+        runner.run.side_effect = lambda event: {
+            "ok": {"task_id": "some-task-id"},
+            "task-failed": {"task_status": "FAILED"},
+        }.get(event["name"]) or (_ for _ in ()).throw(Exception("some-error"))
+
+        lines = io.StringIO(
+            "\n".join(
+                [
+                    json.dumps({"operation": "create", "name": "ok"}),
+                    "",
+                    json.dumps({"operation": "update", "name": "task-failed"}),
+                    json.dumps({"operation": "delete", "name": "error"}),
+                    "not-json",
+                    "[]",
+                ]
+            )
+        )
+        output, progress_stream = io.StringIO(), io.StringIO()
+
+        # test
+        counts = process_events(runner, lines, output, concurrency=2, progress=Progress(stream=progress_stream))
+
+        assert counts == {"succeeded": 1, "failed": 2, "invalid": 2}
+        records = sorted((json.loads(line) for line in output.getvalue().splitlines()), key=lambda r: r["line"])
+        assert [(record["line"], record["status"]) for record in records] == [
+            (1, "succeeded"),
+            (3, "failed"),
+            (4, "failed"),
+            (5, "invalid"),
+            (6, "invalid"),
+        ]
+        assert records[0] == {"line": 1, "status": "succeeded", "operation": "create", "task_id": "some-task-id"}
+        assert "processed 5" in progress_stream.getvalue()
+
+    def test_process_mixed_events_concurrently_on_one_stax_client(self, mocker):
+        # mock
+        mocker.patch.dict(StaxClient._operation_map)
+        mocker.patch.object(StaxClient, "_schema", {})
+        mocker.patch.object(StaxConfig, "load_live_schema", False)
+        StaxClient._map_paths_to_operations()
+        mocker.patch.object(StaxContract, "validate")
+        calls = []
+
+        def api_call(method):
+            def call(path, payload, config):
+                calls.append((method, path.lstrip("/")))
+                return {"Detail": {"Workload": {"WorkloadId": path.rsplit("/", 1)[-1]}}}
+
+            return call
+
+        mocker.patch.object(Api, "put", side_effect=api_call("put"))
+        mocker.patch.object(Api, "delete", side_effect=api_call("delete"))
+        client = object.__new__(StaxClient)
+        client.classname = "workloads"
+        client._config = None
+
+        stax_orchestrator = StaxOrchestrator()
+        stax_orchestrator._workload_client = CircuitBreakingClient(
+            SharedStaxClient(client), "workloads", CircuitBreakerRegistry()
+        )
+        events = [
+            (
+                {"operation": "update", "workload_id": f"updated-{number}", "catalogue_version_id": "some-version-id"}
+                if number % 2
+                else {"operation": "delete", "workload_id": f"deleted-{number}"}
+            )
+            for number in range(200)
+        ]
+
+        # test, threads switch as often as possible so a client that is not thread safe swaps operations
+        switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        try:
+            counts = process_events(
+                WorkloadEventRunner(stax_orchestrator),
+                io.StringIO("\n".join(json.dumps(event) for event in events)),
+                io.StringIO(),
+                concurrency=20,
+                progress=Progress(stream=io.StringIO()),
+            )
+        finally:
+            sys.setswitchinterval(switch_interval)
+
+        assert counts["succeeded"] == 200
+        assert sorted(calls) == sorted(
+            ("put" if event["operation"] == "update" else "delete", f"20190206/workloads/{event['workload_id']}")
+            for event in events
+        )
+
+    def test_process_duplicate_creates_with_name_reservations(self, mocker, get_stax_client_mock):
+        # mock
+        reservations = NameReservations("workload-names", LocalConditionalTable())
+        reservations.reserve("existing-workload", "existing-workload-id")
+        mocker.patch("src.stax_orchestrator.workload_name_reservations", reservations)
+        get_workloads_mock = mocker.patch.object(StaxOrchestrator, "get_workloads")
+        create_workload_mock = mocker.patch.object(
+            get_stax_client_mock.return_value,
+            "CreateWorkload",
+            side_effect=lambda Name, **_: {"Detail": {"Workload": {"WorkloadId": f"{Name}-id", "TaskId": "task-id"}}},
+        )
+        events = [
+            {**json.loads(CREATE_WORKLOAD_EVENT.read_text()), "operation": "create", "workload_name": workload_name}
+            for workload_name in ["new-workload"] * 10 + ["existing-workload"]
+        ]
+        stax_orchestrator = StaxOrchestrator()
+        stax_orchestrator._workload_client = get_stax_client_mock.return_value
+        output = io.StringIO()
+
+        # test
+        counts = process_events(
+            WorkloadEventRunner(stax_orchestrator),
+            io.StringIO("\n".join(json.dumps(event) for event in events)),
+            output,
+            concurrency=11,
+            progress=Progress(stream=io.StringIO()),
+        )
+
+        assert counts == {"succeeded": 1, "failed": 10, "invalid": 0}
+        assert [
+            json.loads(line)["workload_id"] for line in output.getvalue().splitlines() if "workload_id" in line
+        ] == ["new-workload-id"]
+        create_workload_mock.assert_called_once()
+        get_workloads_mock.assert_not_called()
+        item = reservations.client.get_item(TableName="workload-names", Key={"workload_name": {"S": "new-workload"}})
+        assert item["Item"]["workload_id"] == {"S": "new-workload-id"}
+
+
+class TestMain:
+    def test_main(self, mocker, tmp_path):
+        input_path = tmp_path / "events.jsonl"
+        output_path = tmp_path / "results.jsonl"
+        input_path.write_text(json.dumps({"operation": "delete", "workload_id": "some-workload-id"}) + "\n")
+        mocker.patch("src.cli.StaxOrchestrator")
+        process_events_mock = mocker.patch("src.cli.process_events", return_value={"failed": 0, "invalid": 0})
+
+        # test
+        assert main([str(input_path), "--output", str(output_path), "--concurrency", "5", "--wait"]) == 0
+        assert process_events_mock.call_args.args[3:] == (5, None)
+        assert process_events_mock.call_args.args[0].wait_for_completion
+
+        process_events_mock.return_value = {"failed": 1, "invalid": 0}
+        assert main([str(input_path), "--output", str(output_path)]) == 1
+
+    @pytest.mark.filterwarnings("ignore:.*found in sys.modules:RuntimeWarning")
+    def test_main_module(self, mocker):
+        mocker.patch("src.stax_orchestrator.StaxOrchestrator")
+        mocker.patch("sys.argv", ["stax-orchestrator"])
+        mocker.patch("sys.stdin", io.StringIO(""))
+        mocker.patch("sys.stderr", io.StringIO())
+
+        # test
+        with pytest.raises(SystemExit) as system_exit:
+            runpy.run_module("src.cli", run_name="__main__")
+
+        assert system_exit.value.code == 0
@@ -0,0 +1,115 @@
+from threading import Thread
+
+from src.concurrency import KeyedLimiter, RateLimiter, run_concurrently, stream_concurrently
+
+
+class TestRateLimiter:
+    def test_acquire_without_limit(self, mocker):
+        sleep_mock = mocker.patch("src.concurrency.sleep")
+
+        # test
+        rate_limiter = RateLimiter()
+        rate_limiter.acquire()
+        rate_limiter.acquire()
+
+        sleep_mock.assert_not_called()
+
+    def test_acquire_spaces_out_calls(self, mocker):
+        mocker.patch("src.concurrency.monotonic", return_value=100.0)
+        sleep_mock = mocker.patch("src.concurrency.sleep")
+
+        # test
+        rate_limiter = RateLimiter(requests_per_second=2)
+        rate_limiter.acquire()
+        rate_limiter.acquire()
+        rate_limiter.acquire()
+
+        assert sleep_mock.call_args_list == [mocker.call(0.5), mocker.call(1.0)]
+
+
+class TestKeyedLimiter:
+    def test_hold_without_limit(self):
+        keyed_limiter = KeyedLimiter()
+
+        # test
+        with keyed_limiter.hold("some-account"), keyed_limiter.hold("some-account"):
+            pass
+
+    def test_hold_limits_per_key(self):
+        keyed_limiter = KeyedLimiter(limit=1)
+        acquired = []
+
+        def hold(key):
+            with keyed_limiter.hold(key):
+                acquired.append(key)
+
+        # test
+        with keyed_limiter.hold("some-account"):
+            blocked = Thread(target=hold, args=("some-account",))
+            other = Thread(target=hold, args=("other-account",))
+            blocked.start()
+            other.start()
+            other.join()
+            blocked.join(timeout=0.1)
+
+            assert acquired == ["other-account"]
+
+        blocked.join()
+        assert acquired == ["other-account", "some-account"]
+
+
+class TestRunConcurrently:
+    def test_run_concurrently_preserves_order(self):
+        # test
+        results = run_concurrently(lambda item: item * 2, [1, 2, 3], max_workers=2)
+
+        assert [result.item for result in results] == [1, 2, 3]
+        assert [result.result for result in results] == [2, 4, 6]
+        assert all(result.error is None for result in results)
+
+    def test_run_concurrently_captures_errors(self, mocker):
+        rate_limiter = mocker.Mock()
+
+        def fail_on_two(item):
+            if item == 2:
+                raise ValueError("some-error")
+            return item
+
+        # test
+        results = run_concurrently(fail_on_two, [1, 2], rate_limiter=rate_limiter)
+
+        assert results[0].result == 1
+        assert isinstance(results[1].error, ValueError)
+        assert rate_limiter.acquire.call_count == 2
+
+    def test_run_concurrently_no_items(self):
+        # test
+        assert run_concurrently(lambda item: item, []) == []
+
+
+class TestStreamConcurrently:
+    def test_stream_concurrently(self, mocker):
+        rate_limiter = mocker.Mock()
+        consumed = []
+
+        def items():
+            for item in range(10):
+                consumed.append(item)
+                yield item
+
+        # test
+        results = stream_concurrently(lambda item: item * 2, items(), max_workers=2, rate_limiter=rate_limiter)
+
+        assert next(results).error is None
+        assert len(consumed) < 10
+
+        assert len(list(results)) == 9
+        assert len(consumed) == 10
+        assert rate_limiter.acquire.call_count == 10
+
+    def test_stream_concurrently_captures_errors(self):
+        # test
+        results = list(stream_concurrently(lambda item: 1 / item, [0, 1]))
+
+        assert sorted(str(result.error) for result in results if result.error) == ["division by zero"]
+        assert [result.result for result in results if result.error is None] == [1.0]
@@ -0,0 +1,323 @@
+from copy import deepcopy
+
+import pytest
+
+from src import handlers
+from src.ingestion import MicroBatchDispatcher
+from src.payloads import TASK_INFO_REQUIRED_FIELDS, PayloadCompactor, load_payload
+
+
+class TestValidateInput:
+    def test_validate_input(self, mocker):
+        # data
+        event: dict = {"operation": "create"}
+
+        # mock
+        stax_orchestrator_mock = mocker.patch("src.stax_orchestrator.StaxOrchestrator")
+
+        # test
+        assert (
+            handlers.validate_input(event) == stax_orchestrator_mock.return_value.validate_workload_event.return_value
+        )
+
+        stax_orchestrator_mock.return_value.validate_workload_event.assert_called_once_with(event)
+
+
+WORKLOAD_RESPONSE: dict = {
+    "Detail": {
+        "Message": "some-message",
+        "Workload": {"Name": "some-workload-name", "WorkloadId": "some-workload-id", "TaskId": "some-task-id"},
+    },
+    "JobId": "some-job-id",
+}
+PROJECTED_WORKLOAD_RESPONSE: dict = {
+    "Detail": {
+        "Workload": {
+            "Name": "some-workload-name",
+            "WorkloadId": "some-workload-id",
+            "TaskId": "some-task-id",
+            "TaskStartedAt": 100.0,
+            "CatalogueId": None,
+            "Region": None,
+        }
+    }
+}
+
+
+@pytest.fixture
+def workload_response(mocker) -> dict:
+    """
+    Copy of a workload response with the task start stamped at 100.0
+    """
+    mocker.patch("src.handlers.time", return_value=100.0)
+    return deepcopy(WORKLOAD_RESPONSE)
+
+
+def test_stamp_task_start_without_workload(mocker):
+    # mock
+    mocker.patch("src.handlers.time", return_value=100.0)
+
+    # test
+    assert handlers.stamp_task_start({"Detail": {"Message": "some-message"}}) == {
+        "Detail": {"Message": "some-message"}
+    }
+
+
+class TestCreateWorkload:
+    event: dict = {"workload_name": "some-workload-name"}
+
+    def test_create_workload(self, mocker, workload_response):
+        # mock
+        stax_orchestrator_mock = mocker.patch("src.stax_orchestrator.StaxOrchestrator")
+        stax_orchestrator_mock.return_value.create_unique_workload.return_value = workload_response
+
+        # test
+        assert handlers.create_workload(self.event) == PROJECTED_WORKLOAD_RESPONSE
+
+        stax_orchestrator_mock.return_value.create_unique_workload.assert_called_once_with(**self.event)
+
+    def test_create_workload_passes_catalogue_and_region(self, mocker, workload_response):
+        # data
+        event: dict = {**self.event, "catalogue_id": "some-cat-id", "aws_region": "ap-southeast-2"}
+
+        # mock
+        stax_orchestrator_mock = mocker.patch("src.stax_orchestrator.StaxOrchestrator")
+        stax_orchestrator_mock.return_value.create_unique_workload.return_value = workload_response
+
+        # test
+        workload = handlers.create_workload(event)["Detail"]["Workload"]
+
+        assert (workload["CatalogueId"], workload["Region"]) == ("some-cat-id", "ap-southeast-2")
+
+
+class TestUpdateWorkload:
+    event: dict = {"workload_id": "some-workload-id"}
+
+    def test_update_workload(self, mocker, workload_response):
+        # mock
+        stax_orchestrator_mock = mocker.patch("src.stax_orchestrator.StaxOrchestrator")
+        stax_orchestrator_mock.return_value.update_workload.return_value = workload_response
+
+        workload_response["Detail"]["Workload"].update(CatalogueId="some-cat-id", Region="ap-southeast-2")
+
+        # test
+        assert handlers.update_workload(self.event)["Detail"]["Workload"] == {
+            **PROJECTED_WORKLOAD_RESPONSE["Detail"]["Workload"],
+            "CatalogueId": "some-cat-id",
+            "Region": "ap-southeast-2",
+        }
+
+        stax_orchestrator_mock.return_value.update_workload.assert_called_once_with(**self.event)
+
+
+class TestDeleteWorkload:
+    event: dict = {"workload_id": "some-workload-id"}
+
+    def test_delete_workload(self, mocker, workload_response):
+        # mock
+        stax_orchestrator_mock = mocker.patch("src.stax_orchestrator.StaxOrchestrator")
+        stax_orchestrator_mock.return_value.delete_workload.return_value = workload_response
+
+        # test
+        assert handlers.delete_workload(self.event) == PROJECTED_WORKLOAD_RESPONSE
+
+        stax_orchestrator_mock.return_value.delete_workload.assert_called_once_with(**self.event)
+
+
+class TestGetTaskStatus:
+    def test_get_task_status(self, mocker):
+        # data
+        event: dict = {"task_id": "some-task-id"}
+
+        # mock
+        stax_orchestrator_mock = mocker.patch("src.stax_orchestrator.StaxOrchestrator")
+        stax_orchestrator_mock.return_value.get_task_status.return_value = {
+            "TaskId": "some-task-id",
+            "Status": "RUNNING",
+            "Logs": ["some-log-line"] * 100,
+        }
+
+        # test
+        assert handlers.get_task_status(event)["task_info"] == {"TaskId": "some-task-id", "Status": "RUNNING"}
+
+        stax_orchestrator_mock.return_value.get_task_status.assert_called_once_with(event["task_id"])
+
+    def test_get_task_status_records_terminal_task_duration(self, mocker):
+        # data
+        event: dict = {"task_id": "some-task-id", "workload_id": "some-workload-id", "operation": "create"}
+
+        # mock
+        mocker.patch("src.handlers.time", side_effect=[100.0, 160.0])
+        recorder_mock = mocker.patch("src.handlers.get_task_duration_recorder").return_value
+        stax_orchestrator_mock = mocker.patch("src.stax_orchestrator.StaxOrchestrator")
+        stax_orchestrator_mock.return_value.get_task_status.return_value = {"Status": "SUCCEEDED"}
+        stax_orchestrator_mock.return_value.get_workload.return_value = {
+            "CatalogueId": "some-cat-id",
+            "Region": "ap-southeast-2",
+        }
+
+        # test
+        assert handlers.get_task_status(event)["task_started_at"] == 100.0
+
+        stax_orchestrator_mock.return_value.get_workload.assert_called_once_with("some-workload-id")
+        recorder_mock.record.assert_called_once_with(
+            "create", "some-cat-id", "ap-southeast-2", 60_000.0, task_id="some-task-id"
+        )
+
+    def test_get_task_status_records_duration_with_catalogue_and_region_of_event(self, mocker):
+        # data
+        event: dict = {
+            "task_id": "some-task-id",
+            "workload_id": "some-workload-id",
+            "operation": "delete",
+            "task_started_at": 100.0,
+            "catalogue_id": "some-cat-id",
+            "aws_region": "ap-southeast-2",
+        }
+
+        # mock
+        mocker.patch("src.handlers.time", return_value=130.0)
+        recorder_mock = mocker.patch("src.handlers.get_task_duration_recorder").return_value
+        stax_orchestrator_mock = mocker.patch("src.stax_orchestrator.StaxOrchestrator")
+        stax_orchestrator_mock.return_value.get_task_status.return_value = {"Status": "SUCCEEDED"}
+
+        # test
+        handlers.get_task_status(event)
+
+        stax_orchestrator_mock.return_value.get_workload.assert_not_called()
+        recorder_mock.record.assert_called_once_with(
+            "delete", "some-cat-id", "ap-southeast-2", 30_000.0, task_id="some-task-id"
+        )
+
+    def test_get_task_status_skips_running_task_duration(self, mocker):
+        # data
+        event: dict = {"task_id": "some-task-id", "workload_id": "some-workload-id", "task_started_at": 100.0}
+
+        # mock
+        recorder_mock = mocker.patch("src.handlers.get_task_duration_recorder").return_value
+        stax_orchestrator_mock = mocker.patch("src.stax_orchestrator.StaxOrchestrator")
+        stax_orchestrator_mock.return_value.get_task_status.return_value = {"Status": "RUNNING"}
+
+        # test
+        assert handlers.get_task_status(event)["task_started_at"] == 100.0
+
+        recorder_mock.record.assert_not_called()
+
+    def test_get_task_status_record_failure_does_not_fail_handler(self, mocker):
+        # data
+        event: dict = {"task_id": "some-task-id", "workload_id": "some-workload-id"}
+
+        # mock
+        recorder_mock = mocker.patch("src.handlers.get_task_duration_recorder").return_value
+        recorder_mock.record.side_effect = Exception("some-error")
+        stax_orchestrator_mock = mocker.patch("src.stax_orchestrator.StaxOrchestrator")
+        stax_orchestrator_mock.return_value.get_task_status.return_value = {"Status": "FAILED"}
+
+        # test
+        assert handlers.get_task_status(event)["task_info"] == {"Status": "FAILED"}
+
+    def test_get_task_status_releases_name_of_deleted_workload(self, mocker):
+        # data
+        event: dict = {"task_id": "some-task-id", "workload_id": "some-workload-id", "operation": "delete"}
+
+        # mock
+        stax_orchestrator_mock = mocker.patch("src.stax_orchestrator.StaxOrchestrator")
+        stax_orchestrator_mock.return_value.get_task_status.side_effect = [
+            {"Status": "RUNNING"},
+            {"Status": "SUCCEEDED"},
+        ]
+
+        # test
+        handlers.get_task_status({**event, "workload_name": "some-workload"})
+
+        stax_orchestrator_mock.return_value.release_workload_name.assert_not_called()
+
+        handlers.get_task_status({**event, "workload_name": "some-workload"})
+
+        stax_orchestrator_mock.return_value.release_workload_name.assert_called_once_with(
+            "some-workload-id", "some-workload"
+        )
+
+    def test_get_task_status_release_failure_does_not_fail_handler(self, mocker, caplog):
+        # data
+        event: dict = {"task_id": "some-task-id", "workload_id": "some-workload-id", "operation": "delete"}
+
+        # mock
+        stax_orchestrator_mock = mocker.patch("src.stax_orchestrator.StaxOrchestrator")
+        stax_orchestrator_mock.return_value.get_task_status.return_value = {"Status": "SUCCEEDED"}
+        stax_orchestrator_mock.return_value.release_workload_name.side_effect = Exception("some-error")
+
+        # test
+        assert handlers.get_task_status(event)["task_info"] == {"Status": "SUCCEEDED"}
+        assert "Failed to release the name of deleted workload some-workload-id" in caplog.text
+
+    def test_get_task_status_offloads_large_task_info(self, mocker, tmp_path):
+        # data
+        event: dict = {"task_id": "some-task-id"}
+        task_info = {"TaskId": "some-task-id", "Status": "RUNNING", "Logs": ["some-log-line"] * 100}
+
+        # mock
+        mocker.patch(
+            "src.handlers.get_task_info_compactor",
+            return_value=PayloadCompactor(["*"], TASK_INFO_REQUIRED_FIELDS, str(tmp_path), threshold_bytes=256),
+        )
+        stax_orchestrator_mock = mocker.patch("src.stax_orchestrator.StaxOrchestrator")
+        stax_orchestrator_mock.return_value.get_task_status.return_value = task_info
+
+        # test
+        result = handlers.get_task_status(event)["task_info"]
+
+        assert result["Status"] == "RUNNING"
+        assert "Logs" not in result
+        assert load_payload(result) == task_info
+
+
+class TestIngestWorkloadEvents:
+    def test_ingest_workload_events(self, mocker):
+        # data
+        event: dict = {
+            "Records": [
+                {"messageId": "1", "body": '{"operation": "create", "workload_name": "some-workload-name"}'},
+                {"messageId": "2", "body": '{"operation": "delete", "workload_id": "some-workload-id"}'},
+                {"messageId": "3", "body": '{"operation": "unknown"}'},
+            ]
+        }
+
+        # mock
+        def start(message_id, _):
+            if message_id == "1":
+                raise Exception("some-error")
+
+        def validate(workload_event):
+            if workload_event["operation"] == "unknown":
+                raise ValueError("unknown is not a supported operation.")
+
+        mocker.patch("src.handlers.get_workload_event_dispatcher", return_value=MicroBatchDispatcher(start, validate))
+        logging_mock = mocker.patch("src.handlers.logging")
+
+        # test
+        assert handlers.ingest_workload_events(event) == {"batchItemFailures": [{"itemIdentifier": "1"}]}
+
+        logging_mock.error.assert_called_once()
+
+    def test_ingest_workload_events_requires_state_machine(self, monkeypatch):
+        # mock
+        monkeypatch.delenv("WORKLOAD_STATE_MACHINE_ARN", raising=False)
+
+        # test
+        with pytest.raises(ValueError, match="WORKLOAD_STATE_MACHINE_ARN"):
+            handlers.ingest_workload_events({"Records": []})
+
+    def test_workload_event_dispatcher_from_environment(self, mocker, monkeypatch):
+        # mock
+        monkeypatch.setenv("WORKLOAD_STATE_MACHINE_ARN", "some-state-machine-arn")
+
+        stax_orchestrator_mock = mocker.patch("src.stax_orchestrator.StaxOrchestrator")
+
+        # test
+        workload_event_dispatcher = handlers.get_workload_event_dispatcher()
+        workload_event_dispatcher.validate({"operation": "delete"})
+
+        assert handlers.get_workload_event_dispatcher() is workload_event_dispatcher
+        assert workload_event_dispatcher.start.__self__.state_machine_arn == "some-state-machine-arn"
+        stax_orchestrator_mock.return_value.validate_workload_event.assert_called_once_with({"operation": "delete"})
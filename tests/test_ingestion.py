@@ -0,0 +1,267 @@
+import json
+from threading import Lock
+from time import monotonic, sleep
+
+import pytest
+
+from src.ingestion import (
+    IngestionQueue,
+    LocalQueue,
+    MicroBatchDispatcher,
+    WorkloadExecutionStarter,
+    concurrency_for_rate,
+    get_priority,
+)
+
+QUEUE_URL = "https://sqs.ap-southeast-2.amazonaws.com/123456789012/workload-ingestion"
+
+
+def validate(event: dict) -> dict:
+    if event["operation"] not in ("create", "update", "delete"):
+        raise ValueError(f"{event['operation']} is not a supported operation.")
+    return event
+
+
+class RecordingStarter:
+    def __init__(self, latency_seconds: float = 0, failing: tuple = ()):
+        self.latency_seconds = latency_seconds
+        self.failing = failing
+        self.started = []
+        self._lock = Lock()
+
+    def start(self, message_id: str, event: dict) -> str:
+        sleep(self.latency_seconds)
+        if event.get("workload_name") in self.failing:
+            raise Exception("some-error")
+        with self._lock:
+            self.started.append(event)
+        return f"arn:{message_id}"
+
+
+class TestPriority:
+    def test_get_priority(self):
+        # test
+        assert get_priority({"operation": "delete"}) < get_priority({"operation": "update"})
+        assert get_priority({"operation": "update"}) < get_priority({"operation": "create"})
+        assert get_priority({"operation": "create"}) < get_priority({"operation": "fan_out"})
+        assert get_priority({"operation": "fan_out"}) < get_priority({"operation": "unknown"})
+        assert get_priority({"operation": "create", "priority": -1}) == -1
+        assert get_priority({"operation": "delete", "priority": True}) == 0
+
+    def test_concurrency_for_rate(self):
+        # test
+        assert concurrency_for_rate(5, 1) == 5
+        assert concurrency_for_rate(5, 0.3) == 2
+        assert concurrency_for_rate(0.5, 0.1) == 1
+
+
+class TestLocalQueue:
+    def test_receive_hides_messages_until_visibility_timeout(self):
+        # data
+        queue = LocalQueue(visibility_timeout=0.05)
+        queue.send_message_batch(QueueUrl=QUEUE_URL, Entries=[{"Id": "0", "MessageBody": "{}"}])
+
+        # test
+        first = queue.receive_message(QueueUrl=QUEUE_URL, MaxNumberOfMessages=10)["Messages"]
+
+        assert queue.receive_message(QueueUrl=QUEUE_URL) == {}
+        sleep(0.06)
+        second = queue.receive_message(QueueUrl=QUEUE_URL)["Messages"]
+
+        assert first[0]["MessageId"] == second[0]["MessageId"]
+        assert first[0]["ReceiptHandle"] != second[0]["ReceiptHandle"]
+
+    def test_delete_message_batch(self):
+        # data
+        queue = LocalQueue()
+        queue.send_message_batch(QueueUrl=QUEUE_URL, Entries=[{"Id": "0", "MessageBody": "{}"}])
+        message = queue.receive_message(QueueUrl=QUEUE_URL, VisibilityTimeout=60)["Messages"][0]
+
+        # test
+        assert queue.delete_message_batch(
+            QueueUrl=QUEUE_URL,
+            Entries=[{"Id": "0", "ReceiptHandle": message["ReceiptHandle"]}, {"Id": "1", "ReceiptHandle": "stale"}],
+        ) == {
+            "Successful": [{"Id": "0"}],
+            "Failed": [{"Id": "1", "Code": "ReceiptHandleIsInvalid", "SenderFault": True}],
+        }
+        assert queue.receive_message(QueueUrl=QUEUE_URL) == {}
+
+
+class TestIngestionQueue:
+    def test_from_environment(self, monkeypatch):
+        # test
+        monkeypatch.delenv("WORKLOAD_INGESTION_QUEUE_URL", raising=False)
+        assert IngestionQueue.from_environment() is None
+
+        monkeypatch.setenv("WORKLOAD_INGESTION_QUEUE_URL", QUEUE_URL)
+        assert IngestionQueue.from_environment().queue_url == QUEUE_URL
+
+    def test_client_is_created_on_first_use(self, mocker):
+        # mock
+        boto3_mock = mocker.patch.dict("sys.modules", {"boto3": mocker.MagicMock()})["boto3"]
+        queue = IngestionQueue(QUEUE_URL)
+
+        # test
+        assert queue.client is queue.client
+        boto3_mock.client.assert_called_once_with("sqs")
+
+    def test_submit_validates_and_batches_events(self, mocker):
+        # data
+        client = LocalQueue()
+        send_mock = mocker.spy(client, "send_message_batch")
+        events = [{"operation": "create", "workload_name": f"workload-{number}"} for number in range(12)]
+
+        # test
+        report = IngestionQueue(QUEUE_URL, client).submit(events + [{"operation": "fan_out"}, {}], validate)
+
+        assert len(report["Accepted"]) == 12
+        assert [rejected["Index"] for rejected in report["Rejected"]] == [12, 13]
+        assert report["Failed"] == []
+        assert [len(call.kwargs["Entries"]) for call in send_mock.call_args_list] == [10, 2]
+
+    def test_submit_reports_failed_entries(self, mocker):
+        # mock
+        client = mocker.Mock()
+        client.send_message_batch.return_value = {
+            "Successful": [],
+            "Failed": [{"Id": "0", "Code": "InternalError", "SenderFault": False}],
+        }
+
+        # test
+        assert IngestionQueue(QUEUE_URL, client).submit([{"operation": "delete"}], validate) == {
+            "Accepted": [],
+            "Rejected": [],
+            "Failed": [{"Index": 0, "Error": "InternalError"}],
+        }
+
+    def test_receive_fills_micro_batch(self):
+        # data
+        queue = IngestionQueue(QUEUE_URL, LocalQueue())
+        queue.submit([{"operation": "delete", "workload_id": str(number)} for number in range(25)], validate)
+
+        # test
+        assert len(queue.receive(22)) == 22
+        assert len(queue.receive(22)) == 3
+        assert queue.receive(22) == []
+
+    def test_process_starts_events_by_priority_and_keeps_failed_events(self):
+        # data
+        queue = IngestionQueue(QUEUE_URL, LocalQueue(visibility_timeout=0.05))
+        starter = RecordingStarter(failing=("broken",))
+        events = [
+            {"operation": "create", "workload_name": "new"},
+            {"operation": "create", "workload_name": "broken"},
+            {"operation": "update", "workload_id": "updated"},
+            {"operation": "delete", "workload_id": "ephemeral"},
+        ]
+        queue.submit(events, validate)
+        queue.client.send_message_batch(QueueUrl=QUEUE_URL, Entries=[{"Id": "0", "MessageBody": "not-json"}])
+
+        # test
+        report = queue.process(
+            MicroBatchDispatcher(starter.start, validate, requests_per_second=0.0, latency_seconds=0)
+        )
+
+        assert [event.get("workload_id", event.get("workload_name")) for event in starter.started] == [
+            "ephemeral",
+            "updated",
+            "new",
+        ]
+        assert len(report["Started"]) == 3
+        assert len(report["Rejected"]) == 1
+        sleep(0.06)
+        assert [json.loads(message["Body"]) for message in queue.receive()] == [events[1]]
+
+
+class TestWorkloadExecutionStarter:
+    state_machine_arn = "arn:aws:states:ap-southeast-2:123456789012:stateMachine:workload"
+
+    def test_from_environment(self, monkeypatch):
+        # test
+        monkeypatch.delenv("WORKLOAD_STATE_MACHINE_ARN", raising=False)
+        assert WorkloadExecutionStarter.from_environment() is None
+
+        monkeypatch.setenv("WORKLOAD_STATE_MACHINE_ARN", self.state_machine_arn)
+        assert WorkloadExecutionStarter.from_environment().state_machine_arn == self.state_machine_arn
+
+    def test_start(self, mocker):
+        # mock
+        boto3_mock = mocker.patch.dict("sys.modules", {"boto3": mocker.MagicMock()})["boto3"]
+        client = boto3_mock.client.return_value
+        client.start_execution.return_value = {"executionArn": "some-execution-arn"}
+
+        # test
+        assert WorkloadExecutionStarter(self.state_machine_arn).start("message-id", {"operation": "delete"}) == (
+            "some-execution-arn"
+        )
+
+        boto3_mock.client.assert_called_once_with("stepfunctions")
+        client.start_execution.assert_called_once_with(
+            stateMachineArn=self.state_machine_arn, name="message-id", input='{"operation": "delete"}'
+        )
+
+    def test_start_redelivered_message(self, mocker):
+        # mock
+        client = mocker.Mock()
+        error = Exception("Execution already exists")
+        error.response = {"Error": {"Code": "ExecutionAlreadyExists"}}
+        client.start_execution.side_effect = [error, Exception("some-error")]
+        starter = WorkloadExecutionStarter(self.state_machine_arn, client)
+
+        # test
+        assert starter.start("message-id", {}) is None
+
+        with pytest.raises(Exception, match="some-error"):
+            starter.start("message-id", {})
+
+
+class TestMicroBatchDispatcher:
+    def test_from_environment_shares_rate_budget(self, monkeypatch):
+        # mock
+        monkeypatch.setenv("INGESTION_REQUESTS_PER_SECOND", "10")
+        monkeypatch.setenv("INGESTION_MAXIMUM_CONCURRENCY", "2")
+        monkeypatch.setenv("INGESTION_LATENCY_SECONDS", "0.5")
+
+        # test
+        dispatcher = MicroBatchDispatcher.from_environment(RecordingStarter().start, validate)
+
+        assert dispatcher.max_workers == 3
+        assert dispatcher.rate_limiter._interval == pytest.approx(0.2)
+
+    def test_dispatch_reports_rejected_and_failed_events(self):
+        # data
+        starter = RecordingStarter(failing=("broken",))
+        dispatcher = MicroBatchDispatcher(starter.start, validate, requests_per_second=0.0)
+
+        # test
+        report = dispatcher.dispatch(
+            [
+                ("1", json.dumps({"operation": "create", "workload_name": "broken"})),
+                ("2", "[]"),
+                ("3", json.dumps({"operation": "fan_out"})),
+                ("4", json.dumps({"operation": "delete", "workload_id": "some-workload-id"})),
+            ]
+        )
+
+        assert report["Started"] == ["4"]
+        assert [rejected["MessageId"] for rejected in report["Rejected"]] == ["2", "3"]
+        assert report["Failed"] == [{"MessageId": "1", "Error": "some-error"}]
+
+    def test_dispatch_sustains_rate_budget_under_burst(self):
+        # data
+        starter = RecordingStarter(latency_seconds=0.05)
+        dispatcher = MicroBatchDispatcher(starter.start, validate, requests_per_second=100, latency_seconds=0.05)
+        burst = [
+            (str(number), json.dumps({"operation": "delete", "workload_id": str(number)})) for number in range(50)
+        ]
+
+        # test
+        started_at = monotonic()
+        report = dispatcher.dispatch(burst)
+        elapsed = monotonic() - started_at
+
+        # 50 sequential starts take 2.5 seconds, the sized worker pool keeps up with the 100/s budget (0.5 seconds)
+        assert len(report["Started"]) == 50
+        assert dispatcher.max_workers == 5
+        assert 0.45 <= elapsed < 1.5
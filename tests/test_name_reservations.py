@@ -0,0 +1,144 @@
+import pytest
+
+from src.name_reservations import (
+    ConditionalCheckFailedException,
+    LocalConditionalTable,
+    NameAlreadyReservedException,
+    NameReservations,
+)
+
+
+class TestLocalConditionalTable:
+    table = "workload-names"
+    key = {"workload_name": {"S": "some-workload"}}
+
+    def test_put_item_condition(self):
+        # data
+        table = LocalConditionalTable()
+        condition = {
+            "ConditionExpression": "attribute_not_exists(#name)",
+            "ExpressionAttributeNames": {"#name": "workload_name"},
+        }
+
+        # test
+        table.put_item(TableName=self.table, Item={**self.key, "count": {"N": "1"}}, **condition)
+
+        with pytest.raises(ConditionalCheckFailedException) as error:
+            table.put_item(TableName=self.table, Item=self.key, **condition)
+
+        assert error.value.response["Error"]["Code"] == "ConditionalCheckFailedException"
+        assert table.get_item(TableName=self.table, Key=self.key) == {"Item": {**self.key, "count": {"N": "1"}}}
+
+    def test_delete_item_condition(self):
+        # data
+        table = LocalConditionalTable()
+        table.put_item(TableName=self.table, Item={**self.key, "count": {"N": "5"}})
+
+        # test
+        with pytest.raises(ConditionalCheckFailedException):
+            table.delete_item(
+                TableName=self.table,
+                Key=self.key,
+                ConditionExpression="count < :limit OR missing = :limit",
+                ExpressionAttributeValues={":limit": {"N": "2"}},
+            )
+
+        table.delete_item(
+            TableName=self.table,
+            Key=self.key,
+            ConditionExpression="count < :limit",
+            ExpressionAttributeValues={":limit": {"N": "10"}},
+        )
+
+        assert table.get_item(TableName=self.table, Key=self.key) == {}
+
+    def test_unsupported_condition(self):
+        # test
+        with pytest.raises(ValueError, match="Unsupported condition expression"):
+            LocalConditionalTable().put_item(TableName=self.table, Item=self.key, ConditionExpression="begins_with(a)")
+
+
+class TestNameReservations:
+    def test_claim_confirm_release(self):
+        # data
+        reservations = NameReservations("workload-names", LocalConditionalTable())
+
+        # test
+        token = reservations.claim("some-workload")
+
+        with pytest.raises(NameAlreadyReservedException):
+            reservations.claim("some-workload")
+
+        assert reservations.get_workload_id("some-workload") is None
+
+        reservations.confirm("some-workload", token, "some-workload-id")
+
+        assert reservations.get_workload_id("some-workload") == "some-workload-id"
+        assert not reservations.release("some-workload", workload_id="some-other-workload-id")
+        assert reservations.release("some-workload", workload_id="some-workload-id")
+        assert reservations.release("some-workload", token=reservations.claim("some-workload"))
+
+    def test_claim_expired_claim(self, mocker):
+        # mock
+        mocker.patch("src.name_reservations.time", side_effect=[1000.0, 1100.0])
+        reservations = NameReservations("workload-names", LocalConditionalTable(), claim_ttl_seconds=60)
+
+        # test
+        token = reservations.claim("some-workload")
+        reservations.claim("some-workload")
+
+        with pytest.raises(NameAlreadyReservedException, match="expired"):
+            reservations.confirm("some-workload", token, "some-workload-id")
+
+    def test_reserve(self):
+        # data
+        reservations = NameReservations("workload-names", LocalConditionalTable())
+
+        # test
+        assert reservations.reserve("some-workload", "some-workload-id")
+        assert not reservations.reserve("some-workload", "some-other-workload-id")
+
+        with pytest.raises(NameAlreadyReservedException):
+            reservations.claim("some-workload")
+
+    def test_workload_id_is_required(self):
+        # data
+        reservations = NameReservations("workload-names", LocalConditionalTable())
+
+        # test
+        with pytest.raises(ValueError, match="without a workload ID"):
+            reservations.confirm("some-workload", reservations.claim("some-workload"), None)
+
+        with pytest.raises(ValueError, match="without a workload ID"):
+            reservations.reserve("some-other-workload", "")
+
+    def test_client_errors_are_raised(self, mocker):
+        # mock
+        client = mocker.Mock()
+        client.put_item.side_effect = client.delete_item.side_effect = Exception("some-error")
+        reservations = NameReservations("workload-names", client)
+
+        # test
+        for call in (
+            lambda: reservations.claim("some-workload"),
+            lambda: reservations.confirm("some-workload", "some-token", "some-workload-id"),
+            lambda: reservations.reserve("some-workload", "some-workload-id"),
+            lambda: reservations.release("some-workload", token="some-token"),
+        ):
+            with pytest.raises(Exception, match="some-error"):
+                call()
+
+    def test_from_environment(self, mocker, monkeypatch):
+        # mock
+        boto3_mock = mocker.patch.dict("sys.modules", {"boto3": mocker.MagicMock()})["boto3"]
+
+        # test
+        assert NameReservations.from_environment() is None
+
+        monkeypatch.setenv("WORKLOAD_NAME_TABLE", "workload-names")
+        monkeypatch.setenv("WORKLOAD_NAME_CLAIM_TTL_SECONDS", "60")
+        reservations = NameReservations.from_environment()
+
+        assert (reservations.table_name, reservations.claim_ttl_seconds) == ("workload-names", 60)
+        assert reservations.client == boto3_mock.client.return_value
+        boto3_mock.client.assert_called_once_with("dynamodb")
@@ -0,0 +1,105 @@
+import json
+
+from src.payloads import (
+    CLAIM_CHECK_KEY,
+    WORKLOAD_RESPONSE_REQUIRED_FIELDS,
+    PayloadCompactor,
+    load_payload,
+    payload_size,
+    project,
+)
+
+
+class TestProject:
+    payload: dict = {
+        "Detail": {
+            "Message": "some-message",
+            "Workload": {"WorkloadId": "some-workload-id", "TaskId": "some-task-id"},
+        },
+        "Status": "RUNNING",
+    }
+
+    def test_project_fields(self):
+        # test
+        assert project(self.payload, ["Status", "Detail.Workload.TaskId", "Detail.Missing", "Status.Nested"]) == {
+            "Status": "RUNNING",
+            "Detail": {"Workload": {"TaskId": "some-task-id"}},
+        }
+
+    def test_project_all_fields(self):
+        # test
+        projected = project(self.payload, ["*"])
+
+        assert projected == self.payload
+        assert projected is not self.payload
+
+
+class TestPayloadCompactor:
+    response: dict = {
+        "Detail": {"Workload": {"Name": "some-name", "WorkloadId": "some-workload-id", "TaskId": "some-task-id"}},
+        "Logs": ["some-log-line"] * 100,
+    }
+
+    def test_compact_projects_small_payloads(self, tmp_path):
+        # data
+        compactor = PayloadCompactor(
+            ["Logs"], WORKLOAD_RESPONSE_REQUIRED_FIELDS, str(tmp_path), threshold_bytes=10_000
+        )
+
+        # test
+        assert compactor.compact(self.response) == self.response
+        assert list(tmp_path.iterdir()) == []
+
+    def test_compact_offloads_large_payloads(self, tmp_path):
+        # data
+        compactor = PayloadCompactor(
+            ["Detail.Workload.Name"], WORKLOAD_RESPONSE_REQUIRED_FIELDS, f"{tmp_path}/", threshold_bytes=512
+        )
+
+        # test
+        compacted = compactor.compact(self.response)
+
+        assert compacted[CLAIM_CHECK_KEY].startswith(f"{tmp_path}/")
+        assert {key: value for key, value in compacted.items() if key != CLAIM_CHECK_KEY} == {
+            "Detail": self.response["Detail"]
+        }
+        assert load_payload(compacted) == self.response
+        assert payload_size(compacted) < payload_size(self.response)
+
+    def test_compact_keeps_required_fields_of_large_projections(self, tmp_path):
+        # data
+        compactor = PayloadCompactor(["*"], ["Detail.Workload.TaskId"], str(tmp_path), threshold_bytes=512)
+
+        # test
+        compacted = compactor.compact(self.response)
+
+        assert compacted == {
+            "Detail": {"Workload": {"TaskId": "some-task-id"}},
+            CLAIM_CHECK_KEY: compacted[CLAIM_CHECK_KEY],
+        }
+        assert json.loads((tmp_path / compacted[CLAIM_CHECK_KEY].split("/")[-1]).read_text()) == self.response
+
+    def test_compact_without_offload_location(self):
+        # data
+        compactor = PayloadCompactor(["*"], ["Detail.Workload.TaskId"], threshold_bytes=1)
+
+        # test
+        assert compactor.compact(self.response) == self.response
+
+    def test_load_payload_without_claim_check(self):
+        # test
+        assert load_payload({"Status": "RUNNING"}) == {"Status": "RUNNING"}
+
+    def test_from_environment(self, monkeypatch):
+        # test
+        compactor = PayloadCompactor.from_environment("SOME_FIELDS", ["TaskId"])
+
+        assert (compactor.fields, compactor.offload_location, compactor.threshold_bytes) == (("TaskId",), None, 65536)
+
+        monkeypatch.setenv("SOME_FIELDS", "Status, Logs,")
+        monkeypatch.setenv("PAYLOAD_OFFLOAD_LOCATION", "s3://some-bucket/payloads")
+        monkeypatch.setenv("PAYLOAD_OFFLOAD_THRESHOLD_BYTES", "1024")
+        compactor = PayloadCompactor.from_environment("SOME_FIELDS", ["TaskId"])
+
+        assert (compactor.fields, compactor.required_fields) == (("Status", "Logs"), ("TaskId",))
+        assert (compactor.offload_location, compactor.threshold_bytes) == ("s3://some-bucket/payloads", 1024)
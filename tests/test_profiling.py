@@ -0,0 +1,39 @@
+import pstats
+
+from src.profiling import profile_handler
+
+
+def handler(event, _):
+    return {"allocated": [index for index in range(1000)], **event}
+
+
+class TestProfileHandler:
+    def test_profile_handler_disabled(self, monkeypatch):
+        monkeypatch.delenv("PROFILE_HANDLERS", raising=False)
+
+        # test
+        assert profile_handler(handler) is handler
+
+    def test_profile_handler_writes_profile(self, monkeypatch, tmp_path, mocker):
+        monkeypatch.setenv("PROFILE_HANDLERS", "true")
+        monkeypatch.setenv("PROFILE_OUTPUT_LOCATION", str(tmp_path))
+        context = mocker.Mock(function_name="some-function", aws_request_id="some-request-id")
+
+        # test
+        profiled_handler = profile_handler(handler)
+
+        assert profiled_handler is not handler
+        assert profiled_handler({"key": "value"}, context)["key"] == "value"
+
+        profile_paths = sorted((tmp_path / "some-function").iterdir())
+        assert [path.suffix for path in profile_paths] == [".prof", ".txt"]
+        assert all(path.name.endswith("-some-request-id" + path.suffix) for path in profile_paths)
+        assert "handler" in str(pstats.Stats(str(profile_paths[0])).stats)
+        assert "Peak traced memory" in profile_paths[1].read_text()
+
+    def test_profile_handler_write_failure_does_not_fail_handler(self, monkeypatch, mocker):
+        monkeypatch.setenv("PROFILE_HANDLERS", "true")
+        mocker.patch("src.profiling.write_object", side_effect=Exception("some-error"))
+
+        # test
+        assert profile_handler(handler)({"key": "value"}, {})["key"] == "value"
@@ -0,0 +1,244 @@
+from time import sleep
+
+import pytest
+from botocore.exceptions import ClientError, EndpointConnectionError
+
+from src.concurrency import run_concurrently
+from src.stack_deployer import (
+    AdaptivePoller,
+    DeploymentStatus,
+    StackDeployer,
+    StackDeployment,
+    StackTarget,
+    get_client,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(mocker) -> FakeClock:
+    fake_clock = FakeClock()
+    mocker.patch("src.stack_deployer.monotonic", side_effect=fake_clock.monotonic)
+    return fake_clock
+
+
+def throttling_error() -> ClientError:
+    return ClientError({"Error": {"Code": "Throttling", "Message": "Rate exceeded"}}, "DescribeStacks")
+
+
+class TestStackDeployer:
+    application_id = "arn:aws:serverlessrepo:ap-southeast-2:123456789012:applications/stax-orchestrator"
+    parameters = {"DeployWorkloadStateMachine": "true"}
+
+    def get_deployer(self, mocker, clock, clients: dict) -> StackDeployer:
+        client_factory = mocker.Mock(side_effect=lambda service_name, target: clients[(service_name, target.region)])
+        return StackDeployer(
+            self.application_id,
+            "1.0.0",
+            "orchestrator-stax",
+            self.parameters,
+            client_factory=client_factory,
+            poller=AdaptivePoller(initial_delay=2, max_delay=8, backoff=2, sleep_func=clock.sleep),
+        )
+
+    @staticmethod
+    def get_clients(mocker, region: str, change_set_statuses: list, stack_statuses: list) -> dict:
+        serverlessrepo = mocker.Mock()
+        serverlessrepo.create_cloud_formation_change_set.return_value = {
+            "ChangeSetId": f"{region}-change-set",
+            "StackId": f"{region}-stack",
+        }
+        cloudformation = mocker.Mock()
+        cloudformation.describe_change_set.side_effect = [{"Status": status} for status in change_set_statuses]
+        cloudformation.describe_stacks.side_effect = [
+            status if isinstance(status, Exception) else {"Stacks": [{"StackStatus": status}]}
+            for status in stack_statuses
+        ]
+        return {("serverlessrepo", region): serverlessrepo, ("cloudformation", region): cloudformation}
+
+    def test_deploy_to_several_regions(self, mocker, clock):
+        # mock
+        clients = {
+            **self.get_clients(
+                mocker,
+                "ap-southeast-2",
+                ["CREATE_PENDING", "CREATE_COMPLETE"],
+                ["CREATE_IN_PROGRESS", "CREATE_COMPLETE"],
+            ),
+            **self.get_clients(
+                mocker, "us-east-1", ["CREATE_COMPLETE"], ["UPDATE_IN_PROGRESS", throttling_error(), "UPDATE_COMPLETE"]
+            ),
+        }
+        deployer = self.get_deployer(mocker, clock, clients)
+        targets = [StackTarget("ap-southeast-2"), StackTarget("us-east-1"), StackTarget("ap-southeast-2")]
+
+        # test
+        deployments = deployer.deploy(targets)
+
+        assert [deployment.status for deployment in deployments] == [DeploymentStatus.SUCCEEDED] * 2
+        clients[("serverlessrepo", "us-east-1")].create_cloud_formation_change_set.assert_called_once_with(
+            ApplicationId=self.application_id,
+            Capabilities=["CAPABILITY_IAM", "CAPABILITY_RESOURCE_POLICY"],
+            SemanticVersion="1.0.0",
+            StackName="orchestrator-stax",
+            ParameterOverrides=[{"Name": "DeployWorkloadStateMachine", "Value": "true"}],
+        )
+        clients[("cloudformation", "ap-southeast-2")].execute_change_set.assert_called_once_with(
+            ChangeSetName="ap-southeast-2-change-set", StackName="ap-southeast-2-stack"
+        )
+        assert deployments[0].to_dict() == {
+            "target": "ap-southeast-2",
+            "status": "SUCCEEDED",
+            "change_set_id": "ap-southeast-2-change-set",
+            "stack_id": "ap-southeast-2-stack",
+            "stack_status": "CREATE_COMPLETE",
+            "error": None,
+            "polls": 4,
+            "change_set_seconds": 6.0,
+            "stack_seconds": 10.0,
+            "total_seconds": 10.0,
+        }
+        assert deployments[1].to_dict()["polls"] == 4
+        assert deployments[1].to_dict()["total_seconds"] == 10.0
+
+    def test_deploy_reports_failures_per_target(self, mocker, clock):
+        # mock
+        access_denied = ClientError({"Error": {"Code": "AccessDenied", "Message": "Denied"}}, "DescribeStacks")
+        clients = {
+            **self.get_clients(mocker, "ap-southeast-2", ["FAILED"], []),
+            **self.get_clients(mocker, "us-east-1", ["CREATE_COMPLETE"], ["ROLLBACK_COMPLETE"]),
+            **self.get_clients(mocker, "eu-west-1", ["CREATE_COMPLETE"], [access_denied]),
+            **self.get_clients(mocker, "eu-west-2", [], []),
+        }
+        clients[("serverlessrepo", "eu-west-2")].create_cloud_formation_change_set.side_effect = Exception("No access")
+        deployer = self.get_deployer(mocker, clock, clients)
+        targets = [StackTarget(region) for region in ["ap-southeast-2", "us-east-1", "eu-west-1", "eu-west-2"]]
+
+        # test
+        deployments = deployer.deploy(targets)
+
+        assert [deployment.status for deployment in deployments] == [DeploymentStatus.FAILED] * 4
+        assert [deployment.error for deployment in deployments] == [
+            "Change set creation failed",
+            "Stack deployment finished with status ROLLBACK_COMPLETE",
+            str(access_denied),
+            "No access",
+        ]
+        clients[("cloudformation", "ap-southeast-2")].execute_change_set.assert_not_called()
+
+    def test_deploy_times_out(self, mocker, clock):
+        # mock
+        clients = self.get_clients(mocker, "ap-southeast-2", ["CREATE_PENDING"] * 10, [])
+        deployer = self.get_deployer(mocker, clock, clients)
+
+        # test
+        deployment = deployer.deploy([StackTarget("ap-southeast-2")], timeout=20)[0]
+
+        assert deployment.status == DeploymentStatus.FAILED
+        assert deployment.error == "Timed out after 20 seconds while CREATING_CHANGE_SET"
+        assert clock.sleeps == [2, 4, 8]
+
+    def test_clients_are_created_once_by_concurrent_deployments(self, mocker):
+        # mock
+        client_factory = mocker.Mock(side_effect=lambda service_name, target: sleep(0.01) or mocker.MagicMock())
+        deployer = StackDeployer(self.application_id, "1.0.0", "orchestrator-stax", {}, client_factory=client_factory)
+        deployments = [StackDeployment(StackTarget("ap-southeast-2")) for _ in range(8)]
+
+        # test
+        results = run_concurrently(deployer.create_change_set, deployments, max_workers=8)
+
+        assert all(result.error is None for result in results)
+        client_factory.assert_called_once_with("serverlessrepo", StackTarget("ap-southeast-2"))
+
+
+class TestAdaptivePoller:
+    def test_run_polls_due_deployments_only(self, mocker, clock):
+        # mock
+        fast, slow = StackDeployment(StackTarget("fast")), StackDeployment(StackTarget("slow"))
+        polled = []
+
+        def poll(deployment: StackDeployment) -> bool:
+            polled.append(str(deployment.target))
+            if deployment is fast:
+                deployment.status = DeploymentStatus.SUCCEEDED
+                return True
+            if deployment.polls == 1:
+                clock.now += 1
+                return False
+            deployment.status = DeploymentStatus.SUCCEEDED
+            return True
+
+        # test
+        AdaptivePoller(initial_delay=2, max_delay=8, backoff=3, sleep_func=clock.sleep).run([slow, fast], poll)
+
+        assert polled == ["slow", "fast", "slow"]
+        assert clock.sleeps == [2, 6]
+
+    def test_run_fails_only_the_deployment_that_raised(self, clock):
+        # mock
+        broken, unreachable, healthy = (StackDeployment(StackTarget(region)) for region in ("a", "b", "c"))
+
+        def poll(deployment: StackDeployment) -> bool:
+            if deployment is broken:
+                raise KeyError("Stacks")
+            if deployment is unreachable and deployment.polls == 1:
+                raise EndpointConnectionError(endpoint_url="https://cloudformation.b.amazonaws.com")
+            deployment.status = DeploymentStatus.SUCCEEDED
+            return True
+
+        # test
+        AdaptivePoller(initial_delay=2, max_delay=8, backoff=2, sleep_func=clock.sleep).run(
+            [broken, unreachable, healthy], poll
+        )
+
+        assert [deployment.status for deployment in (broken, unreachable, healthy)] == [
+            DeploymentStatus.FAILED,
+            DeploymentStatus.SUCCEEDED,
+            DeploymentStatus.SUCCEEDED,
+        ]
+        assert broken.error == "'Stacks'"
+        assert unreachable.polls == 2
+
+
+class TestGetClient:
+    def test_get_client_for_profile(self, mocker):
+        # mock
+        session_mock = mocker.patch("src.stack_deployer.boto3.Session")
+
+        # test
+        assert get_client("cloudformation", StackTarget("us-east-1", profile_name="prod")) == (
+            session_mock.return_value.client.return_value
+        )
+        session_mock.assert_called_once_with(profile_name="prod", region_name="us-east-1")
+        session_mock.return_value.client.assert_called_once_with("cloudformation")
+
+    def test_get_client_assumes_role(self, mocker):
+        # mock
+        session_mock = mocker.patch("src.stack_deployer.boto3.Session")
+        session_mock.return_value.client.return_value.assume_role.return_value = {
+            "Credentials": {"AccessKeyId": "key", "SecretAccessKey": "secret", "SessionToken": "token"}
+        }
+        target = StackTarget("us-east-1", role_arn="arn:aws:iam::123456789012:role/deployer")
+
+        # test
+        get_client("cloudformation", target)
+
+        assert str(target) == "arn:aws:iam::123456789012:role/deployer/us-east-1"
+        session_mock.assert_called_with(
+            aws_access_key_id="key",
+            aws_secret_access_key="secret",
+            aws_session_token="token",
+            region_name="us-east-1",
+        )
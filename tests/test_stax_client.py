@@ -0,0 +1,146 @@
+import pickle
+import runpy
+from time import sleep
+
+import pytest
+from staxapp.api import Api
+from staxapp.config import Config as StaxConfig
+from staxapp.contract import StaxContract
+from staxapp.openapi import StaxClient
+
+from src.stax_client import (
+    SharedStaxClient,
+    StaxClientCache,
+    build_schema_snapshot,
+    get_schema_snapshot_path,
+    load_schema_snapshot,
+    main,
+)
+
+
+@pytest.fixture(autouse=True)
+def staxapp_state(mocker):
+    """
+    Restore the class level schema state of staxapp and resolve schemas without prance
+    """
+    operation_map = dict(StaxClient._operation_map)
+    mocker.patch.object(StaxClient, "_schema", StaxClient._schema)
+    mocker.patch.object(StaxContract, "_swagger_doc", StaxContract._swagger_doc)
+    mocker.patch.object(StaxContract, "_resolved_schema", StaxContract._resolved_schema)
+    mocker.patch.object(StaxContract, "resolve_schema_refs", side_effect=lambda schema: {"resolved": len(schema)})
+    mocker.patch.object(StaxConfig, "load_live_schema", StaxConfig.load_live_schema)
+
+    yield
+
+    StaxClient._operation_map.clear()
+    StaxClient._operation_map.update(operation_map)
+
+
+class TestSchemaSnapshot:
+    def test_get_schema_snapshot_path(self, monkeypatch):
+        # test
+        monkeypatch.delenv("STAX_SCHEMA_SNAPSHOT", raising=False)
+        assert get_schema_snapshot_path().endswith("src/stax_schema.pickle")
+
+        monkeypatch.setenv("STAX_SCHEMA_SNAPSHOT", "/opt/python/stax_schema.pickle")
+        assert get_schema_snapshot_path() == "/opt/python/stax_schema.pickle"
+
+    def test_build_and_load_schema_snapshot(self, tmp_path):
+        # data
+        snapshot_path = str(tmp_path / "layer" / "stax_schema.pickle")
+
+        # test
+        snapshot = build_schema_snapshot(snapshot_path, live_schema=False)
+
+        StaxClient._operation_map.clear()
+        StaxContract._swagger_doc = StaxContract._resolved_schema = None
+
+        assert load_schema_snapshot(snapshot_path) is True
+        assert StaxClient._operation_map["workloads"]["ReadWorkloads"][0]["path"] == "/20190206/workloads"
+        assert StaxContract._swagger_doc == StaxClient._schema == snapshot["schema"]
+        assert StaxContract._resolved_schema == snapshot["resolved_schema"]
+
+    def test_load_missing_schema_snapshot(self, tmp_path):
+        # test
+        assert load_schema_snapshot(str(tmp_path / "stax_schema.pickle")) is False
+
+    def test_load_schema_snapshot_of_other_staxapp_version(self, tmp_path, caplog):
+        # data
+        snapshot_path = tmp_path / "stax_schema.pickle"
+        snapshot_path.write_bytes(pickle.dumps({"staxapp_version": "0.0.1"}))
+
+        # test
+        assert load_schema_snapshot(str(snapshot_path)) is False
+        assert "built for staxapp 0.0.1" in caplog.text
+
+    def test_main(self, tmp_path, mocker, capsys):
+        # data
+        snapshot_path = str(tmp_path / "stax_schema.pickle")
+
+        # test
+        main([snapshot_path, "--bundled-schema"])
+
+        assert load_schema_snapshot(snapshot_path) is True
+        assert f"Stax client types to {snapshot_path}" in capsys.readouterr().out
+
+        mocker.patch("sys.argv", ["stax_client", snapshot_path, "--bundled-schema"])
+        runpy.run_module("src.stax_client", run_name="__main__")
+
+
+class TestSharedStaxClient:
+    def test_operations_looked_up_together_call_their_own_endpoint(self, mocker):
+        # mock
+        StaxConfig.load_live_schema = False
+        StaxClient._operation_map.clear()
+        StaxClient._map_paths_to_operations()
+        get_mock = mocker.patch.object(Api, "get")
+        client = object.__new__(StaxClient)
+        client.classname = "workloads"
+        client._config = None
+
+        # test
+        shared_client = SharedStaxClient(client)
+        read_workloads = shared_client.ReadWorkloads
+        read_catalogue_items = shared_client.ReadCatalogueItems
+        read_workloads()
+        read_catalogue_items()
+
+        assert [call.args[0].lstrip("/") for call in get_mock.call_args_list] == [
+            "20190206/workloads",
+            "20190206/workload-catalogue",
+        ]
+
+        # a plain StaxClient calls the operation looked up last
+        read_workloads = client.ReadWorkloads
+        client.ReadCatalogueItems()
+        read_workloads()
+
+        assert get_mock.call_args.args[0].endswith("/20190206/workload-catalogue")
+
+
+class TestStaxClientCache:
+    def test_get_creates_client_once_per_client_type(self, mocker):
+        # data
+        factory = mocker.Mock(side_effect=lambda client_type: object())
+        cache = StaxClientCache(ttl_seconds=60)
+
+        # test
+        assert cache.get("workloads", factory) is cache.get("workloads", factory)
+        assert cache.get("tasks", factory) is not cache.get("workloads", factory)
+        assert factory.call_args_list == [mocker.call("workloads"), mocker.call("tasks")]
+
+    def test_get_recreates_expired_client(self, mocker):
+        # data
+        factory = mocker.Mock(side_effect=lambda client_type: object())
+        cache = StaxClientCache(ttl_seconds=0.01)
+
+        # test
+        client = cache.get("workloads", factory)
+        sleep(0.02)
+
+        assert cache.get("workloads", factory) is not client
+
+        cache.clear()
+        assert factory.call_count == 2
+        cache.get("workloads", factory)
+        assert factory.call_count == 3
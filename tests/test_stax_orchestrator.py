@@ -1,4 +1,17 @@
-from src.stax_orchestrator import StaxOrchestrator, get_stax_client
+import json
+import os
+from copy import deepcopy
+
+import pytest
+import staxapp
+from botocore.exceptions import ClientError
+
+from src.catalogue_gc import MANIFEST_NAME
+from src.catalogue_index import CatalogueNotFoundException
+from src.catalogue_template import WorkloadParametersInvalidException
+from src.concurrency import run_concurrently
+from src.name_reservations import LocalConditionalTable, NameAlreadyReservedException, NameReservations
+from src.stax_orchestrator import StaxOrchestrator, get_stax_client, stax_circuit_breakers, workload_index_cache
 
 
 class TestStaxOrchestrator:
@@ -13,6 +26,26 @@ class TestStaxOrchestrator:
     workload_parameters = {"workload-param1": "some-value1"}
     description = "Create a dynamodb workload"
     catalogue_version_id = "some-catalogue-version-id"
+    gc_catalogues = {
+        "WorkloadCatalogues": [
+            {
+                "WorkloadCatalogueItems": [
+                    {"Id": "dynamo-cat-id", "Name": "simple-dynamodb", "Status": "ACTIVE", "CatalogueVersionId": "v3"},
+                    {"Id": "deleted-cat-id", "Name": "deleted", "Status": "DELETED"},
+                ]
+            }
+        ]
+    }
+    gc_versions = [
+        {
+            "Id": f"v{number}",
+            "WorkloadVersion": f"0000000{number}-0000-4000-8000-000000000000",
+            "Status": "ACTIVE",
+            "CreatedTS": f"2023-0{number}",
+        }
+        for number in range(1, 4)
+    ]
+    gc_manifests = [(f"0000000{number}-0000-4000-8000-000000000000-simple-dynamodb.yaml", 0) for number in range(1, 4)]
 
     def test_get_task_status(self, get_stax_client_mock, mocker):
         stax_orchestrator = StaxOrchestrator()
@@ -24,10 +57,25 @@ class TestStaxOrchestrator:
         get_stax_client_mock.assert_called_once_with("tasks")
         assert exec_result == get_stax_client_mock.return_value.ReadTask.return_value
 
+    def test_get_task_status_caches_finished_tasks(self, get_stax_client_mock, mocker):
+        # mock
+        read_task_mock = mocker.patch.object(
+            get_stax_client_mock.return_value, "ReadTask", return_value={"Status": "SUCCEEDED"}
+        )
+        stax_orchestrator = StaxOrchestrator()
+
+        # test
+        assert stax_orchestrator.get_task_status("finished-task-id") == {"Status": "SUCCEEDED"}
+        assert stax_orchestrator.get_task_status("finished-task-id") == {"Status": "SUCCEEDED"}
+
+        read_task_mock.assert_called_once_with(task_id="finished-task-id")
+        assert StaxOrchestrator.get_task_status_cache_stats() == {"hits": 1, "misses": 1, "size": 1}
+
     def test_create_catalogue_item(self, mocker):
         # mock
-        boto3_mock = mocker.patch("src.stax_orchestrator.boto3")
+        boto3_mock = mocker.patch.dict("sys.modules", {"boto3": mocker.MagicMock()})["boto3"]
         uuid_mock = mocker.patch("src.stax_orchestrator.uuid4")
+        invalidate_mock = mocker.patch("src.stax_orchestrator.catalogue_index_cache.invalidate")
         stax_orchestrator = StaxOrchestrator()
 
         # test
@@ -41,11 +89,46 @@ class TestStaxOrchestrator:
         boto3_mock.resource.return_value.Bucket.return_value.upload_file.assert_called_once_with(
             self.cloudformation_manifest_path, f"{str(uuid_mock.return_value)}-{self.catalogue_name}.yaml"
         )
+        invalidate_mock.assert_called_once()
+
+    def test_create_catalogue_with_version_tag(self, mocker):
+        # mock
+        boto3_mock = mocker.patch.dict("sys.modules", {"boto3": mocker.MagicMock()})["boto3"]
+        uuid_mock = mocker.patch("src.stax_orchestrator.uuid4", return_value="11111111-0000-4000-8000-000000000000")
+        mocker.patch("src.stax_orchestrator.catalogue_index_cache.invalidate")
+        stax_orchestrator = StaxOrchestrator()
+
+        # test
+        stax_orchestrator.create_catalogue(
+            self.bucket,
+            self.catalogue_name,
+            self.cloudformation_manifest_path,
+            self.description,
+            version_tag="1.2.0",
+        )
+        manifest_name = f"1.2.0+{uuid_mock.return_value}-{self.catalogue_name}.yaml"
+        boto3_mock.resource.return_value.Bucket.return_value.upload_file.assert_called_once_with(
+            self.cloudformation_manifest_path, manifest_name
+        )
+        assert stax_orchestrator.workload_client.CreateCatalogueItem.call_args.kwargs["Version"] == (
+            f"1.2.0+{uuid_mock.return_value}"
+        )
+        assert MANIFEST_NAME.match(manifest_name)["workload_version"] == f"1.2.0+{uuid_mock.return_value}"
+
+        with pytest.raises(ValueError):
+            stax_orchestrator.create_catalogue(
+                self.bucket,
+                self.catalogue_name,
+                self.cloudformation_manifest_path,
+                self.description,
+                version_tag="1.2.0+build",
+            )
 
     def test_create_catalogue_version(self, mocker):
         # mock
-        boto3_mock = mocker.patch("src.stax_orchestrator.boto3")
+        boto3_mock = mocker.patch.dict("sys.modules", {"boto3": mocker.MagicMock()})["boto3"]
         uuid_mock = mocker.patch("src.stax_orchestrator.uuid4")
+        invalidate_mock = mocker.patch("src.stax_orchestrator.catalogue_index_cache.invalidate")
         stax_orchestrator = StaxOrchestrator()
 
         # test
@@ -63,6 +146,215 @@ class TestStaxOrchestrator:
         boto3_mock.resource.return_value.Bucket.return_value.upload_file.assert_called_once_with(
             self.cloudformation_manifest_path, f"{str(uuid_mock.return_value)}-{self.catalogue_name}.yaml"
         )
+        invalidate_mock.assert_called_once()
+
+    def test_get_catalogue_versions(self):
+        stax_orchestrator = StaxOrchestrator()
+        stax_orchestrator.workload_client.ReadCatalogueItems.return_value = {
+            "WorkloadCatalogues": [{"WorkloadCatalogueItems": [{"Id": self.catalogue_id, "Versions": [{"Id": "v1"}]}]}]
+        }
+
+        # test
+        assert stax_orchestrator.get_catalogue_versions(self.catalogue_id) == [{"Id": "v1"}]
+        stax_orchestrator.workload_client.ReadCatalogueItems.assert_called_with(catalogue_id=self.catalogue_id)
+
+    def test_get_catalogue_index(self, mocker):
+        # mock
+        mocker.patch("src.stax_orchestrator.catalogue_index_cache.get", side_effect=lambda loader: loader())
+        index_mock = mocker.patch("src.stax_orchestrator.CatalogueIndex")
+        stax_orchestrator = StaxOrchestrator()
+
+        # test
+        assert stax_orchestrator.get_catalogue_index() == index_mock.from_response.return_value
+        index_mock.from_response.assert_called_once_with(
+            stax_orchestrator.workload_client.ReadCatalogueItems.return_value, stax_orchestrator.get_catalogue_versions
+        )
+
+    def test_resolve_catalogue(self, mocker):
+        # mock
+        get_catalogue_index_mock = mocker.patch.object(StaxOrchestrator, "get_catalogue_index")
+
+        # test
+        assert (
+            StaxOrchestrator().resolve_catalogue(self.catalogue_name, "latest")
+            == get_catalogue_index_mock.return_value.resolve.return_value
+        )
+        get_catalogue_index_mock.return_value.resolve.assert_called_once_with(self.catalogue_name, "latest")
+
+    def test_resolve_catalogue_references(self, mocker):
+        # mock
+        resolve_catalogue_mock = mocker.patch.object(
+            StaxOrchestrator,
+            "resolve_catalogue",
+            return_value={"catalogue_id": self.catalogue_id, "catalogue_version_id": self.catalogue_version_id},
+        )
+        stax_orchestrator = StaxOrchestrator()
+
+        # test
+        assert stax_orchestrator.resolve_catalogue_references({"catalogue_id": self.catalogue_id}) == {
+            "catalogue_id": self.catalogue_id
+        }
+        assert stax_orchestrator.resolve_catalogue_references(
+            {"catalogue_name": self.catalogue_name, "catalogue_version": "latest"}
+        ) == {
+            "catalogue_name": self.catalogue_name,
+            "catalogue_version": "latest",
+            "catalogue_id": self.catalogue_id,
+            "catalogue_version_id": self.catalogue_version_id,
+        }
+        resolve_catalogue_mock.assert_called_once_with(self.catalogue_name, "latest")
+
+    def test_create_workload_validates_parameters(self, mocker):
+        # mock
+        validate_mock = mocker.patch.object(
+            StaxOrchestrator,
+            "validate_workload_parameters",
+            side_effect=WorkloadParametersInvalidException(["Name is required"]),
+        )
+        stax_orchestrator = StaxOrchestrator()
+        stax_orchestrator.workload_client.CreateWorkload.reset_mock()
+
+        # test
+        with pytest.raises(WorkloadParametersInvalidException, match="Name is required"):
+            stax_orchestrator.create_workload(
+                self.workload_name,
+                self.catalogue_id,
+                self.aws_region,
+                self.aws_account_id,
+                workload_parameters=self.workload_parameters,
+                validate_parameters=True,
+            )
+
+        validate_mock.assert_called_once_with(self.catalogue_id, self.workload_parameters, None)
+        stax_orchestrator.workload_client.CreateWorkload.assert_not_called()
+
+    def test_read_catalogue_templates(self, mocker):
+        # data
+        manifest = """Resources:
+        - WorkloadSSM:
+            Type: AWS::Cloudformation
+            TemplateURL: s3://bucket/ssm.yaml
+        - WorkloadDynamo:
+            Type: AWS::CloudFormation
+            TemplateURL: s3://bucket/dynamo.yaml
+        - Stackset:
+            Type: AWS::StackSet
+        """
+
+        # mock
+        read_object_mock = mocker.patch(
+            "src.stax_orchestrator.read_object", side_effect=[manifest, "ssm-template", "dynamo-template", "{}"]
+        )
+        stax_orchestrator = StaxOrchestrator()
+        stax_orchestrator._workload_client = mocker.Mock()
+        stax_orchestrator.workload_client.ReadCatalogueManifest.return_value = {"url": "https://stax/manifest"}
+        stax_orchestrator.workload_client.ReadCatalogueTemplate.side_effect = lambda version_id, name: {
+            "url": f"https://stax/{version_id}/{name}"
+        }
+
+        # test
+        assert stax_orchestrator.read_catalogue_templates("v1") == ["ssm-template", "dynamo-template"]
+        assert stax_orchestrator.read_catalogue_templates("v2") is None
+
+        stax_orchestrator.workload_client.ReadCatalogueManifest.assert_any_call(version_id="v1")
+        assert read_object_mock.call_args_list[:3] == [
+            mocker.call("https://stax/manifest"),
+            mocker.call("https://stax/v1/WorkloadSSM"),
+            mocker.call("https://stax/v1/WorkloadDynamo"),
+        ]
+
+    def test_get_catalogue_template_parameters(self, mocker):
+        # mock
+        read_templates_mock = mocker.patch.object(
+            StaxOrchestrator,
+            "read_catalogue_templates",
+            side_effect=lambda version_id: {
+                "v1": ["Parameters:\n  TableName:\n    Type: String"],
+                "v2": ["Parameters:\n  TableName:\n    Type: String", '{"Parameters": {"Mode": {"Type": "String"}}}'],
+            }.get(version_id),
+        )
+        stax_orchestrator = StaxOrchestrator()
+        stax_orchestrator._workload_client = mocker.Mock()
+        stax_orchestrator.workload_client.ReadCatalogueItems.return_value = {
+            "WorkloadCatalogues": [
+                {
+                    "WorkloadCatalogueItems": [
+                        {
+                            "Id": self.catalogue_id,
+                            "Name": "dynamo",
+                            "CatalogueVersionId": "v2",
+                            "Versions": [
+                                {"Id": "v1", "WorkloadVersion": "version-1", "Status": "ACTIVE"},
+                                {"Id": "v2", "WorkloadVersion": "version-2", "Status": "ACTIVE"},
+                                {"Id": "v3", "WorkloadVersion": "version-3", "Status": "ACTIVE"},
+                            ],
+                        }
+                    ]
+                }
+            ]
+        }
+
+        # test
+        for _ in range(2):
+            assert stax_orchestrator.get_catalogue_template_parameters(self.catalogue_id) == {
+                "TableName": {"Type": "String"},
+                "Mode": {"Type": "String"},
+            }
+            assert stax_orchestrator.get_catalogue_template_parameters(self.catalogue_id, "v1") == {
+                "TableName": {"Type": "String"}
+            }
+            assert stax_orchestrator.get_catalogue_template_parameters(self.catalogue_id, "v3") is None
+
+        assert read_templates_mock.call_args_list == [mocker.call("v2"), mocker.call("v1"), mocker.call("v3")]
+        stax_orchestrator.workload_client.ReadCatalogueItems.assert_called_once_with()
+
+    def test_get_catalogue_template_parameters_unknown_version(self, mocker):
+        # mock
+        stax_orchestrator = StaxOrchestrator()
+        stax_orchestrator._workload_client = mocker.Mock()
+        stax_orchestrator.workload_client.ReadCatalogueItems.side_effect = [
+            {
+                "WorkloadCatalogues": [
+                    {"WorkloadCatalogueItems": [{"Id": self.catalogue_id, "Name": "dynamo", "Versions": []}]}
+                ]
+            },
+            {
+                "WorkloadCatalogues": [
+                    {
+                        "WorkloadCatalogueItems": [
+                            {"Id": self.catalogue_id, "Name": "dynamo", "CatalogueVersionId": "v1", "Versions": []}
+                        ]
+                    }
+                ]
+            },
+            {},
+        ]
+        mocker.patch.object(StaxOrchestrator, "read_catalogue_templates", return_value=None)
+
+        # test
+        assert stax_orchestrator.get_catalogue_template_parameters(self.catalogue_id) is None
+
+        with pytest.raises(CatalogueNotFoundException):
+            stax_orchestrator.get_catalogue_template_parameters(self.catalogue_id, "v3")
+
+        assert stax_orchestrator.workload_client.ReadCatalogueItems.call_count == 3
+
+    def test_validate_workload_parameters(self, mocker):
+        # mock
+        get_template_parameters_mock = mocker.patch.object(
+            StaxOrchestrator,
+            "get_catalogue_template_parameters",
+            side_effect=[{"TableName": {"Type": "String"}}, {"TableName": {"Type": "String"}}, None],
+        )
+        stax_orchestrator = StaxOrchestrator()
+
+        # test
+        stax_orchestrator.validate_workload_parameters(self.catalogue_id, {"TableName": "orders"}, "v1")
+        with pytest.raises(WorkloadParametersInvalidException):
+            stax_orchestrator.validate_workload_parameters(self.catalogue_id, {"TableNames": "orders"})
+        stax_orchestrator.validate_workload_parameters(self.catalogue_id, {"Anything": "goes"})
+
+        get_template_parameters_mock.assert_any_call(self.catalogue_id, "v1")
 
     def test_create_workload(self, mocker):
         # mock
@@ -97,6 +389,220 @@ class TestStaxOrchestrator:
         stax_orchestrator.workload_client.CreateWorkload.assert_called_once_with(**workload_params)
         get_parameters_list_mock.assert_called_once_with(self.workload_parameters)
 
+    def test_get_deployment_targets_matrix(self):
+        # data
+        event = {"targets": {"aws_account_ids": ["account-1", "account-2"], "aws_regions": ["region-1", "region-2"]}}
+
+        # test
+        assert StaxOrchestrator().get_deployment_targets(event) == [
+            StaxOrchestrator.DeploymentTarget("account-1", "region-1"),
+            StaxOrchestrator.DeploymentTarget("account-2", "region-2"),
+            StaxOrchestrator.DeploymentTarget("account-1", "region-2"),
+            StaxOrchestrator.DeploymentTarget("account-2", "region-1"),
+        ]
+
+    def test_get_deployment_targets_list(self):
+        # data
+        event = {
+            "targets": [
+                {"aws_account_id": "account-1", "aws_region": "region-1"},
+                {"aws_account_id": "account-1", "aws_region": "region-1"},
+                {"aws_account_id": "account-1", "aws_region": "region-2"},
+                {"aws_account_id": "account-2", "aws_region": "region-1"},
+            ]
+        }
+
+        # test
+        assert StaxOrchestrator().get_deployment_targets(event) == [
+            StaxOrchestrator.DeploymentTarget("account-1", "region-1"),
+            StaxOrchestrator.DeploymentTarget("account-2", "region-1"),
+            StaxOrchestrator.DeploymentTarget("account-1", "region-2"),
+        ]
+
+    def test_get_fan_out_workload_name(self):
+        target = StaxOrchestrator.DeploymentTarget("a97d2482-7c0e-4807-96ee-b7acbaf4c49b", "ap-southeast-2")
+
+        # test
+        assert (
+            StaxOrchestrator().get_fan_out_workload_name("vpc", target)
+            == "vpc-ap-southeast-2-a97d2482-7c0e-4807-96ee-b7acbaf4c49b"
+        )
+        assert len(StaxOrchestrator().get_fan_out_workload_name("w" * 64, target)) == 64
+        assert (
+            StaxOrchestrator()
+            .get_fan_out_workload_name("w" * 64, target)
+            .endswith("-ap-southeast-2-a97d2482-7c0e-4807-96ee-b7acbaf4c49b")
+        )
+        assert StaxOrchestrator().get_fan_out_workload_name("w" * 64, target) != (
+            StaxOrchestrator().get_fan_out_workload_name("w" * 63, target)
+        )
+
+    def test_get_fan_out_waves(self):
+        # data
+        workload_kwargs = [
+            {"aws_account_id": aws_account_id, "aws_region": aws_region}
+            for aws_account_id in ("account-1", "account-2")
+            for aws_region in ("region-1", "region-2", "region-3")
+        ]
+
+        # test
+        assert StaxOrchestrator().get_fan_out_waves(workload_kwargs) == [workload_kwargs]
+        assert StaxOrchestrator().get_fan_out_waves([]) == []
+        assert StaxOrchestrator().get_fan_out_waves(workload_kwargs, max_per_account=2, max_per_region=1) == [
+            [workload_kwargs[0], workload_kwargs[1], workload_kwargs[5]],
+            [workload_kwargs[2], workload_kwargs[3], workload_kwargs[4]],
+        ]
+
+    def test_get_fan_out_workload_kwargs(self, mocker):
+        # mock
+        mocker.patch.object(StaxOrchestrator, "get_fan_out_workload_name", side_effect=lambda name, target: name)
+
+        # data
+        event = {
+            "catalogue_id": self.catalogue_id,
+            "workload_name": self.workload_name,
+            "workload_parameters": self.workload_parameters,
+            "targets": [{"aws_account_id": self.aws_account_id, "aws_region": self.aws_region}],
+        }
+
+        # test
+        assert StaxOrchestrator().get_fan_out_workload_kwargs(event) == [
+            {
+                "aws_account_id": self.aws_account_id,
+                "aws_region": self.aws_region,
+                "catalogue_id": self.catalogue_id,
+                "workload_name": self.workload_name,
+                "workload_parameters": self.workload_parameters,
+            }
+        ]
+
+    def test_create_workloads(self, mocker):
+        # mock
+        mocker.patch.object(
+            StaxOrchestrator,
+            "get_fan_out_workload_kwargs",
+            return_value=[
+                {"workload_name": "w-1", "aws_account_id": "account-1", "aws_region": "region-1"},
+                {"workload_name": "w-2", "aws_account_id": "account-2", "aws_region": "region-1"},
+                {"workload_name": "w-3", "aws_account_id": "account-3", "aws_region": "region-1"},
+            ],
+        )
+        mocker.patch.object(
+            StaxOrchestrator, "get_workloads", return_value={"Workloads": [{"Name": "w-3", "Status": "ACTIVE"}]}
+        )
+
+        def create_workload(workload_name, **_):
+            if workload_name == "w-2":
+                raise Exception("some-error")
+            return {"Detail": {"Workload": {"WorkloadId": "workload-1", "TaskId": "task-1"}}}
+
+        create_workload_mock = mocker.patch.object(StaxOrchestrator, "create_workload", side_effect=create_workload)
+        wait_for_tasks_mock = mocker.patch.object(
+            StaxOrchestrator, "wait_for_tasks", return_value={"task-1": {"Status": "SUCCEEDED"}}
+        )
+
+        # test
+        assert StaxOrchestrator().create_workloads(
+            {}, max_per_account=1, max_per_region=2, requests_per_second=None, wait_for_completion=True
+        ) == {
+            "Created": [
+                {
+                    "workload_name": "w-1",
+                    "aws_account_id": "account-1",
+                    "aws_region": "region-1",
+                    "WorkloadId": "workload-1",
+                    "TaskId": "task-1",
+                    "TaskStatus": "SUCCEEDED",
+                }
+            ],
+            "Skipped": [{"workload_name": "w-3", "aws_account_id": "account-3", "aws_region": "region-1"}],
+            "Failed": [
+                {
+                    "workload_name": "w-2",
+                    "aws_account_id": "account-2",
+                    "aws_region": "region-1",
+                    "Error": "some-error",
+                }
+            ],
+            "TaskIds": ["task-1"],
+        }
+        assert create_workload_mock.call_count == 2
+        wait_for_tasks_mock.assert_called_once_with(["task-1"], poll_interval=10)
+
+    def test_create_workloads_claims_names(self, mocker):
+        # data
+        workload_kwargs = [
+            {"workload_name": f"w-{number}", "aws_account_id": f"account-{number}", "aws_region": "region-1"}
+            for number in range(1, 4)
+        ]
+
+        # mock
+        reservations = NameReservations("workload-names", LocalConditionalTable())
+        reservations.reserve("w-3", "workload-3")
+        mocker.patch("src.stax_orchestrator.workload_name_reservations", reservations)
+        mocker.patch.object(StaxOrchestrator, "get_fan_out_workload_kwargs", return_value=workload_kwargs)
+        get_workloads_mock = mocker.patch.object(StaxOrchestrator, "get_workloads")
+
+        def create_workload(workload_name, **_):
+            if workload_name == "w-2":
+                raise Exception("some-error")
+            return {"Detail": {"Workload": {"WorkloadId": "workload-1", "TaskId": "task-1"}}}
+
+        create_workload_mock = mocker.patch.object(StaxOrchestrator, "create_workload", side_effect=create_workload)
+
+        # test
+        assert StaxOrchestrator().create_workloads({}, requests_per_second=None) == {
+            "Created": [
+                {
+                    "workload_name": "w-1",
+                    "aws_account_id": "account-1",
+                    "aws_region": "region-1",
+                    "WorkloadId": "workload-1",
+                    "TaskId": "task-1",
+                }
+            ],
+            "Skipped": [{"workload_name": "w-3", "aws_account_id": "account-3", "aws_region": "region-1"}],
+            "Failed": [
+                {
+                    "workload_name": "w-2",
+                    "aws_account_id": "account-2",
+                    "aws_region": "region-1",
+                    "Error": "some-error",
+                }
+            ],
+            "TaskIds": ["task-1"],
+        }
+
+        get_workloads_mock.assert_not_called()
+        assert create_workload_mock.call_count == 2
+        assert reservations.reserve("w-2", "workload-2")
+        assert not reservations.reserve("w-1", "some-other-workload-id")
+
+    def test_create_workloads_concurrent_rollouts_create_once(self, mocker):
+        # mock
+        mocker.patch(
+            "src.stax_orchestrator.workload_name_reservations", NameReservations("n", LocalConditionalTable())
+        )
+        mocker.patch.object(
+            StaxOrchestrator,
+            "get_fan_out_workload_kwargs",
+            return_value=[
+                {"workload_name": f"w-{number}", "aws_account_id": f"account-{number}", "aws_region": "region-1"}
+                for number in range(10)
+            ],
+        )
+        create_workload_mock = mocker.patch.object(StaxOrchestrator, "create_workload", return_value={})
+
+        # test
+        results = run_concurrently(
+            lambda _: StaxOrchestrator().create_workloads({}, requests_per_second=None), range(4), max_workers=4
+        )
+
+        assert sum(len(result.result["Created"]) for result in results) == 10
+        assert sum(len(result.result["Skipped"]) for result in results) == 30
+        assert all(result.result["Failed"] == [] for result in results)
+        assert create_workload_mock.call_count == 10
+
     def test_get_parameters_list(self):
         stax_orchestrator = StaxOrchestrator()
 
@@ -153,6 +659,651 @@ class TestStaxOrchestrator:
         # test
         assert stax_orchestrator.workload_with_name_already_exists("non-existent-workload") == False
 
+    def test_create_unique_workload_checks_workloads(self, mocker):
+        # mock
+        mocker.patch.object(StaxOrchestrator, "workload_with_name_already_exists", side_effect=[True, False])
+        create_workload_mock = mocker.patch.object(StaxOrchestrator, "create_workload")
+        stax_orchestrator = StaxOrchestrator()
+
+        # test
+        with pytest.raises(StaxOrchestrator.WorkloadWithNameAlreadyExistsException):
+            stax_orchestrator.create_unique_workload(self.workload_name, catalogue_id=self.catalogue_id)
+
+        assert (
+            stax_orchestrator.create_unique_workload(self.workload_name, catalogue_id=self.catalogue_id)
+            == create_workload_mock.return_value
+        )
+        create_workload_mock.assert_called_once_with(self.workload_name, catalogue_id=self.catalogue_id)
+
+    def test_create_unique_workload_checks_existing_names(self, mocker):
+        # mock
+        exists_mock = mocker.patch.object(StaxOrchestrator, "workload_with_name_already_exists")
+        create_workload_mock = mocker.patch.object(StaxOrchestrator, "create_workload")
+        stax_orchestrator = StaxOrchestrator()
+
+        # test
+        with pytest.raises(StaxOrchestrator.WorkloadWithNameAlreadyExistsException):
+            stax_orchestrator.create_unique_workload(self.workload_name, existing_names={self.workload_name})
+
+        stax_orchestrator.create_unique_workload(
+            self.workload_name, existing_names=set(), catalogue_id=self.catalogue_id
+        )
+
+        exists_mock.assert_not_called()
+        create_workload_mock.assert_called_once_with(self.workload_name, catalogue_id=self.catalogue_id)
+
+    def test_create_unique_workload_claims_name(self, mocker):
+        # mock
+        reservations = NameReservations("workload-names", LocalConditionalTable())
+        mocker.patch("src.stax_orchestrator.workload_name_reservations", reservations)
+        exists_mock = mocker.patch.object(StaxOrchestrator, "workload_with_name_already_exists")
+        mocker.patch.object(
+            StaxOrchestrator,
+            "create_workload",
+            side_effect=[Exception("some-error"), {"Detail": {"Workload": {"WorkloadId": self.workload_id}}}],
+        )
+        stax_orchestrator = StaxOrchestrator()
+
+        # test
+        with pytest.raises(Exception, match="some-error"):
+            stax_orchestrator.create_unique_workload(self.workload_name)
+
+        stax_orchestrator.create_unique_workload(self.workload_name)
+
+        with pytest.raises(StaxOrchestrator.WorkloadWithNameAlreadyExistsException):
+            stax_orchestrator.create_unique_workload(self.workload_name)
+
+        exists_mock.assert_not_called()
+        item = reservations.client.get_item(
+            TableName="workload-names", Key={"workload_name": {"S": self.workload_name}}
+        )
+        assert item["Item"]["status"] == {"S": "ACTIVE"}
+        assert item["Item"]["workload_id"] == {"S": self.workload_id}
+
+    def test_create_unique_workload_concurrent_creates(self, mocker):
+        # mock
+        mocker.patch(
+            "src.stax_orchestrator.workload_name_reservations",
+            NameReservations("workload-names", LocalConditionalTable()),
+        )
+        create_workload_mock = mocker.patch.object(StaxOrchestrator, "create_workload", return_value={})
+        stax_orchestrator = StaxOrchestrator()
+
+        # test
+        results = run_concurrently(stax_orchestrator.create_unique_workload, [self.workload_name] * 20, max_workers=20)
+
+        assert [result.error for result in results if result.error is None] == [None]
+        assert all(
+            isinstance(result.error, StaxOrchestrator.WorkloadWithNameAlreadyExistsException)
+            for result in results
+            if result.error is not None
+        )
+        create_workload_mock.assert_called_once()
+
+    def test_create_unique_workload_without_workload_id(self, mocker):
+        # mock
+        reservations = NameReservations("workload-names", LocalConditionalTable())
+        mocker.patch("src.stax_orchestrator.workload_name_reservations", reservations)
+        mocker.patch.object(StaxOrchestrator, "create_workload", return_value={"Detail": {"Workload": {}}})
+
+        # test
+        assert StaxOrchestrator().create_unique_workload(self.workload_name) == {"Detail": {"Workload": {}}}
+
+        item = reservations.client.get_item(
+            TableName="workload-names", Key={"workload_name": {"S": self.workload_name}}
+        )
+        assert item["Item"]["status"] == {"S": "PENDING"}
+
+    def test_create_unique_workload_expired_claim(self, mocker):
+        # mock
+        reservations = NameReservations("workload-names", LocalConditionalTable())
+        mocker.patch("src.stax_orchestrator.workload_name_reservations", reservations)
+
+        def expire_claim(name, token, _):
+            reservations.release(name, token=token)
+            raise NameAlreadyReservedException(f"Claim of name {name} expired")
+
+        mocker.patch.object(reservations, "confirm", side_effect=expire_claim)
+        mocker.patch.object(
+            StaxOrchestrator,
+            "create_workload",
+            return_value={"Detail": {"Workload": {"WorkloadId": self.workload_id}}},
+        )
+
+        # test
+        response = StaxOrchestrator().create_unique_workload(self.workload_name)
+
+        assert response == {"Detail": {"Workload": {"WorkloadId": self.workload_id}}}
+        assert reservations.get_workload_id(self.workload_name) == self.workload_id
+
+    def test_create_unique_workload_expired_claim_claimed_again(self, mocker, caplog):
+        # mock
+        reservations = NameReservations("workload-names", LocalConditionalTable())
+        mocker.patch("src.stax_orchestrator.workload_name_reservations", reservations)
+        mocker.patch.object(reservations, "confirm", side_effect=NameAlreadyReservedException("some-error"))
+        mocker.patch.object(reservations, "reserve", return_value=False)
+        mocker.patch.object(
+            StaxOrchestrator,
+            "create_workload",
+            return_value={"Detail": {"Workload": {"WorkloadId": self.workload_id}}},
+        )
+
+        # test
+        StaxOrchestrator().create_unique_workload(self.workload_name)
+
+        assert "is not protected by its name" in caplog.text
+
+    def test_create_unique_workload_confirm_error(self, mocker, caplog):
+        # mock
+        reservations = NameReservations("workload-names", LocalConditionalTable())
+        mocker.patch("src.stax_orchestrator.workload_name_reservations", reservations)
+        mocker.patch.object(reservations, "confirm", side_effect=Exception("some-error"))
+        mocker.patch.object(
+            StaxOrchestrator,
+            "create_workload",
+            return_value={"Detail": {"Workload": {"WorkloadId": self.workload_id}}},
+        )
+
+        # test
+        response = StaxOrchestrator().create_unique_workload(self.workload_name)
+
+        assert response == {"Detail": {"Workload": {"WorkloadId": self.workload_id}}}
+        assert "Failed to confirm the claim" in caplog.text
+
+    def test_create_unique_workload_takes_over_name_of_deleted_workload(self, mocker):
+        # mock
+        reservations = NameReservations("workload-names", LocalConditionalTable())
+        reservations.reserve(self.workload_name, "deleted-workload-id")
+        reservations.reserve("existing-workload", "existing-workload-id")
+        mocker.patch("src.stax_orchestrator.workload_name_reservations", reservations)
+        mocker.patch.object(
+            StaxOrchestrator,
+            "get_workload",
+            side_effect=lambda workload_id: {
+                "Status": "DELETED" if workload_id == "deleted-workload-id" else "ACTIVE"
+            },
+        )
+        mocker.patch.object(
+            StaxOrchestrator,
+            "create_workload",
+            return_value={"Detail": {"Workload": {"WorkloadId": self.workload_id}}},
+        )
+        stax_orchestrator = StaxOrchestrator()
+
+        # test
+        stax_orchestrator.create_unique_workload(self.workload_name)
+
+        with pytest.raises(StaxOrchestrator.WorkloadWithNameAlreadyExistsException):
+            stax_orchestrator.create_unique_workload("existing-workload")
+
+        assert reservations.get_workload_id(self.workload_name) == self.workload_id
+
+    def test_claim_workload_name_claimed_again(self, mocker):
+        # mock
+        reservations = mocker.Mock()
+        reservations.claim.side_effect = NameAlreadyReservedException("some-error")
+        reservations.get_workload_id.return_value = "deleted-workload-id"
+        mocker.patch("src.stax_orchestrator.workload_name_reservations", reservations)
+        mocker.patch.object(StaxOrchestrator, "get_workload", return_value={"Status": "DELETED"})
+
+        # test
+        with pytest.raises(StaxOrchestrator.WorkloadWithNameAlreadyExistsException):
+            StaxOrchestrator().claim_workload_name(self.workload_name)
+
+        reservations.release.assert_called_once_with(self.workload_name, workload_id="deleted-workload-id")
+
+    def test_delete_workload_keeps_name(self, mocker):
+        # mock
+        reservations = NameReservations("workload-names", LocalConditionalTable())
+        reservations.reserve(self.workload_name, self.workload_id)
+        mocker.patch("src.stax_orchestrator.workload_name_reservations", reservations)
+        stax_orchestrator = StaxOrchestrator()
+
+        # test
+        assert (
+            stax_orchestrator.delete_workload(self.workload_id)
+            == stax_orchestrator.workload_client.DeleteWorkload.return_value
+        )
+        assert reservations.get_workload_id(self.workload_name) == self.workload_id
+
+    def test_release_workload_name(self, mocker):
+        # mock
+        reservations = NameReservations("workload-names", LocalConditionalTable())
+        reservations.reserve(self.workload_name, self.workload_id)
+        mocker.patch.object(StaxOrchestrator, "get_workload", return_value={"Name": self.workload_name})
+        stax_orchestrator = StaxOrchestrator()
+
+        # test
+        assert not stax_orchestrator.release_workload_name(self.workload_id)
+
+        mocker.patch("src.stax_orchestrator.workload_name_reservations", reservations)
+
+        assert stax_orchestrator.release_workload_name(self.workload_id)
+        assert reservations.reserve(self.workload_name, "some-other-workload-id")
+
+    def test_reserve_existing_workload_names(self, mocker):
+        # mock
+        reservations = NameReservations("workload-names", LocalConditionalTable())
+        reservations.reserve("reserved-workload", "1")
+        mocker.patch("src.stax_orchestrator.workload_name_reservations", reservations)
+        mocker.patch.object(
+            StaxOrchestrator,
+            "get_workloads",
+            return_value={
+                "Workloads": [
+                    {"Id": "1", "Name": "reserved-workload", "Status": "ACTIVE"},
+                    {"Id": "2", "Name": "new-workload", "Status": "ACTIVE"},
+                    {"Id": "3", "Name": "deleted-workload", "Status": "DELETED"},
+                ]
+            },
+        )
+
+        # test
+        assert StaxOrchestrator().reserve_existing_workload_names() == {
+            "Reserved": ["new-workload"],
+            "AlreadyReserved": ["reserved-workload"],
+        }
+
+    def test_reserve_existing_workload_names_disabled(self):
+        # test
+        with pytest.raises(ValueError, match="WORKLOAD_NAME_TABLE"):
+            StaxOrchestrator().reserve_existing_workload_names()
+
+    def test_query_workloads(self, get_stax_client_mock, mocker):
+        # mock
+        def read_workloads(workload_id=None, include_tags=False):
+            if workload_id is None:
+                return {
+                    "Workloads": [
+                        {"Id": "1", "Status": "ACTIVE", "Region": "us-east-1"},
+                        {"Id": "2", "Status": "ACTIVE", "Region": "ap-southeast-2"},
+                        {"Id": "3", "Status": "DELETED", "Region": "us-east-1"},
+                    ]
+                }
+            assert include_tags
+            return {
+                "Workloads": [{"Id": workload_id, "Tags": {"owner": "platform" if workload_id != "2" else "data"}}]
+            }
+
+        read_workloads_mock = mocker.patch.object(
+            get_stax_client_mock.return_value, "ReadWorkloads", side_effect=read_workloads
+        )
+        stax_orchestrator = StaxOrchestrator()
+
+        # test
+        assert [
+            workload["Id"] for workload in stax_orchestrator.query_workloads(aws_region="us-east-1", status=None)
+        ] == [
+            "1",
+            "3",
+        ]
+        read_workloads_mock.assert_called_once_with()
+
+        assert stax_orchestrator.query_workloads(tags={"owner": "platform"}, aws_region="us-east-1") == [
+            {"Id": "1", "Status": "ACTIVE", "Region": "us-east-1", "Tags": {"owner": "platform"}}
+        ]
+        assert stax_orchestrator.query_workloads(any_tags={"owner": ["platform", "data"]}) == [
+            {"Id": "1", "Status": "ACTIVE", "Region": "us-east-1", "Tags": {"owner": "platform"}},
+            {"Id": "2", "Status": "ACTIVE", "Region": "ap-southeast-2", "Tags": {"owner": "data"}},
+        ]
+        assert [call.kwargs.get("workload_id") for call in read_workloads_mock.call_args_list] == [None, "1", "2"]
+
+    def test_workload_index_keeps_tags_across_rebuilds(self, get_stax_client_mock, mocker):
+        # mock
+        def read_workloads(workload_id=None, include_tags=False):
+            if workload_id is None:
+                return {"Workloads": [{"Id": "1", "Status": "ACTIVE"}]}
+            return {"Workloads": [{"Id": workload_id, "Tags": {"owner": "platform"}}]}
+
+        read_workloads_mock = mocker.patch.object(
+            get_stax_client_mock.return_value, "ReadWorkloads", side_effect=read_workloads
+        )
+        stax_orchestrator = StaxOrchestrator()
+
+        # test
+        assert stax_orchestrator.query_workloads(tags={"owner": "platform"})[0]["Id"] == "1"
+
+        workload_index_cache.invalidate()
+
+        assert stax_orchestrator.query_workloads(tags={"owner": "platform"})[0]["Id"] == "1"
+        assert [call.kwargs.get("workload_id") for call in read_workloads_mock.call_args_list] == [None, "1", None]
+
+    def test_workload_index_is_updated_by_creates_and_deletes(self, mocker):
+        # mock
+        mocker.patch.object(
+            StaxOrchestrator,
+            "get_workloads",
+            return_value={"Workloads": [{"Id": "1", "Status": "ACTIVE", "Tags": {"owner": "platform"}}]},
+        )
+        stax_orchestrator = StaxOrchestrator()
+        mocker.patch.object(
+            stax_orchestrator.workload_client,
+            "CreateWorkload",
+            return_value={"Detail": {"Workload": {"WorkloadId": "2"}}},
+        )
+
+        # test
+        assert stax_orchestrator.query_workloads(tags={"owner": "platform"})[0]["Id"] == "1"
+
+        stax_orchestrator.create_workload(
+            self.workload_name,
+            self.catalogue_id,
+            self.aws_region,
+            self.aws_account_id,
+            workload_tags={"owner": "platform"},
+        )
+        stax_orchestrator.delete_workload("1")
+
+        assert stax_orchestrator.query_workloads(tags={"owner": "platform"}) == []
+        assert stax_orchestrator.query_workloads(tags={"owner": "platform"}, status=None) == [
+            {
+                "Id": "2",
+                "Name": self.workload_name,
+                "CatalogueId": self.catalogue_id,
+                "AccountId": self.aws_account_id,
+                "Region": self.aws_region,
+                "Status": "CREATE_IN_PROGRESS",
+                "Tags": {"owner": "platform"},
+            }
+        ]
+
+    def test_get_workloads_include_tags(self, get_stax_client_mock, mocker):
+        # mock
+        def read_workloads(workload_id=None, include_tags=False):
+            if workload_id is None:
+                return {
+                    "Workloads": [
+                        {"Id": "1", "Status": "ACTIVE"},
+                        {"Id": "2", "Status": "ACTIVE"},
+                        {"Id": "3", "Status": "DELETED"},
+                    ]
+                }
+            assert include_tags
+            return {"Workloads": [{"Id": workload_id, "Tags": {"owner": "platform"} if workload_id == "1" else None}]}
+
+        read_workloads_mock = mocker.patch.object(
+            get_stax_client_mock.return_value, "ReadWorkloads", side_effect=read_workloads
+        )
+
+        # test
+        assert StaxOrchestrator().get_workloads(include_tags=True) == {
+            "Workloads": [
+                {"Id": "1", "Status": "ACTIVE", "Tags": {"owner": "platform"}},
+                {"Id": "2", "Status": "ACTIVE", "Tags": {}},
+                {"Id": "3", "Status": "DELETED"},
+            ]
+        }
+        assert sorted(call.kwargs.get("workload_id", "") for call in read_workloads_mock.call_args_list) == [
+            "",
+            "1",
+            "2",
+        ]
+
+    def test_add_workload_tags_raises_read_errors(self, get_stax_client_mock, mocker):
+        # mock
+        mocker.patch.object(get_stax_client_mock.return_value, "ReadWorkloads", side_effect=Exception("some-error"))
+
+        # test
+        with pytest.raises(Exception, match="some-error"):
+            StaxOrchestrator().add_workload_tags([{"Id": "1"}])
+
+    def test_only_single_workload_reads_accept_include_tags(self):
+        # data
+        with open(f"{os.path.dirname(staxapp.__file__)}/data/schema.json", encoding="utf-8") as file:
+            paths = json.load(file)["paths"]
+
+        def parameters(path: str) -> list:
+            return [parameter["name"] for parameter in paths[path]["get"]["parameters"]]
+
+        # test
+        assert "include_tags" not in parameters("/20190206/workloads")
+        assert "include_tags" in parameters("/20190206/workloads/{workload_id}")
+
+    def test_get_workload(self):
+        stax_orchestrator = StaxOrchestrator()
+        stax_orchestrator.workload_client.ReadWorkloads.return_value = {"Workloads": [{"Id": self.workload_id}]}
+
+        # test
+        assert stax_orchestrator.get_workload(self.workload_id) == {"Id": self.workload_id}
+        stax_orchestrator.workload_client.ReadWorkloads.assert_called_with(workload_id=self.workload_id)
+
+    def test_workload_selector_matches(self):
+        workload = {
+            "Name": "ephemeral-pr-12",
+            "AccountId": self.aws_account_id,
+            "CatalogueId": self.catalogue_id,
+            "Status": "ACTIVE",
+            "Tags": {"environment": "ephemeral", "owner": "team-a"},
+        }
+
+        # test
+        assert StaxOrchestrator.WorkloadSelector().matches(workload)
+        assert StaxOrchestrator.WorkloadSelector(
+            name_prefix="ephemeral-",
+            workload_tags={"environment": "ephemeral"},
+            aws_account_id=self.aws_account_id,
+            catalogue_id=self.catalogue_id,
+        ).matches(workload)
+        assert not StaxOrchestrator.WorkloadSelector(name_prefix="prod-").matches(workload)
+        assert not StaxOrchestrator.WorkloadSelector(aws_account_id="other-account").matches(workload)
+        assert not StaxOrchestrator.WorkloadSelector(catalogue_id="other-catalogue").matches(workload)
+        assert not StaxOrchestrator.WorkloadSelector(status="DELETED").matches(workload)
+        assert not StaxOrchestrator.WorkloadSelector(workload_tags={"owner": "team-b"}).matches(workload)
+
+    def test_select_workloads(self, mocker):
+        # mock
+        get_workloads_mock = mocker.patch.object(StaxOrchestrator, "get_workloads")
+        get_workloads_mock.return_value = {
+            "Workloads": [
+                {"Id": "1", "Name": "ephemeral-1", "Status": "ACTIVE"},
+                {"Id": "2", "Name": "ephemeral-2", "Status": "ACTIVE"},
+                {"Id": "3", "Name": "prod-1", "Status": "ACTIVE"},
+            ]
+        }
+        tags = {"1": {"environment": "ephemeral"}, "2": {"environment": "prod"}}
+
+        def add_workload_tags(workloads):
+            for workload in workloads:
+                workload["Tags"] = tags[workload["Id"]]
+
+        add_workload_tags_mock = mocker.patch.object(
+            StaxOrchestrator, "add_workload_tags", side_effect=add_workload_tags
+        )
+
+        # test
+        selected = StaxOrchestrator().select_workloads(
+            StaxOrchestrator.WorkloadSelector(name_prefix="ephemeral-", workload_tags={"environment": "ephemeral"})
+        )
+
+        assert [workload["Id"] for workload in selected] == ["1"]
+        get_workloads_mock.assert_called_once_with()
+        assert [workload["Id"] for workload in add_workload_tags_mock.call_args.args[0]] == ["1", "2"]
+
+    def test_select_workloads_without_tags(self, mocker):
+        # mock
+        mocker.patch.object(
+            StaxOrchestrator, "get_workloads", return_value={"Workloads": [{"Id": "1", "Status": "ACTIVE"}]}
+        )
+        add_workload_tags_mock = mocker.patch.object(StaxOrchestrator, "add_workload_tags")
+
+        # test
+        assert StaxOrchestrator().select_workloads(StaxOrchestrator.WorkloadSelector()) == [
+            {"Id": "1", "Status": "ACTIVE"}
+        ]
+        add_workload_tags_mock.assert_not_called()
+
+    def test_delete_workloads_dry_run(self, mocker):
+        # mock
+        mocker.patch.object(StaxOrchestrator, "select_workloads", return_value=[{"Id": "1", "Name": "ephemeral-1"}])
+        delete_workload_mock = mocker.patch.object(StaxOrchestrator, "delete_workload")
+
+        # test
+        assert StaxOrchestrator().delete_workloads(StaxOrchestrator.WorkloadSelector(), dry_run=True) == {
+            "DryRun": True,
+            "Workloads": [{"WorkloadId": "1", "Name": "ephemeral-1"}],
+        }
+        delete_workload_mock.assert_not_called()
+
+    def test_delete_workloads(self, mocker):
+        # mock
+        mocker.patch.object(
+            StaxOrchestrator,
+            "select_workloads",
+            return_value=[{"Id": "1", "Name": "ephemeral-1"}, {"Id": "2", "Name": "ephemeral-2"}],
+        )
+
+        def delete_workload(workload_id):
+            if workload_id == "2":
+                raise Exception("some-error")
+            return {"Detail": {"Workload": {"TaskId": "task-1"}}}
+
+        mocker.patch.object(StaxOrchestrator, "delete_workload", side_effect=delete_workload)
+
+        # test
+        assert StaxOrchestrator().delete_workloads(StaxOrchestrator.WorkloadSelector(), requests_per_second=None) == {
+            "DryRun": False,
+            "Workloads": [{"WorkloadId": "1", "Name": "ephemeral-1"}, {"WorkloadId": "2", "Name": "ephemeral-2"}],
+            "Deleted": [{"WorkloadId": "1", "Name": "ephemeral-1", "TaskId": "task-1"}],
+            "Failed": [{"WorkloadId": "2", "Name": "ephemeral-2", "Error": "some-error"}],
+            "TaskIds": ["task-1"],
+        }
+
+    def test_collect_catalogue_garbage_dry_run(self, get_stax_client_mock, mocker):
+        # mock
+        read_catalogue_items_mock = mocker.patch.object(
+            get_stax_client_mock.return_value, "ReadCatalogueItems", return_value=deepcopy(self.gc_catalogues)
+        )
+        delete_catalogue_version_mock = mocker.patch.object(
+            get_stax_client_mock.return_value, "DeleteCatalogueVersion"
+        )
+        mocker.patch.object(StaxOrchestrator, "get_catalogue_versions", return_value=self.gc_versions)
+        mocker.patch.object(StaxOrchestrator, "get_workloads", return_value={"Workloads": []})
+        list_objects_mock = mocker.patch("src.stax_orchestrator.list_objects", return_value=self.gc_manifests)
+
+        # test
+        report = StaxOrchestrator().collect_catalogue_garbage(self.bucket, keep_versions=1, dry_run=True)
+
+        assert report["DryRun"] is True
+        assert [version["CatalogueVersionId"] for version in report["CatalogueVersions"]] == ["v2", "v1"]
+        assert report["Manifests"] == [self.gc_manifests[0][0], self.gc_manifests[1][0]]
+        list_objects_mock.assert_called_once_with(f"s3://{self.bucket}")
+        read_catalogue_items_mock.assert_called_once_with()
+        delete_catalogue_version_mock.assert_not_called()
+
+    def test_collect_catalogue_garbage(self, get_stax_client_mock, mocker):
+        # mock
+        mocker.patch.object(
+            get_stax_client_mock.return_value, "ReadCatalogueItems", return_value=deepcopy(self.gc_catalogues)
+        )
+
+        def delete_catalogue_version(catalogue_id, version_id):
+            if version_id == "v2":
+                raise Exception("some-error")
+            return {"Detail": {}}
+
+        mocker.patch.object(
+            get_stax_client_mock.return_value, "DeleteCatalogueVersion", side_effect=delete_catalogue_version
+        )
+        mocker.patch.object(StaxOrchestrator, "get_catalogue_versions", return_value=self.gc_versions)
+        mocker.patch.object(StaxOrchestrator, "get_workloads", return_value={"Workloads": []})
+        mocker.patch("src.stax_orchestrator.list_objects", return_value=self.gc_manifests)
+        delete_objects_mock = mocker.patch("src.stax_orchestrator.delete_objects", return_value={})
+        invalidate_mock = mocker.patch("src.stax_orchestrator.catalogue_index_cache.invalidate")
+
+        # test
+        report = StaxOrchestrator().collect_catalogue_garbage(
+            self.bucket, keep_versions=1, max_workers=1, requests_per_second=None
+        )
+
+        # the manifest of v2 is kept because its version could not be deleted
+        assert [version["CatalogueVersionId"] for version in report["DeletedCatalogueVersions"]] == ["v1"]
+        assert report["DeletedManifests"] == [self.gc_manifests[0][0]]
+        assert [failure.get("CatalogueVersionId") for failure in report["Failed"]] == ["v2"]
+        assert report["Failed"][0]["Error"] == "some-error"
+        delete_objects_mock.assert_called_once_with(f"s3://{self.bucket}", [self.gc_manifests[0][0]])
+        invalidate_mock.assert_called_once()
+
+    def test_collect_catalogue_garbage_reports_failed_manifest_batches(self, get_stax_client_mock, mocker):
+        # mock
+        mocker.patch.object(
+            get_stax_client_mock.return_value, "ReadCatalogueItems", return_value={"WorkloadCatalogues": []}
+        )
+        mocker.patch.object(StaxOrchestrator, "get_workloads", return_value={"Workloads": []})
+        mocker.patch("src.stax_orchestrator.list_objects", return_value=self.gc_manifests)
+        mocker.patch(
+            "src.stax_orchestrator.delete_objects",
+            side_effect=[{self.gc_manifests[0][0]: "AccessDenied"}, Exception("some-error")],
+        )
+        mocker.patch("src.stax_orchestrator.batched", side_effect=lambda names: [names[:2], names[2:]])
+        invalidate_mock = mocker.patch("src.stax_orchestrator.catalogue_index_cache.invalidate")
+
+        # test
+        report = StaxOrchestrator().collect_catalogue_garbage(self.bucket, max_workers=1)
+
+        assert report["DeletedManifests"] == [self.gc_manifests[1][0]]
+        assert report["Failed"] == [
+            {"Manifest": self.gc_manifests[0][0], "Error": "AccessDenied"},
+            {"Manifest": self.gc_manifests[2][0], "Error": "some-error"},
+        ]
+        invalidate_mock.assert_not_called()
+
+    def test_collect_catalogue_garbage_requires_every_version(self, get_stax_client_mock, mocker):
+        # mock
+        mocker.patch.object(
+            get_stax_client_mock.return_value, "ReadCatalogueItems", return_value=deepcopy(self.gc_catalogues)
+        )
+        mocker.patch.object(StaxOrchestrator, "get_catalogue_versions", side_effect=Exception("some-error"))
+        list_objects_mock = mocker.patch("src.stax_orchestrator.list_objects")
+
+        # test
+        with pytest.raises(Exception, match="some-error"):
+            StaxOrchestrator().collect_catalogue_garbage(self.bucket)
+
+        list_objects_mock.assert_not_called()
+
+    def test_get_tasks_status(self, mocker):
+        # mock
+        def get_task_status(task_id):
+            if task_id == "task-2":
+                raise Exception("some-error")
+            return {"Status": "RUNNING"}
+
+        mocker.patch.object(StaxOrchestrator, "get_task_status", side_effect=get_task_status)
+
+        # test
+        assert StaxOrchestrator().get_tasks_status(["task-1", "task-2"]) == {
+            "task-1": {"Status": "RUNNING"},
+            "task-2": {"Error": "some-error"},
+        }
+
+    def test_wait_for_tasks(self, mocker):
+        # mock
+        sleep_mock = mocker.patch("src.stax_orchestrator.sleep")
+        mocker.patch.object(
+            StaxOrchestrator,
+            "get_tasks_status",
+            side_effect=[
+                {"task-1": {"Status": "SUCCEEDED"}, "task-2": {"Status": "RUNNING"}},
+                {"task-2": {"Status": "FAILED"}},
+            ],
+        )
+
+        # test
+        assert StaxOrchestrator().wait_for_tasks(["task-1", "task-2"], poll_interval=1) == {
+            "task-1": {"Status": "SUCCEEDED"},
+            "task-2": {"Status": "FAILED"},
+        }
+        sleep_mock.assert_called_once_with(1)
+
+    def test_wait_for_tasks_timeout(self, mocker):
+        # mock
+        mocker.patch("src.stax_orchestrator.sleep")
+        mocker.patch.object(StaxOrchestrator, "get_tasks_status", return_value={"task-1": {"Status": "RUNNING"}})
+
+        # test
+        with pytest.raises(StaxOrchestrator.TaskTrackingTimeoutException):
+            StaxOrchestrator().wait_for_tasks(["task-1"], poll_interval=10, timeout=5)
+
     def test_get_create_workload_kwargs(self):
         stax_orchestrator = StaxOrchestrator()
 
@@ -179,6 +1330,27 @@ class TestStaxOrchestrator:
         assert exec_result == expected_response
         assert "workload_id" not in exec_result
 
+    def test_get_create_workload_kwargs_by_catalogue_name(self, mocker):
+        # mock
+        mocker.patch.object(StaxOrchestrator, "resolve_catalogue", return_value={"catalogue_id": self.catalogue_id})
+        stax_orchestrator = StaxOrchestrator()
+
+        # data
+        event = {
+            "aws_account_id": self.aws_account_id,
+            "aws_region": self.aws_region,
+            "catalogue_name": self.catalogue_name,
+            "workload_name": self.workload_name,
+        }
+
+        # test
+        assert stax_orchestrator.get_create_workload_kwargs(event) == {
+            "aws_account_id": self.aws_account_id,
+            "aws_region": self.aws_region,
+            "catalogue_id": self.catalogue_id,
+            "workload_name": self.workload_name,
+        }
+
     def test_get_update_workload_kwargs(self):
         stax_orchestrator = StaxOrchestrator()
 
@@ -197,17 +1369,158 @@ class TestStaxOrchestrator:
         # test
         assert stax_orchestrator.get_delete_workload_kwargs(event_and_response) == event_and_response
 
+    def test_validate_workload_event_create(self, mocker):
+        # data
+        event: dict = {"operation": "create"}
+
+        # mock
+        get_create_workload_kwargs_mock = mocker.patch.object(StaxOrchestrator, "get_create_workload_kwargs")
+        create_workload_event_mock = mocker.patch.object(StaxOrchestrator, "CreateWorkloadEvent")
+
+        # test
+        assert StaxOrchestrator().validate_workload_event(event) == create_workload_event_mock.return_value.__dict__
+
+        get_create_workload_kwargs_mock.assert_called_once_with(event)
+        create_workload_event_mock.assert_called_once_with(**get_create_workload_kwargs_mock.return_value)
+
+    def test_validate_workload_event_update(self, mocker):
+        # data
+        event: dict = {"operation": "update"}
+
+        # mock
+        get_update_workload_kwargs_mock = mocker.patch.object(StaxOrchestrator, "get_update_workload_kwargs")
+        update_workload_event_mock = mocker.patch.object(StaxOrchestrator, "UpdateWorkloadEvent")
+
+        # test
+        assert StaxOrchestrator().validate_workload_event(event) == update_workload_event_mock.return_value.__dict__
+
+        get_update_workload_kwargs_mock.assert_called_once_with(event)
+        update_workload_event_mock.assert_called_once_with(**get_update_workload_kwargs_mock.return_value)
+
+    def test_validate_workload_event_delete(self, mocker):
+        # data
+        event: dict = {"operation": "delete"}
+
+        # mock
+        get_delete_workload_kwargs_mock = mocker.patch.object(StaxOrchestrator, "get_delete_workload_kwargs")
+        delete_workload_event_mock = mocker.patch.object(StaxOrchestrator, "DeleteWorkloadEvent")
+
+        # test
+        assert StaxOrchestrator().validate_workload_event(event) == delete_workload_event_mock.return_value.__dict__
+
+        get_delete_workload_kwargs_mock.assert_called_once_with(event)
+        delete_workload_event_mock.assert_called_once_with(**get_delete_workload_kwargs_mock.return_value)
+
+    def test_validate_workload_event_fan_out(self, mocker):
+        # data
+        event: dict = {"operation": "fan_out"}
+
+        # mock
+        get_fan_out_workload_kwargs_mock = mocker.patch.object(
+            StaxOrchestrator, "get_fan_out_workload_kwargs", return_value=[{"workload_name": "w-1"}]
+        )
+        create_workload_event_mock = mocker.patch.object(StaxOrchestrator, "CreateWorkloadEvent")
+
+        # test
+        assert StaxOrchestrator().validate_workload_event(event) == {
+            "workload_waves": [[create_workload_event_mock.return_value.__dict__]]
+        }
+
+        get_fan_out_workload_kwargs_mock.assert_called_once_with(event)
+        create_workload_event_mock.assert_called_once_with(workload_name="w-1")
+
+    def test_validate_workload_event_fan_out_waves(self, mocker):
+        # data
+        event: dict = {"operation": "fan_out", "max_per_account": "1"}
+        workload_kwargs = [
+            {"workload_name": "w-1", "aws_account_id": "account-1", "aws_region": "region-1"},
+            {"workload_name": "w-2", "aws_account_id": "account-1", "aws_region": "region-2"},
+            {"workload_name": "w-3", "aws_account_id": "account-2", "aws_region": "region-1"},
+        ]
+
+        # mock
+        mocker.patch.object(StaxOrchestrator, "get_fan_out_workload_kwargs", return_value=workload_kwargs)
+        mocker.patch.object(
+            StaxOrchestrator, "CreateWorkloadEvent", side_effect=lambda **kwargs: mocker.Mock(**kwargs)
+        )
+
+        # test
+        waves = StaxOrchestrator().validate_workload_event(event)["workload_waves"]
+        assert [[instance["workload_name"] for instance in wave] for wave in waves] == [["w-1", "w-3"], ["w-2"]]
+
+    def test_validate_workload_event_validates_parameters(self, mocker):
+        # data
+        event: dict = {"operation": "create"}
+        create_kwargs = {"catalogue_id": self.catalogue_id, "workload_parameters": self.workload_parameters}
+        fan_out_event: dict = {"operation": "fan_out"}
+
+        # mock
+        mocker.patch.dict("os.environ", {"VALIDATE_WORKLOAD_PARAMETERS": "true"})
+        mocker.patch.object(StaxOrchestrator, "get_create_workload_kwargs", return_value=create_kwargs)
+        mocker.patch.object(StaxOrchestrator, "get_fan_out_workload_kwargs", return_value=[create_kwargs] * 2)
+        mocker.patch.object(StaxOrchestrator, "CreateWorkloadEvent")
+        validate_mock = mocker.patch.object(StaxOrchestrator, "validate_workload_parameters")
+
+        # test
+        StaxOrchestrator().validate_workload_event(event)
+        StaxOrchestrator().validate_workload_event(fan_out_event)
+
+        assert validate_mock.call_args_list == [
+            mocker.call(self.catalogue_id, self.workload_parameters, None),
+            mocker.call(self.catalogue_id, self.workload_parameters, None),
+        ]
+
+    def test_validate_workload_event_unknown_catalogue_version(self, mocker):
+        # data
+        event: dict = {"operation": "create"}
+        create_kwargs = {"catalogue_id": self.catalogue_id, "catalogue_version_id": "v3"}
+
+        # mock
+        mocker.patch.dict("os.environ", {"VALIDATE_WORKLOAD_PARAMETERS": "true"})
+        mocker.patch.object(StaxOrchestrator, "get_create_workload_kwargs", return_value=create_kwargs)
+        stax_orchestrator = StaxOrchestrator()
+        stax_orchestrator._workload_client = mocker.Mock()
+        stax_orchestrator.workload_client.ReadCatalogueItems.return_value = {}
+
+        # test
+        with pytest.raises(ValueError, match="Version v3 of catalogue some-cat-id does not exist"):
+            stax_orchestrator.validate_workload_event(event)
+
+    def test_validate_workload_event_value_error(self):
+        # data
+        event: dict = {"operation": "unsupported-operation"}
+
+        # test
+        with pytest.raises(ValueError):
+            StaxOrchestrator().validate_workload_event(event)
+
 
 class TestStaxClient:
     def test_get_stax_client(self, mocker):
-        stax_client_mock = mocker.patch("src.stax_orchestrator.StaxClient")
-        parameters_mock = mocker.patch("src.stax_orchestrator.parameters")
+        stax_client_mock = mocker.patch("staxapp.openapi.StaxClient")
+        ssm_provider_mock = mocker.patch("aws_lambda_powertools.utilities.parameters.SSMProvider")
+        load_schema_snapshot_mock = mocker.patch("src.stax_orchestrator.load_schema_snapshot")
 
         # test
-        assert get_stax_client("workloads") == stax_client_mock.return_value
-        parameters_mock.SSMProvider.return_value.assert_has_calls(
+        stax_client = get_stax_client("workloads")
+
+        assert stax_client.ReadWorkloads() == stax_client_mock.return_value.ReadWorkloads.return_value
+        stax_client_mock.assert_called_once_with("workloads")
+        load_schema_snapshot_mock.assert_called_once_with()
+        assert "workloads.ReadWorkloads" in stax_circuit_breakers.states()
+        ssm_provider_mock.return_value.assert_has_calls(
             [
                 mocker.call.get("/orchestrator/stax/access/key", max_age=21600, decrypt=True),
                 mocker.call.get("/orchestrator/stax/access/key/secret", max_age=21600, decrypt=True),
             ]
         )
+
+    def test_get_stax_client_is_created_once_per_client_type(self, mocker):
+        stax_client_mock = mocker.patch("staxapp.openapi.StaxClient")
+        mocker.patch("aws_lambda_powertools.utilities.parameters.SSMProvider")
+        mocker.patch("src.stax_orchestrator.load_schema_snapshot")
+
+        # test
+        assert get_stax_client("workloads") is get_stax_client("workloads")
+        assert get_stax_client("tasks") is not get_stax_client("workloads")
+        assert stax_client_mock.call_args_list == [mocker.call("workloads"), mocker.call("tasks")]
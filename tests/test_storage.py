@@ -0,0 +1,121 @@
+from datetime import datetime, timezone
+
+import pytest
+from botocore.exceptions import ClientError
+
+from src.storage import delete_objects, is_missing_object, list_objects, read_object, read_objects, write_object
+
+
+class TestStorage:
+    def test_write_and_read_local_objects(self, tmp_path):
+        # test
+        write_object(str(tmp_path / "nested" / "shard.json"), "{}")
+        write_object(str(tmp_path / "nested" / "profile.prof"), b"binary")
+
+        assert list(read_objects(str(tmp_path / "nested"), suffix=".json")) == ["{}"]
+        assert (tmp_path / "nested" / "profile.prof").read_bytes() == b"binary"
+
+    def test_read_objects_missing_directory(self, tmp_path):
+        # test
+        assert list(read_objects(str(tmp_path / "missing"))) == []
+
+    def test_write_object_s3(self, mocker):
+        boto3_mock = mocker.patch.dict("sys.modules", {"boto3": mocker.MagicMock()})["boto3"]
+
+        # test
+        write_object("s3://some-bucket/task-metrics/shard.json", "{}")
+
+        boto3_mock.client.return_value.put_object.assert_called_once_with(
+            Bucket="some-bucket", Key="task-metrics/shard.json", Body=b"{}"
+        )
+
+    def test_read_objects_s3(self, mocker):
+        boto3_mock = mocker.patch.dict("sys.modules", {"boto3": mocker.MagicMock()})["boto3"]
+        s3_client = boto3_mock.client.return_value
+        s3_client.get_paginator.return_value.paginate.return_value = [
+            {"Contents": [{"Key": "task-metrics/shard.json"}, {"Key": "task-metrics/readme.txt"}]},
+            {},
+        ]
+        s3_client.get_object.return_value["Body"].read.return_value = b"{}"
+
+        # test
+        assert list(read_objects("s3://some-bucket/task-metrics", suffix=".json")) == ["{}"]
+
+        s3_client.get_paginator.return_value.paginate.assert_called_once_with(
+            Bucket="some-bucket", Prefix="task-metrics"
+        )
+        s3_client.get_object.assert_called_once_with(Bucket="some-bucket", Key="task-metrics/shard.json")
+
+    def test_read_object(self, mocker, tmp_path):
+        # mock
+        write_object(str(tmp_path / "template.yaml"), "Parameters: {}")
+        boto3_mock = mocker.patch.dict("sys.modules", {"boto3": mocker.MagicMock()})["boto3"]
+        boto3_mock.client.return_value.get_object.return_value["Body"].read.return_value = b"s3-body"
+        urlopen_mock = mocker.patch("urllib.request.urlopen")
+        urlopen_mock.return_value.__enter__.return_value.read.return_value = b"https-body"
+
+        # test
+        assert read_object(str(tmp_path / "template.yaml")) == "Parameters: {}"
+        assert read_object("S3://some-bucket/templates/template.yaml") == "s3-body"
+        assert read_object("https://example.com/template.yaml") == "https-body"
+
+        boto3_mock.client.return_value.get_object.assert_called_once_with(
+            Bucket="some-bucket", Key="templates/template.yaml"
+        )
+        urlopen_mock.assert_called_once_with("https://example.com/template.yaml", timeout=30)
+
+    def test_is_missing_object(self, tmp_path):
+        # data
+        no_such_key = ClientError({"Error": {"Code": "NoSuchKey"}}, "GetObject")
+        access_denied = ClientError({"Error": {"Code": "AccessDenied"}}, "GetObject")
+
+        # test
+        with pytest.raises(FileNotFoundError) as missing_file:
+            read_object(str(tmp_path / "missing.yaml"))
+
+        assert is_missing_object(missing_file.value) is True
+        assert is_missing_object(no_such_key) is True
+        assert is_missing_object(access_denied) is False
+        assert is_missing_object(ValueError("invalid")) is False
+
+    def test_list_and_delete_local_objects(self, tmp_path):
+        # mock
+        write_object(str(tmp_path / "manifest.yaml"), "Resources: {}")
+        (tmp_path / "nested").mkdir()
+
+        # test
+        assert [name for name, _ in list_objects(str(tmp_path))] == ["manifest.yaml"]
+        assert list(list_objects(str(tmp_path / "missing"))) == []
+
+        errors = delete_objects(str(tmp_path), ["manifest.yaml", "missing.yaml"])
+
+        assert list(errors) == ["missing.yaml"]
+        assert not (tmp_path / "manifest.yaml").exists()
+
+    def test_list_objects_s3(self, mocker):
+        boto3_mock = mocker.patch.dict("sys.modules", {"boto3": mocker.MagicMock()})["boto3"]
+        paginate_mock = boto3_mock.client.return_value.get_paginator.return_value.paginate
+        last_modified = datetime(2023, 1, 1, tzinfo=timezone.utc)
+        paginate_mock.return_value = [{"Contents": [{"Key": "manifests/a.yaml", "LastModified": last_modified}]}, {}]
+
+        # test
+        assert list(list_objects("s3://some-bucket/manifests")) == [("a.yaml", last_modified.timestamp())]
+        assert list(list_objects("s3://some-bucket")) == [("manifests/a.yaml", last_modified.timestamp())]
+
+        assert paginate_mock.call_args_list == [
+            mocker.call(Bucket="some-bucket", Prefix="manifests/"),
+            mocker.call(Bucket="some-bucket", Prefix=""),
+        ]
+
+    def test_delete_objects_s3(self, mocker):
+        boto3_mock = mocker.patch.dict("sys.modules", {"boto3": mocker.MagicMock()})["boto3"]
+        delete_objects_mock = boto3_mock.client.return_value.delete_objects
+        delete_objects_mock.return_value = {"Errors": [{"Key": "manifests/b.yaml", "Code": "AccessDenied"}]}
+
+        # test
+        assert delete_objects("s3://some-bucket/manifests", ["a.yaml", "b.yaml"]) == {"b.yaml": "AccessDenied"}
+
+        delete_objects_mock.assert_called_once_with(
+            Bucket="some-bucket",
+            Delete={"Objects": [{"Key": "manifests/a.yaml"}, {"Key": "manifests/b.yaml"}], "Quiet": True},
+        )
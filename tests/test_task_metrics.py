@@ -0,0 +1,123 @@
+import json
+
+import pytest
+
+from src import task_metrics
+from src.task_metrics import DurationHistogram, TaskDurationRecorder
+
+
+class TestDurationHistogram:
+    def test_record_and_percentiles(self):
+        histogram = DurationHistogram()
+
+        # test
+        for value in range(1, 1001):
+            histogram.record(value * 1000)
+
+        assert histogram.total_count == 1000
+        assert histogram.percentile(50) == pytest.approx(500_000, rel=0.01)
+        assert histogram.percentile(95) == pytest.approx(950_000, rel=0.01)
+        assert histogram.summary()["min"] == pytest.approx(1000, rel=0.01)
+        assert histogram.summary()["max"] == pytest.approx(1_000_000, rel=0.01)
+        assert len(histogram.counts) < 1000
+
+    def test_small_values_are_exact(self):
+        histogram = DurationHistogram()
+
+        # test
+        histogram.record(3)
+        histogram.record(-5)
+
+        assert histogram.summary() == {"count": 2, "min": 0, "max": 3, "p50": 0, "p90": 3, "p95": 3, "p99": 3}
+
+    def test_empty_histogram(self):
+        # test
+        assert DurationHistogram().summary() == {"count": 0}
+        assert DurationHistogram().percentile(99) == 0
+
+    def test_merge(self):
+        histogram = DurationHistogram()
+        other = DurationHistogram()
+        histogram.record(1000)
+        other.record(1000)
+        other.record(5000)
+
+        # test
+        assert histogram.merge(other).total_count == 3
+        assert histogram.percentile(100) == pytest.approx(5000, rel=0.01)
+
+    def test_merge_different_precision(self):
+        # test
+        with pytest.raises(ValueError):
+            DurationHistogram(2).merge(DurationHistogram(3))
+
+    def test_serialisation(self):
+        histogram = DurationHistogram()
+        histogram.record(123456)
+
+        # test
+        restored = DurationHistogram.from_dict(json.loads(json.dumps(histogram.to_dict())))
+
+        assert restored.counts == histogram.counts
+        assert restored.significant_figures == histogram.significant_figures
+
+
+class TestTaskDurationRecorder:
+    def test_from_environment(self, monkeypatch):
+        monkeypatch.delenv("TASK_METRICS_LOCATION", raising=False)
+        assert TaskDurationRecorder.from_environment() is None
+
+        monkeypatch.setenv("TASK_METRICS_LOCATION", "s3://some-bucket/task-metrics/")
+        monkeypatch.setenv("TASK_METRICS_FLUSH_INTERVAL_SECONDS", "300")
+        recorder = TaskDurationRecorder.from_environment()
+        assert recorder.location == "s3://some-bucket/task-metrics"
+        assert recorder.flush_interval_seconds == 300
+
+    def test_record_local_and_export(self, tmp_path):
+        first_recorder = TaskDurationRecorder(str(tmp_path), shard_id="first")
+        second_recorder = TaskDurationRecorder(str(tmp_path), shard_id="second")
+
+        # test
+        first_recorder.record("create", "some-cat-id", "ap-southeast-2", 60_000)
+        second_recorder.record("create", "some-cat-id", "ap-southeast-2", 120_000)
+        second_recorder.record("delete", "some-cat-id", "ap-southeast-2", 30_000)
+        second_recorder.flush()
+
+        assert sorted(path.name for path in tmp_path.iterdir()) == ["first.json", "second.json"]
+        assert task_metrics.load_histograms(str(tmp_path))["create/some-cat-id/ap-southeast-2"].total_count == 2
+
+        exported = task_metrics.export_task_durations(str(tmp_path))
+        assert list(exported) == ["create/some-cat-id/ap-southeast-2", "delete/some-cat-id/ap-southeast-2"]
+        assert exported["create/some-cat-id/ap-southeast-2"]["p99"] == pytest.approx(120_000, rel=0.01)
+
+    def test_record_buffers_until_flush_interval(self, mocker):
+        # mock
+        monotonic_mock = mocker.patch("src.task_metrics.monotonic", return_value=100.0)
+        write_object_mock = mocker.patch("src.task_metrics.write_object")
+        recorder = TaskDurationRecorder("s3://some-bucket/task-metrics", shard_id="shard", flush_interval_seconds=60)
+
+        # test
+        recorder.record("create", "some-cat-id", "ap-southeast-2", 60_000)
+        recorder.record("create", "some-cat-id", "ap-southeast-2", 120_000)
+        assert write_object_mock.call_count == 1
+
+        monotonic_mock.return_value = 160.0
+        recorder.record("create", "some-cat-id", "ap-southeast-2", 90_000)
+        assert write_object_mock.call_count == 2
+        assert write_object_mock.call_args.args[0] == "s3://some-bucket/task-metrics/shard.json"
+        assert json.loads(write_object_mock.call_args.args[1])["create/some-cat-id/ap-southeast-2"]["counts"]
+
+        recorder.flush()
+        assert write_object_mock.call_count == 2
+
+    def test_record_each_task_once(self, tmp_path):
+        recorder = TaskDurationRecorder(str(tmp_path), shard_id="shard", max_task_ids=2)
+
+        # test
+        assert recorder.record("create", "some-cat-id", "ap-southeast-2", 60_000, task_id="task-1") is True
+        assert recorder.record("create", "some-cat-id", "ap-southeast-2", 60_000, task_id="task-1") is False
+        assert recorder.record("create", "some-cat-id", "ap-southeast-2", 60_000, task_id="task-2") is True
+        assert recorder.record("create", "some-cat-id", "ap-southeast-2", 60_000, task_id="task-3") is True
+        assert recorder.record("create", "some-cat-id", "ap-southeast-2", 60_000, task_id="task-1") is True
+
+        assert recorder.histograms["create/some-cat-id/ap-southeast-2"].total_count == 4
@@ -0,0 +1,75 @@
+from src.task_status_cache import TaskStatusCache
+
+
+class TestTaskStatusCache:
+    def test_get_keeps_terminal_task_status(self, mocker):
+        # mock
+        monotonic_mock = mocker.patch("src.task_status_cache.monotonic", return_value=100.0)
+        loader = mocker.Mock(return_value={"Status": "SUCCEEDED"})
+        cache = TaskStatusCache(ttl_seconds=5)
+
+        # test
+        assert cache.get("task-1", loader) == {"Status": "SUCCEEDED"}
+
+        monotonic_mock.return_value = 100_000.0
+        assert cache.get("task-1", loader) == {"Status": "SUCCEEDED"}
+
+        loader.assert_called_once_with("task-1")
+        assert cache.stats() == {"hits": 1, "misses": 1, "size": 1}
+
+    def test_get_expires_running_task_status(self, mocker):
+        # mock
+        monotonic_mock = mocker.patch("src.task_status_cache.monotonic", return_value=100.0)
+        loader = mocker.Mock(side_effect=[{"Status": "RUNNING"}, {"Status": "FAILED"}])
+        cache = TaskStatusCache(ttl_seconds=5)
+
+        # test
+        assert cache.get("task-1", loader) == {"Status": "RUNNING"}
+        assert cache.get("task-1", loader) == {"Status": "RUNNING"}
+
+        monotonic_mock.return_value = 106.0
+        assert cache.get("task-1", loader) == {"Status": "FAILED"}
+        assert loader.call_count == 2
+        assert cache.stats() == {"hits": 1, "misses": 2, "size": 1}
+
+    def test_get_evicts_least_recently_used_task(self, mocker):
+        # mock
+        loader = mocker.Mock(side_effect=lambda task_id: {"Status": "SUCCEEDED", "Id": task_id})
+        cache = TaskStatusCache(max_size=2)
+
+        # test
+        cache.get("task-1", loader)
+        cache.get("task-2", loader)
+        cache.get("task-1", loader)
+        cache.get("task-3", loader)
+        cache.get("task-1", loader)
+        cache.get("task-2", loader)
+
+        assert [call.args[0] for call in loader.call_args_list] == ["task-1", "task-2", "task-3", "task-2"]
+        assert cache.stats() == {"hits": 2, "misses": 4, "size": 2}
+
+    def test_get_without_cache_size_always_loads(self, mocker):
+        # mock
+        loader = mocker.Mock(return_value={"Status": "SUCCEEDED"})
+        cache = TaskStatusCache(max_size=0)
+
+        # test
+        cache.get("task-1", loader)
+        cache.get("task-1", loader)
+
+        assert loader.call_count == 2
+        assert cache.stats() == {"hits": 0, "misses": 2, "size": 0}
+
+    def test_clear(self, mocker):
+        # mock
+        loader = mocker.Mock(return_value={"Status": "SUCCEEDED"})
+        cache = TaskStatusCache()
+
+        # test
+        cache.get("task-1", loader)
+        cache.get("task-1", loader)
+        cache.clear()
+
+        assert cache.stats() == {"hits": 0, "misses": 0, "size": 0}
+        cache.get("task-1", loader)
+        assert loader.call_count == 2
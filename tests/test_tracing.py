@@ -0,0 +1,23 @@
+from src.tracing import configure_tracing
+
+
+class TestTracing:
+    def test_configure_tracing_disabled(self, mocker):
+        # mock
+        mocker.patch.dict("os.environ", {"LAMBDA_TRACING_ENABLED": "false"})
+        patch_all_mock = mocker.patch("aws_xray_sdk.core.patch_all")
+
+        # test
+        assert configure_tracing("StaxOrchestrator:Test") is False
+        patch_all_mock.assert_not_called()
+
+    def test_configure_tracing_enabled(self, mocker):
+        # mock
+        mocker.patch.dict("os.environ", {"LAMBDA_TRACING_ENABLED": "True"})
+        patch_all_mock = mocker.patch("aws_xray_sdk.core.patch_all")
+        xray_recorder_mock = mocker.patch("aws_xray_sdk.core.xray_recorder")
+
+        # test
+        assert configure_tracing("StaxOrchestrator:Test") is True
+        xray_recorder_mock.configure.assert_called_once_with(service="StaxOrchestrator:Test")
+        patch_all_mock.assert_called_once()
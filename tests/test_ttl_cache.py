@@ -0,0 +1,38 @@
+from src.ttl_cache import TTLCache
+
+
+class TestTTLCache:
+    def test_get_caches_until_ttl_expires(self, mocker):
+        monotonic_mock = mocker.patch("src.ttl_cache.monotonic", return_value=100.0)
+        loader = mocker.Mock(side_effect=["first-index", "second-index"])
+        cache = TTLCache(ttl_seconds=60)
+
+        # test
+        assert cache.get(loader) == "first-index"
+        assert cache.get(loader) == "first-index"
+
+        monotonic_mock.return_value = 161.0
+        assert cache.get(loader) == "second-index"
+        assert loader.call_count == 2
+
+    def test_update(self, mocker):
+        apply = mocker.Mock()
+        cache = TTLCache(ttl_seconds=60)
+
+        # test
+        cache.update(apply)
+        apply.assert_not_called()
+
+        index = cache.get(lambda: ["first-index"])
+        cache.update(lambda value: value.append("second-index"))
+        assert cache.get(mocker.Mock()) is index
+        assert index == ["first-index", "second-index"]
+
+    def test_invalidate(self, mocker):
+        loader = mocker.Mock(side_effect=["first-index", "second-index"])
+        cache = TTLCache(ttl_seconds=60)
+
+        # test
+        assert cache.get(loader) == "first-index"
+        cache.invalidate()
+        assert cache.get(loader) == "second-index"
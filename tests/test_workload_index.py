@@ -0,0 +1,139 @@
+from time import perf_counter
+
+import pytest
+
+from src.workload_index import WorkloadIndex, WorkloadIndexCache
+
+# Median query time budget over an inventory of tens of thousands of workloads
+QUERY_BUDGET_SECONDS = 0.001
+
+
+def make_workload(number: int, **overrides) -> dict:
+    return {
+        "Id": f"workload-{number}",
+        "Name": f"workload-{number}",
+        "AccountId": f"account-{number % 50}",
+        "Region": ["ap-southeast-2", "us-east-1"][number % 2],
+        "CatalogueId": f"catalogue-{number % 10}",
+        "Status": "ACTIVE",
+        "Tags": {"owner": f"team-{number % 100}", "environment": ["dev", "test", "prod"][number % 3]},
+        **overrides,
+    }
+
+
+class TestWorkloadIndex:
+    workloads = [
+        make_workload(1, Tags={"owner": "platform", "environment": "dev"}),
+        make_workload(2, Tags={"owner": "platform", "environment": "prod"}),
+        make_workload(3, Tags={"owner": "data", "environment": "dev", "cost-centre": "42"}),
+        make_workload(4, Status="DELETED", Tags={"owner": "platform", "environment": "dev"}),
+    ]
+
+    @staticmethod
+    def ids(workloads: list) -> list:
+        return [workload["Id"] for workload in workloads]
+
+    def test_query_and_or(self):
+        # data
+        index = WorkloadIndex.from_response({"Workloads": self.workloads})
+
+        # test
+        assert len(index) == 4
+        assert self.ids(index.query()) == ["workload-1", "workload-2", "workload-3", "workload-4"]
+        assert self.ids(index.query(tags={"owner": "platform", "environment": "dev"}, status="ACTIVE")) == [
+            "workload-1"
+        ]
+        assert self.ids(index.query(tags={"environment": ["dev", "prod"]}, status="ACTIVE")) == [
+            "workload-1",
+            "workload-2",
+            "workload-3",
+        ]
+        assert self.ids(index.query(any_tags={"owner": "data", "environment": "prod"})) == ["workload-2", "workload-3"]
+        assert self.ids(index.query(tags={"owner": "platform"}, any_tags={"cost-centre": "42"})) == []
+        assert self.ids(index.query(aws_region="us-east-1", catalogue_id=["catalogue-1", "catalogue-3"])) == [
+            "workload-1",
+            "workload-3",
+        ]
+        assert index.query(tags={"owner": "unknown"}) == []
+
+    def test_query_unknown_attribute(self):
+        # test
+        with pytest.raises(ValueError, match="not indexed by name"):
+            WorkloadIndex(self.workloads).query(name="workload-1")
+
+    def test_upsert_and_remove(self):
+        # data
+        index = WorkloadIndex(self.workloads)
+
+        # test
+        index.upsert(make_workload(1, Tags={"owner": "data"}))
+        index.upsert(make_workload(5, Tags={"owner": "data"}))
+        index.remove("workload-3")
+        index.remove("unknown-workload")
+
+        assert self.ids(index.query(tags={"owner": "data"})) == ["workload-1", "workload-5"]
+        assert self.ids(index.query(tags={"environment": "dev"})) == ["workload-4"]
+        assert len(index) == 4
+
+    def test_query_budget(self):
+        # data
+        index = WorkloadIndex(make_workload(number) for number in range(50_000))
+        timings = []
+
+        # test
+        for _ in range(101):
+            started_at = perf_counter()
+            matched = index.query(tags={"owner": "team-7", "environment": ["dev", "prod"]}, status="ACTIVE")
+            timings.append(perf_counter() - started_at)
+
+        assert len(matched) == 333
+        assert sorted(timings)[50] < QUERY_BUDGET_SECONDS
+
+
+class TestWorkloadIndexCache:
+    def test_get_updates_and_invalidate(self, mocker):
+        # mock
+        monotonic_mock = mocker.patch("src.ttl_cache.monotonic", return_value=0)
+        loader = mocker.Mock(side_effect=lambda: WorkloadIndex([make_workload(1)]))
+        cache = WorkloadIndexCache(ttl_seconds=60)
+
+        # test
+        cache.upsert(make_workload(2))
+        cache.remove("workload-1")
+
+        assert len(cache.get(loader)) == 1
+
+        cache.upsert(make_workload(2))
+        cache.remove("workload-1")
+
+        assert [workload["Id"] for workload in cache.get(loader).query()] == ["workload-2"]
+        assert loader.call_count == 1
+
+        monotonic_mock.return_value = 60
+        assert len(cache.get(loader)) == 1
+
+        cache.invalidate()
+        cache.get(loader)
+        assert loader.call_count == 3
+
+    def test_build_keeps_tags(self):
+        # data
+        cache = WorkloadIndexCache(ttl_seconds=60)
+        untagged = {key: value for key, value in make_workload(1).items() if key != "Tags"}
+
+        # test
+        cache.get(lambda: cache.build([dict(untagged), make_workload(2, Id="workload-2")]))
+        cache.add_tags([{**untagged, "Tags": {"owner": "platform"}}])
+        cache.remove("workload-2")
+
+        assert [workload["Id"] for workload in cache.get(lambda: None).query(tags={"owner": "platform"})] == [
+            "workload-1"
+        ]
+
+        index = cache.build([dict(untagged), {**untagged, "Id": "workload-2"}])
+
+        assert [workload.get("Tags") for workload in index.query()] == [{"owner": "platform"}, None]
+
+        cache.clear()
+
+        assert [workload.get("Tags") for workload in cache.build([dict(untagged)]).query()] == [None]